@@ -0,0 +1,28 @@
+"""Cold start cost of importing the package, as paid by CLI tools and serverless functions."""
+import json
+import subprocess
+import sys
+
+# Modules only SPARQL stores, process pools or the result cache need, which in-memory use must not import.
+DEFERRED = ['rdflib.plugins.stores.sparqlstore', 'concurrent.futures.process', 'multiprocessing', 'sqlite3']
+
+SCRIPT = f"""
+import json, sys, time
+started = time.perf_counter()
+import rdflib_orm.models
+elapsed = time.perf_counter() - started
+print(json.dumps({{'seconds': elapsed, 'loaded': [name for name in {DEFERRED!r} if name in sys.modules]}}))
+"""
+
+
+def import_models() -> dict:
+    """Import the models in a fresh interpreter, returning the import time and the deferred modules it loaded."""
+    output = subprocess.run([sys.executable, '-c', SCRIPT], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def bench_import(benchmark):
+    result = import_models()
+    benchmark.extra_info.update(import_seconds=result['seconds'])
+    assert result['loaded'] == []
+    benchmark.pedantic(import_models, rounds=5, iterations=1)
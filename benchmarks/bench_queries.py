@@ -0,0 +1,62 @@
+import pytest
+
+from rdflib_orm import models
+from benchmarks.vocabulary import BRANCHING, SCHEME_URI, Concept, LinkedConcept, concept_uri, notation
+
+
+def bench_get(measure, vocabulary):
+    uris = iter(range(10 ** 9))
+    measure(lambda: Concept.objects.get(vocabulary.uri(next(uris))), rounds=100)
+
+
+def bench_filter_by_notation(measure, vocabulary):
+    i = vocabulary.sample[0]
+    result = measure(lambda: Concept.objects.filter(other_ids=[notation(i)]), rounds=50)
+    assert len(result) == 1
+
+
+def bench_all(measure, vocabulary):
+    rounds = 3 if vocabulary.size <= 1_000 else 1
+    result = measure(Concept.objects.all, rounds=rounds)
+    assert len(result) == vocabulary.size
+
+
+def bench_relationship_hydration(measure, vocabulary):
+    concept = measure(lambda: LinkedConcept.objects.get(vocabulary.uri(0)), rounds=50)
+    assert concept.home_vocab.title == 'A concept scheme'
+
+
+@pytest.mark.parametrize('parallel', [1, 4])
+def bench_iterator(measure, vocabulary, parallel):
+    rounds = 3 if vocabulary.size <= 1_000 else 1
+    count = measure(lambda: sum(1 for _ in Concept.objects.iterator(parallel=parallel)), rounds=rounds)
+    assert count == vocabulary.size
+
+
+@pytest.mark.parametrize('depth', [None, 2])
+def bench_descendants(measure, vocabulary, depth):
+    rounds = 3 if vocabulary.size <= 1_000 else 1
+    result = measure(lambda: Concept.objects.descendants(concept_uri(0), field='children', depth=depth),
+                     rounds=rounds)
+    assert len(result) == (vocabulary.size - 1 if depth is None else min(vocabulary.size - 1, BRANCHING + BRANCHING ** 2))
+
+
+def bench_annotate(measure, vocabulary):
+    rounds = 3 if vocabulary.size <= 1_000 else 1
+    result = measure(lambda: Concept.objects.annotate('home_vocab_uri', count=models.Count()), rounds=rounds)
+    assert result == [{'home_vocab_uri': str(SCHEME_URI), 'count': vocabulary.size}]
+
+
+def bench_paginate(measure, vocabulary):
+    # A page at a random depth costs the same as the first one.
+    cursor = models.Page.encode(vocabulary.uri(0))
+    page = measure(lambda: Concept.objects.paginate(after=cursor, size=50), rounds=20)
+    assert 0 < len(page) <= 50
+
+
+def bench_to_columns(measure, vocabulary):
+    pytest.importorskip('numpy')
+    rounds = 3 if vocabulary.size <= 1_000 else 1
+    # Compare peak_memory_bytes with bench_all, which builds an instance per concept.
+    columns = measure(Concept.objects.to_columns, rounds=rounds)
+    assert len(columns['uri']) == vocabulary.size
@@ -0,0 +1,36 @@
+"""Warm start of an in-memory database from Turtle and from a memory-mapped snapshot."""
+import pytest
+from rdflib import Graph
+
+from rdflib_orm.db import Database
+from benchmarks.vocabulary import BASE_URI, Concept
+
+
+@pytest.fixture(scope='module')
+def files(vocabulary, tmp_path_factory):
+    directory = tmp_path_factory.mktemp(f'start_{vocabulary.name}')
+    turtle, snapshot = str(directory / 'vocabulary.ttl'), str(directory / 'vocabulary.snapshot')
+    vocabulary.g.serialize(turtle, format='turtle')
+    Database(vocabulary.g, BASE_URI).snapshot(snapshot)
+    return turtle, snapshot
+
+
+def bench_start_from_turtle(benchmark, vocabulary, files):
+    turtle, _ = files
+
+    def start():
+        Database.set_db(Graph().parse(turtle, format='turtle'), BASE_URI)
+        return Concept.objects.get(vocabulary.uri(0))
+
+    benchmark.pedantic(start, rounds=3, iterations=1)
+
+
+def bench_start_from_snapshot(benchmark, vocabulary, files):
+    _, snapshot = files
+
+    def start():
+        Database.load_snapshot(snapshot, BASE_URI)
+        return Concept.objects.get(vocabulary.uri(0))
+
+    concept = benchmark.pedantic(start, rounds=3, iterations=1)
+    assert concept.__uri__ == vocabulary.uri(0)
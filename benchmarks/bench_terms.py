@@ -0,0 +1,41 @@
+"""Allocation benchmarks of field conversion with and without term interning."""
+import tracemalloc
+
+import pytest
+
+from rdflib_orm import terms
+from benchmarks.vocabulary import Concept, concept_uri
+
+# A hot vocabulary: a few distinct values referenced many times.
+DISTINCT = 1_000
+REFERENCES = 100_000
+
+
+@pytest.fixture(params=['interned', 'uninterned'])
+def interning(request):
+    terms.set_cache_size(terms.CACHE_SIZE if request.param == 'interned' else 0)
+    yield request.param
+    terms.set_cache_size(terms.CACHE_SIZE)
+
+
+def run(benchmark, func):
+    """Benchmark a conversion, recording the memory retained by its result and its peak memory."""
+    tracemalloc.start()
+    try:
+        result = func()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    benchmark.extra_info.update(retained_memory_bytes=retained, peak_memory_bytes=peak)
+    benchmark.pedantic(func, rounds=5, iterations=1, warmup_rounds=1)
+
+
+def bench_iri_convert(benchmark, interning):
+    values = [str(concept_uri(i % DISTINCT)) for i in range(REFERENCES)]
+    run(benchmark, lambda: Concept.children.convert(values))
+
+
+def bench_literal_convert(benchmark, interning):
+    values = [f'Alternative {i % DISTINCT}' for i in range(REFERENCES)]
+    run(benchmark, lambda: Concept.alt_labels.convert(values))
@@ -0,0 +1,22 @@
+import pytest
+
+from benchmarks.vocabulary import Concept, concept_record
+
+
+def bench_save(measure, vocabulary):
+    concept = Concept.objects.get(vocabulary.uri(0))
+    measure(concept.save, rounds=50)
+
+
+def bench_serialize(measure, vocabulary):
+    concept = Concept.objects.get(vocabulary.uri(0))
+    measure(concept.serialize, rounds=50)
+
+
+@pytest.mark.parametrize('processes', [None, 4])
+def bench_bulk_create(measure, vocabulary, backend, processes):
+    if backend != 'memory':
+        pytest.skip('Process pools target CPU-bound loads into local stores.')
+    # Rewrites the first concepts with their generated values, so the vocabulary is unchanged.
+    records = [concept_record(i, vocabulary.size) for i in range(min(vocabulary.size, 10_000))]
+    measure(lambda: Concept.objects.bulk_create(records, processes=processes), rounds=3)
@@ -0,0 +1,102 @@
+import os
+import random
+import tracemalloc
+from typing import Callable, List
+
+import pytest
+from rdflib import Graph, URIRef, Dataset
+
+from rdflib_orm.db import Database
+from rdflib_orm.testing import MockSPARQLEndpoint
+from benchmarks.vocabulary import generate_vocabulary, concept_uri, BASE_URI
+
+GRAPH_URI = URIRef('http://example.com/graph')
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1M': 1_000_000}
+
+
+class Vocabulary:
+    def __init__(self, name: str, size: int, g: Graph):
+        self.name = name
+        self.size = size
+        self.g = g
+        rng = random.Random(size)
+        # A fixed sample of concepts so every run and every backend looks up the same ones.
+        self.sample: List[int] = [rng.randrange(size) for _ in range(100)]
+
+    def uri(self, i: int) -> URIRef:
+        return concept_uri(self.sample[i % len(self.sample)])
+
+
+def pytest_generate_tests(metafunc):
+    if 'vocabulary' in metafunc.fixturenames:
+        # RDFLIB_ORM_BENCH_SIZES=1k,100k,1M selects the vocabulary sizes to run against.
+        names = os.environ.get('RDFLIB_ORM_BENCH_SIZES', '1k').split(',')
+        metafunc.parametrize('vocabulary', names, indirect=True, scope='session')
+    if 'backend' in metafunc.fixturenames:
+        # RDFLIB_ORM_BENCH_BACKENDS=memory,sparql,snapshot selects the stores to run against.
+        backends = os.environ.get('RDFLIB_ORM_BENCH_BACKENDS', 'memory,sparql').split(',')
+        metafunc.parametrize('backend', backends, scope='session')
+
+
+@pytest.fixture(scope='session')
+def vocabulary(request) -> Vocabulary:
+    name = request.param
+    size = SIZES[name]
+    return Vocabulary(name, size, generate_vocabulary(size))
+
+
+@pytest.fixture(scope='session')
+def endpoints():
+    """Local SPARQL endpoints, one per vocabulary, with RDFLIB_ORM_BENCH_LATENCY seconds of injected latency."""
+    latency = float(os.environ.get('RDFLIB_ORM_BENCH_LATENCY', 0))
+    started = dict()
+    yield started, latency
+    for endpoint in started.values():
+        endpoint.stop()
+
+
+@pytest.fixture(scope='session')
+def snapshots(tmp_path_factory):
+    """Snapshot files of the vocabularies, by name."""
+    return tmp_path_factory.mktemp('snapshots'), dict()
+
+
+@pytest.fixture
+def db(vocabulary, backend, endpoints, snapshots) -> Database:
+    if backend == 'memory':
+        Database.set_db(vocabulary.g, BASE_URI)
+    elif backend == 'snapshot':
+        directory, paths = snapshots
+        if vocabulary.name not in paths:
+            paths[vocabulary.name] = str(directory / f'{vocabulary.name}.snapshot')
+            Database(vocabulary.g, BASE_URI).snapshot(paths[vocabulary.name])
+        Database.load_snapshot(paths[vocabulary.name], BASE_URI)
+    else:
+        started, latency = endpoints
+        if vocabulary.name not in started:
+            dataset = Dataset()
+            graph = dataset.graph(GRAPH_URI)
+            graph.addN((s, p, o, graph) for s, p, o in vocabulary.g)
+            started[vocabulary.name] = MockSPARQLEndpoint(dataset, latency=latency)
+            started[vocabulary.name].start()
+        Database.set_db(started[vocabulary.name].graph(GRAPH_URI), BASE_URI)
+    return Database.get_db()
+
+
+@pytest.fixture
+def measure(benchmark, db):
+    """Benchmark a callable and record its store round trips and peak memory in the benchmark's extra info."""
+    def run(func: Callable, *args, rounds: int = 20):
+        with db.capture() as stats:
+            func(*args)
+        tracemalloc.start()
+        try:
+            func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info.update(round_trips=stats.round_trips, triples_read=stats.triples_read,
+                                    peak_memory_bytes=peak)
+        return benchmark.pedantic(func, args=args, rounds=rounds, iterations=1, warmup_rounds=1)
+    return run
@@ -0,0 +1,105 @@
+"""Synthetic SKOS vocabularies built from the README models."""
+from rdflib import Graph, URIRef, Literal
+from rdflib.namespace import DCTERMS, SKOS, OWL, DCAT, RDFS, RDF, XSD
+
+from rdflib_orm import models
+
+BASE_URI = 'http://example.com/'
+SCHEME_URI = URIRef('https://linked.data.gov.au/def/concept_scheme')
+# Each concept has this many narrower concepts, giving a tree of depth log_10(size).
+BRANCHING = 10
+
+
+class Common(models.Model):
+    provenance = models.CharField(predicate=DCTERMS.provenance, lang='en', required=True)
+
+    class Meta:
+        mixin = True
+
+
+class ConceptScheme(Common):
+    class_type = models.IRIField(predicate=RDF.type, value=SKOS.ConceptScheme)
+    title = models.CharField(predicate=DCTERMS.title, lang='en', required=True)
+    description = models.CharField(predicate=SKOS.definition, lang='en', required=True)
+    created = models.DateTimeField(DCTERMS.created, auto_now_add=True)
+    modified = models.DateTimeField(DCTERMS.modified, auto_now=True)
+    creator = models.IRIField(predicate=DCTERMS.creator, required=True)
+    publisher = models.IRIField(predicate=DCTERMS.publisher, required=True)
+    version = models.CharField(predicate=OWL.versionInfo, required=True)
+    custodian = models.CharField(predicate=DCAT.contactPoint)
+    see_also = models.IRIField(predicate=RDFS.seeAlso, many=True)
+
+
+class Concept(Common):
+    class_type = models.IRIField(predicate=RDF.type, value=SKOS.Concept)
+    pref_label = models.CharField(predicate=SKOS.prefLabel, lang='en', required=True)
+    alt_labels = models.CharField(predicate=SKOS.altLabel, lang='en', many=True)
+    definition = models.CharField(predicate=SKOS.definition, lang='en', required=True)
+    children = models.IRIField(predicate=SKOS.narrower, many=True, inverse=SKOS.broader)
+    other_ids = models.CharField(predicate=SKOS.notation, many=True)
+    home_vocab_uri = models.IRIField(predicate=RDFS.isDefinedBy)
+
+
+class LinkedConcept(Common):
+    """Same data as `Concept`, but hydrates its concept scheme through a `RelationshipField`."""
+    class_type = models.IRIField(predicate=RDF.type, value=SKOS.Concept)
+    pref_label = models.CharField(predicate=SKOS.prefLabel, lang='en', required=True)
+    home_vocab = models.RelationshipField(ConceptScheme, predicate=RDFS.isDefinedBy)
+
+
+def concept_uri(i: int) -> URIRef:
+    return URIRef(f'https://linked.data.gov.au/def/concept_{i}')
+
+
+def notation(i: int) -> str:
+    return f'N{i:07d}'
+
+
+def generate_vocabulary(size: int, g: Graph = None) -> Graph:
+    """Add a concept scheme and `size` concepts, linked in a tree through skos:narrower, to a graph."""
+    g = Graph() if g is None else g
+    en = 'en'
+    triples = [
+        (SCHEME_URI, RDF.type, SKOS.ConceptScheme),
+        (SCHEME_URI, DCTERMS.title, Literal('A concept scheme', lang=en)),
+        (SCHEME_URI, SKOS.definition, Literal('A description of this concept scheme.', lang=en)),
+        (SCHEME_URI, DCTERMS.created, Literal('2021-05-26T22:13:50.720468', datatype=XSD.dateTime)),
+        (SCHEME_URI, DCTERMS.modified, Literal('2021-05-26T22:13:50.723468', datatype=XSD.dateTime)),
+        (SCHEME_URI, DCTERMS.creator, URIRef('https://linked.data.gov.au/org/cgi')),
+        (SCHEME_URI, DCTERMS.publisher, URIRef('https://linked.data.gov.au/org/ga')),
+        (SCHEME_URI, OWL.versionInfo, Literal('0.1.0')),
+        (SCHEME_URI, DCTERMS.provenance, Literal('Generated for benchmarks', lang=en)),
+    ]
+    g.addN((s, p, o, g) for s, p, o in triples)
+
+    def concept_triples():
+        for i in range(size):
+            uri = concept_uri(i)
+            yield uri, RDF.type, SKOS.Concept
+            yield uri, SKOS.prefLabel, Literal(f'Concept {i}', lang=en)
+            yield uri, SKOS.altLabel, Literal(f'Alternative {i}', lang=en)
+            yield uri, SKOS.definition, Literal(f'Definition of concept {i}.', lang=en)
+            yield uri, SKOS.notation, Literal(notation(i))
+            yield uri, RDFS.isDefinedBy, SCHEME_URI
+            yield uri, DCTERMS.provenance, Literal('Generated for benchmarks', lang=en)
+            if i:
+                parent = concept_uri((i - 1) // BRANCHING)
+                yield parent, SKOS.narrower, uri
+                yield uri, SKOS.broader, parent
+
+    g.addN((s, p, o, g) for s, p, o in concept_triples())
+    return g
+
+
+def concept_record(i: int, size: int) -> dict:
+    """Field values of concept `i` as generated by `generate_vocabulary(size)`, for `Concept.objects.bulk_create()`."""
+    return {
+        'uri': str(concept_uri(i)),
+        'provenance': 'Generated for benchmarks',
+        'pref_label': f'Concept {i}',
+        'alt_labels': [f'Alternative {i}'],
+        'definition': f'Definition of concept {i}.',
+        'children': [concept_uri(child) for child in range(i * BRANCHING + 1, min(i * BRANCHING + BRANCHING + 1, size))],
+        'other_ids': [notation(i)],
+        'home_vocab_uri': SCHEME_URI,
+    }
@@ -0,0 +1,117 @@
+"""Aggregate functions for `Query.aggregate()` and `Query.annotate()`.
+
+On SPARQL stores each aggregate compiles to its SPARQL function in a `GROUP BY` query. On local stores the matching
+subjects are read once and every aggregate is reduced as they stream past. Either way, no model instances are built
+and results are plain Python values, with the SPARQL semantics for empty groups: counts, sums and averages are 0, and
+minimums and maximums are None.
+"""
+from typing import Optional
+
+from rdflib import Literal
+from rdflib.term import Node
+
+
+def to_python(term: Optional[Node]):
+    """Plain Python value of a term read from the store: literals are converted by datatype, IRIs become strings."""
+    if term is None:
+        return None
+    if isinstance(term, Literal):
+        value = term.toPython()
+        # Plain and language tagged literals convert to themselves.
+        return str(value) if isinstance(value, Literal) else value
+    return str(term)
+
+
+class Aggregate:
+    """An aggregate over the values of a model field, or over the instances themselves without a field."""
+    function: str
+
+    def __init__(self, field: str = None, distinct: bool = False):
+        self.field = field
+        self.distinct = distinct
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.field!r}, distinct={self.distinct})'
+
+    def sparql(self, variable: str) -> str:
+        """The SPARQL expression aggregating the values bound to `variable`."""
+        distinct = 'DISTINCT ' if self.distinct else ''
+        return f'{self.function}({distinct}{variable})'
+
+    def initial(self):
+        return None
+
+    def step(self, state, value):
+        raise NotImplementedError()
+
+    def result(self, state):
+        return state
+
+    def value(self, term: Optional[Node]):
+        """Python value of the aggregate as returned by a SPARQL store."""
+        return to_python(term)
+
+
+class Count(Aggregate):
+    function = 'COUNT'
+
+    def sparql(self, variable: str) -> str:
+        # Without a field, each instance counts once however many rows it matched.
+        if self.field is None:
+            return f'COUNT(DISTINCT {variable})'
+        return super(Count, self).sparql(variable)
+
+    def initial(self):
+        return 0
+
+    def step(self, state, value):
+        return state + 1
+
+    def value(self, term: Optional[Node]):
+        return 0 if term is None else int(term)
+
+
+class Min(Aggregate):
+    function = 'MIN'
+
+    def step(self, state, value):
+        return value if state is None or value < state else state
+
+
+class Max(Aggregate):
+    function = 'MAX'
+
+    def step(self, state, value):
+        return value if state is None or value > state else state
+
+
+class Sum(Aggregate):
+    function = 'SUM'
+
+    def initial(self):
+        return 0
+
+    def step(self, state, value):
+        return state + value
+
+    def value(self, term: Optional[Node]):
+        return 0 if term is None else to_python(term)
+
+
+class Avg(Aggregate):
+    function = 'AVG'
+
+    def initial(self):
+        return 0, 0
+
+    def step(self, state, value):
+        total, count = state
+        return total + value, count + 1
+
+    def result(self, state):
+        total, count = state
+        return total / count if count else 0.0
+
+    def value(self, term: Optional[Node]):
+        # SPARQL averages of integers are decimals, keep the type the local reduction returns.
+        return 0.0 if term is None else float(to_python(term))
@@ -0,0 +1,54 @@
+"""Change feeds over the `DateTimeField(auto_now=True)` timestamps stamped by `Model.save()`.
+
+Mirrors, caches and search indexes can stay in sync by reading only the instances modified since they last looked,
+instead of fetching every instance again. The modified filter is pushed down to the store, and instances come back
+oldest change first with a watermark to resume from.
+"""
+import datetime
+from typing import Iterator, Optional, Tuple, Union
+
+from rdflib import URIRef
+
+from rdflib_orm.db import Database
+from rdflib_orm.parallel import chunked
+
+# The modified timestamp and URI of the last instance read. The URI orders instances modified at the same time.
+Watermark = Tuple[datetime.datetime, URIRef]
+
+
+class ChangeFeed:
+    """Model.objects.changes(since=watermark)
+
+    Iterates over the instances modified after a watermark, oldest change first, fetching `chunk_size` instances per
+    query. The `watermark` advances past each instance once the next one is requested, so instances are delivered at
+    least once: a feed interrupted at any point resumes from its `watermark`, and iterating over it again picks up
+    the changes made since.
+    """
+
+    def __init__(self, query: 'Query', since: Union[datetime.datetime, Watermark, None], field: str, db_key: str,
+                 chunk_size: int, trusted: bool, filters: dict):
+        self.query = query
+        self.watermark: Optional[Union[datetime.datetime, Watermark]] = since
+        self.field = field
+        self.db_key = db_key
+        self.chunk_size = chunk_size
+        self.trusted = trusted
+        self.filters = filters
+
+    def __iter__(self) -> Iterator['Model']:
+        db = Database.get_db(self.db_key)
+        # Local stores are scanned once, SPARQL stores are paged through.
+        limit = self.chunk_size if db.is_sparql_store else None
+        while True:
+            rows = self.query._select_changed(db, self.field, self.watermark, limit, **self.filters)
+            for chunk in chunked(rows, self.chunk_size):
+                instances = {
+                    instance.__uri__: instance
+                    for instance in self.query._hydrate([uri for uri, _ in chunk], db, self.trusted)
+                }
+                for uri, modified in chunk:
+                    if uri in instances:
+                        yield instances[uri]
+                    self.watermark = (modified, uri)
+            if limit is None or len(rows) < limit:
+                return
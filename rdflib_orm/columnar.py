@@ -0,0 +1,256 @@
+"""Columnar exports of model instances for analytics.
+
+`Query.to_columns()` streams the field values of the instances matching a query from the store straight into typed
+buffers, without building `Model` instances:
+
+- `IntegerField` and `BooleanField` values become NumPy masked arrays, masked where an instance has no value.
+- `DateTimeField` values become `datetime64[us]` arrays, with `NaT` where an instance has no value.
+- `CharField`, `IRIField` and `RelationshipField` values become `DictionaryColumn`s of codes into their distinct values.
+- `many=True` fields become `ListColumn`s of offsets into a flat column of every item.
+
+Instance URIs are a `StringColumn`, a single UTF-8 buffer with offsets. `to_arrow()` wraps the same buffers in a
+`pyarrow.Table` for pandas and other Arrow consumers. NumPy and pyarrow are optional and only imported when used.
+"""
+import datetime
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from rdflib import URIRef
+
+EPOCH = datetime.datetime(1970, 1, 1)
+MICROSECOND = datetime.timedelta(microseconds=1)
+# The int64 value of NumPy's NaT.
+NAT = -2 ** 63
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('Columnar exports require NumPy, install it with `pip install rdflib-orm[columnar]`.')
+    return numpy
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('Arrow exports require pyarrow, install it with `pip install rdflib-orm[columnar]`.')
+    return pyarrow
+
+
+def _frombuffer(buffer: array):
+    """NumPy view of an `array.array`, without copying it."""
+    numpy = _numpy()
+    kind = 'f' if buffer.typecode in 'fd' else 'i'
+    return numpy.frombuffer(buffer, dtype=numpy.dtype(f'{kind}{buffer.itemsize}'))
+
+
+class StringColumn:
+    """Strings in a single UTF-8 buffer, the nth string spanning `data[offsets[n]:offsets[n + 1]]`."""
+
+    def __init__(self, data: bytes, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.data[self.offsets[i]:self.offsets[i + 1]].decode('utf-8')
+
+    def to_list(self) -> List[str]:
+        return [self[i] for i in range(len(self))]
+
+
+class DictionaryColumn:
+    """Strings as `codes` into a `StringColumn` of their distinct values, the `dictionary`, with -1 for missing
+    values."""
+
+    def __init__(self, codes, dictionary: StringColumn):
+        self.codes = codes
+        self.dictionary = dictionary
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        code = self.codes[i]
+        return self.dictionary[code] if code >= 0 else None
+
+    def to_list(self) -> List[Optional[str]]:
+        return [self[i] for i in range(len(self))]
+
+
+class ListColumn:
+    """Lists of values, the nth list spanning `values[offsets[n]:offsets[n + 1]]` of a flat column of every item."""
+
+    def __init__(self, offsets, values):
+        self.offsets = offsets
+        self.values = values
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> list:
+        return [self.values[j] for j in range(self.offsets[i], self.offsets[i + 1])]
+
+    def to_list(self) -> List[list]:
+        return [self[i] for i in range(len(self))]
+
+
+class _StringBuilder:
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array('q', [0])
+
+    def append(self, value: str):
+        self.data += value.encode('utf-8')
+        self.offsets.append(len(self.data))
+
+    def finish(self) -> StringColumn:
+        return StringColumn(bytes(self.data), _frombuffer(self.offsets))
+
+
+class _DictionaryBuilder:
+    def __init__(self):
+        self.codes = array('i')
+        self.index: Dict[str, int] = dict()
+        self.dictionary = _StringBuilder()
+
+    def append(self, value: Optional[str]):
+        if value is None:
+            self.codes.append(-1)
+            return
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.index)
+            self.dictionary.append(value)
+        self.codes.append(code)
+
+    def finish(self) -> DictionaryColumn:
+        return DictionaryColumn(_frombuffer(self.codes), self.dictionary.finish())
+
+
+class _NumberBuilder:
+    def __init__(self, typecode: str):
+        self.values = array(typecode)
+        self.mask = bytearray()
+
+    def append(self, value):
+        self.values.append(0 if value is None else value)
+        self.mask.append(value is None)
+
+    def finish(self):
+        numpy = _numpy()
+        values = _frombuffer(self.values)
+        if self.values.typecode == 'b':
+            values = values.view(numpy.bool_)
+        mask = numpy.frombuffer(bytes(self.mask), dtype=numpy.bool_) if any(self.mask) else numpy.ma.nomask
+        return numpy.ma.MaskedArray(values, mask=mask)
+
+
+class _DateTimeBuilder:
+    def __init__(self):
+        self.values = array('q')
+
+    def append(self, value: Optional[datetime.datetime]):
+        if value is None:
+            self.values.append(NAT)
+            return
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        self.values.append((value - EPOCH) // MICROSECOND)
+
+    def finish(self):
+        return _frombuffer(self.values).view('datetime64[us]')
+
+
+class _ListBuilder:
+    def __init__(self, items):
+        self.items = items
+        self.offsets = array('q', [0])
+        self.count = 0
+
+    def append(self, values: list):
+        for value in values:
+            self.items.append(value)
+        self.count += len(values)
+        self.offsets.append(self.count)
+
+    def finish(self) -> ListColumn:
+        return ListColumn(_frombuffer(self.offsets), self.items.finish())
+
+
+def _builder(field):
+    """The column builder of a field, and the function converting its terms into the values the builder takes."""
+    from rdflib_orm.fields import IntegerField, BooleanField, DateTimeField
+
+    if isinstance(field, IntegerField):
+        builder, convert = _NumberBuilder('q'), lambda term: int(term.toPython())
+    elif isinstance(field, BooleanField):
+        builder, convert = _NumberBuilder('b'), lambda term: str(term) in ('true', '1')
+    elif isinstance(field, DateTimeField):
+        builder, convert = _DateTimeBuilder(), _datetime
+    else:
+        builder, convert = _DictionaryBuilder(), str
+    if getattr(field, 'many', False):
+        return _ListBuilder(builder), convert
+    return builder, convert
+
+
+def _datetime(term) -> datetime.datetime:
+    value = term.toPython()
+    return value if isinstance(value, datetime.datetime) else datetime.datetime.fromisoformat(str(term))
+
+
+def to_columns(model_class, groups: Iterable[Tuple[URIRef, list]]) -> Dict[str, object]:
+    """Columns of the field values in the (predicate, object) pairs of each subject, by field name, and their `uri`.
+
+    Fields that aren't `many` take one of their values when a subject has several.
+    """
+    uris = _StringBuilder()
+    columns = list()
+    for name, field in model_class.get_model_attributes(model_class):
+        builder, convert = _builder(field)
+        columns.append((name, field.predicate, getattr(field, 'many', False), builder, convert))
+
+    for uri, pos in groups:
+        uris.append(str(uri))
+        objects_by_predicate = dict()
+        for p, o in pos:
+            objects_by_predicate.setdefault(p, []).append(o)
+        for _, predicate, many, builder, convert in columns:
+            objects = objects_by_predicate.get(predicate, ())
+            if many:
+                builder.append([convert(o) for o in objects])
+            else:
+                builder.append(convert(objects[0]) if objects else None)
+
+    result = {'uri': uris.finish()}
+    for name, _, _, builder, _ in columns:
+        result[name] = builder.finish()
+    return result
+
+
+def _arrow_array(column):
+    pyarrow = _pyarrow()
+    numpy = _numpy()
+    if isinstance(column, StringColumn):
+        return pyarrow.LargeStringArray.from_buffers(
+            len(column), pyarrow.py_buffer(column.offsets), pyarrow.py_buffer(column.data))
+    if isinstance(column, DictionaryColumn):
+        indices = pyarrow.array(column.codes, mask=column.codes < 0)
+        return pyarrow.DictionaryArray.from_arrays(indices, _arrow_array(column.dictionary))
+    if isinstance(column, ListColumn):
+        return pyarrow.LargeListArray.from_arrays(pyarrow.array(column.offsets), _arrow_array(column.values))
+    if isinstance(column, numpy.ma.MaskedArray):
+        return pyarrow.array(column.data, mask=numpy.ma.getmaskarray(column))
+    # datetime64, where NaT is null.
+    return pyarrow.array(column, from_pandas=True)
+
+
+def to_arrow(columns: Dict[str, object]):
+    """A `pyarrow.Table` of the columns from `to_columns()`, sharing their buffers where Arrow's layout allows."""
+    pyarrow = _pyarrow()
+    return pyarrow.table({name: _arrow_array(column) for name, column in columns.items()})
@@ -1,12 +1,24 @@
+import copy
+import io
 import logging
-from typing import Tuple, Dict, Union
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Tuple, Dict, Union, Optional, Iterator, List, Iterable, FrozenSet, TYPE_CHECKING
 
 from rdflib import Graph, URIRef
-from rdflib.plugins.stores.sparqlstore import SPARQLUpdateStore, SPARQLStore
 from rdflib.query import Result
 from rdflib.store import Store
 from rdflib.term import Node
 
+from rdflib_orm.db.instrumentation import QueryStats
+from rdflib_orm.db.router import ReplicaRouter
+from rdflib_orm.db.transaction import Transaction
+
+if TYPE_CHECKING:
+    from rdflib_orm.db.cache import ResultCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,6 +29,16 @@ class InvalidDBKeyTypeError(Exception):
         return f'db_key must be a str, instead it received {value} with type {type(value)}.'
 
 
+def is_sparql_store(store: Store) -> bool:
+    """Whether the store is one of rdflib's SPARQL stores.
+
+    The SPARQL store plugin, and the HTTP client it pulls in, are only imported by whoever creates a SPARQL store.
+    Until then no store can be one, so local-only use never pays for importing it.
+    """
+    module = sys.modules.get('rdflib.plugins.stores.sparqlstore')
+    return module is not None and isinstance(store, module.SPARQLStore)
+
+
 def set_store_header_update(store: Store):
     """Call this function before any `Graph.add()` calls to set the appropriate request headers."""
     if 'headers' not in store.kwargs:
@@ -36,50 +58,434 @@ class Database:
     base_uri: URIRef
     databases: Dict[str, 'Database'] = {'default': None}
 
-    def __init__(self, g: Graph, base_uri: Union[str, URIRef]):
+    def __init__(self, g: Graph, base_uri: Union[str, URIRef], db_key: str = 'default', cache: 'ResultCache' = None,
+                 replicas: List[Graph] = None, read_strategy: str = 'round_robin'):
         self.g = g
         self.base_uri = URIRef(base_uri)
+        self.db_key = db_key
+        # Optional persistent cache of SPARQL query results.
+        self.cache = cache
+        # Graphs of the named graphs models are routed to with Meta.graph, by identifier.
+        self._graphs: Dict[URIRef, Graph] = dict()
 
-        if isinstance(g.store, SPARQLUpdateStore) or isinstance(g.store, SPARQLStore):
-            self.is_sparql_store = True
-        else:
-            self.is_sparql_store = False
+        # Reads are spread over the replicas, if any, while g is the primary taking every write.
+        self.router: Optional[ReplicaRouter] = ReplicaRouter(replicas, read_strategy) if replicas else None
+        self._replica_graphs: Dict[Tuple[int, URIRef], Graph] = dict()
+
+        self.is_sparql_store = is_sparql_store(g.store)
+        # rdflib's SPARQL stores send the headers of a dict shared by every request, which the store header
+        # functions switch between updates and reads. Threads other than the one creating the Database send their
+        # requests through copies of the stores of their own, see _thread_store().
+        self._owner = threading.get_ident()
+        self._local = threading.local()
+        self._headers_lock = threading.Lock()
+
+        # Incremented by every write made through this Database, including buffered ones.
+        # Caches of store content compare it to know when they are stale.
+        self.version = 0
+        # The version of the last write in each scope, a predicate or a class type, see version_of().
+        self.versions: Dict[URIRef, int] = dict()
+        # The version of the last write whose scope is not known, which is in every scope.
+        self.unscoped_version = 0
+        # Guards the versions, which writes made on several threads bump.
+        self._version_lock = threading.Lock()
+        # Secondary field indexes by model class, see rdflib_orm.indexes.
+        self.indexes: dict = dict()
+
+        # Instrumentation is off by default. The store calls only check self._instrumented.
+        self.stats: Optional[QueryStats] = None
+        self.slow_query_threshold: Optional[float] = None
+        self._collectors: List[QueryStats] = []
+        self._instrumented = False
+        # Guards the collectors and their counters, which store calls made on several threads update.
+        self._stats_lock = threading.Lock()
 
     @classmethod
     def get_db(cls, db_key: str = 'default') -> 'Database':
         return cls.databases[db_key]
 
     @classmethod
-    def set_db(cls, g: Graph, base_uri: Union[str, URIRef], db_key: str = 'default'):
+    def set_db(cls, g: Graph, base_uri: Union[str, URIRef], db_key: str = 'default', cache: 'ResultCache' = None,
+               replicas: List[Graph] = None, read_strategy: str = 'round_robin'):
+        """Register a database.
+
+        `g` is the primary, taking every write. Reads are sent to the `replicas`, when given, picked
+        by `read_strategy`, either `round_robin` or `least_latency`. Inside an `atomic()` block reads
+        stay on the primary so the transaction reads its own writes.
+        """
         if not isinstance(db_key, str):
             raise InvalidDBKeyTypeError(InvalidDBKeyTypeError.message(db_key))
-        cls.databases.update({db_key: Database(g, URIRef(base_uri))})
+        cls.databases.update({db_key: Database(g, URIRef(base_uri), db_key=db_key, cache=cache, replicas=replicas,
+                                               read_strategy=read_strategy)})
+
+    def snapshot(self, path: str):
+        """Database.get_db().snapshot('concepts.snapshot')
+
+        Write the triples of every graph in the store, the named graphs of models with `Meta.graph` included, to a
+        binary snapshot file to start from with `load_snapshot()`.
+        """
+        from rdflib_orm.db.snapshot import write_snapshot
+
+        write_snapshot(self.g, path)
+
+    @classmethod
+    def load_snapshot(cls, path: str, base_uri: Union[str, URIRef], db_key: str = 'default', **kwargs) -> 'Database':
+        """Database.load_snapshot('concepts.snapshot', base_uri)
+
+        Register a database over a snapshot written by `snapshot()`. The file is memory-mapped rather than parsed,
+        so this is near instant, and processes loading the same file share it in memory. Writes are kept in memory
+        on top of the snapshot, see `rdflib_orm.db.snapshot.SnapshotStore`. Other keyword arguments are passed to
+        `set_db()`.
+        """
+        from rdflib_orm.db.snapshot import load_snapshot
+
+        cls.set_db(load_snapshot(path), base_uri, db_key=db_key, **kwargs)
+        return cls.get_db(db_key)
+
+    @property
+    def transaction(self) -> Optional[Transaction]:
+        """The active unit of work of the current thread, set for the duration of an `atomic()` block."""
+        return getattr(self._local, 'transaction', None)
+
+    @transaction.setter
+    def transaction(self, transaction: Optional[Transaction]):
+        self._local.transaction = transaction
+
+    @property
+    def _scope(self) -> Optional[FrozenSet[URIRef]]:
+        """Keys of the active `scope()` block of the current thread, which the writes made inside it are attributed
+        to."""
+        return getattr(self._local, 'scope', None)
+
+    @_scope.setter
+    def _scope(self, keys: Optional[FrozenSet[URIRef]]):
+        self._local.scope = keys
+
+    def _bump(self, keys: Iterable[Optional[URIRef]] = None, scoped: bool = True):
+        """Count a write to the keys it touches: those of the active `scope()` block, or else the predicates written.
+        Without keys, or with a None predicate, the write is in every scope."""
+        if scoped and self._scope is not None:
+            keys = self._scope
+        keys = None if keys is None else set(keys)
+        with self._version_lock:
+            self.version += 1
+            if not scoped or not keys or None in keys:
+                self.unscoped_version = self.version
+                return
+            for key in keys:
+                self.versions[key] = self.version
+
+    def version_of(self, keys: Iterable[URIRef]) -> int:
+        """The version of the last write touching any of the keys, to tell whether a cache over them is stale."""
+        return max([self.unscoped_version] + [self.versions.get(key, 0) for key in keys])
+
+    @contextmanager
+    def scope(self, keys: Iterable[URIRef]):
+        """Attribute the writes made inside the block to the keys, rather than to the predicates they write.
+
+        `Model.save()` and `Model.delete()` scope their writes to the class types of the model, so they don't
+        invalidate the indexes of models of other types, see `rdflib_orm.indexes.Index`.
+        """
+        previous = self._scope
+        self._scope = frozenset(keys) | (previous or frozenset())
+        try:
+            yield
+        finally:
+            self._scope = previous
+
+    def graph_identifier(self, model_class: type) -> URIRef:
+        """Identifier of the named graph holding the instances of a model class.
+
+        Models are routed to a graph of their own with `Meta.graph`, resolved against `base_uri` when relative.
+        Models without one live in the graph of this database.
+        """
+        graph = getattr(model_class.Meta, 'graph', None)
+        if graph is None:
+            return self.g.identifier
+        if isinstance(graph, URIRef) or graph.startswith('http'):
+            return URIRef(graph)
+        return URIRef(self.base_uri + graph)
+
+    def _thread_store(self, store: Store) -> Store:
+        """The store to send the requests of the current thread to.
+
+        Threads other than the one that created the Database get a copy of each SPARQL store, with request headers
+        of their own, so a read on one thread can't go out with the headers of an update on another.
+        """
+        if not self.is_sparql_store or threading.get_ident() == self._owner:
+            return store
+        stores = self._local.__dict__.setdefault('stores', dict())
+        thread_store = stores.get(id(store))
+        if thread_store is None:
+            with self._headers_lock:
+                thread_store = copy.copy(store)
+                thread_store.kwargs = copy.deepcopy(store.kwargs)
+            stores[id(store)] = thread_store
+        return thread_store
+
+    def _graph_on(self, store: Store, identifier: URIRef, graphs: dict, key) -> Graph:
+        """A `Graph` of a named graph in a store, kept in `graphs` by `key`, or in the current thread's own if the
+        thread has its own copy of the store."""
+        thread_store = self._thread_store(store)
+        if thread_store is not store:
+            graphs = self._local.__dict__.setdefault('graphs', dict())
+        graph = graphs.get(key)
+        if graph is None:
+            graph = Graph(store=thread_store, identifier=identifier, namespace_manager=self.g.namespace_manager)
+            graphs[key] = graph
+        return graph
+
+    def _set_headers(self, store: Store, update: bool):
+        with self._headers_lock:
+            if update:
+                set_store_header_update(store)
+            else:
+                set_store_header_read(store)
 
-    def write(self, triple: Tuple[Union[Node, None], Union[Node, None], Union[Node, None]]):
-        logger.info(f'Adding triple {triple}')
+    def graph(self, identifier: URIRef = None) -> Graph:
+        """The `Graph` of a named graph in the store of this database."""
+        if identifier is None or identifier == self.g.identifier:
+            if self._thread_store(self.g.store) is self.g.store:
+                return self.g
+            identifier = self.g.identifier
+        return self._graph_on(self.g.store, identifier, self._graphs, identifier)
+
+    def _reader(self, identifier: URIRef = None) -> Tuple[Optional[int], Graph]:
+        """The replica index and `Graph` to send a read to, or None and the primary graph."""
+        if self.router is None or self.transaction is not None:
+            return None, self.graph(identifier)
+        replica = self.router.choose()
+        identifier = self.g.identifier if identifier is None else identifier
+        store = self.router.replicas[replica].store
+        return replica, self._graph_on(store, identifier, self._replica_graphs, (replica, identifier))
+
+    def _observe(self, replica: Optional[int], started: Optional[float]):
+        if replica is not None:
+            self.router.observe(replica, time.perf_counter() - started)
+
+    def replace_graph(self, identifier: URIRef, source: Union[Graph, str]):
+        """Replace the content of a named graph with the triples of a `Graph`, or the RDF document at a URL.
+
+        On SPARQL stores this is a single update request, a `DROP` followed by an `INSERT DATA` or a `LOAD`,
+        so the endpoint swaps the graph without a diff.
+        """
         if self.is_sparql_store:
-            set_store_header_update(self.g.store)
-        self.g.add(triple)
+            if isinstance(source, Graph):
+                data = ' '.join(f'{s.n3()} {p.n3()} {o.n3()} .' for s, p, o in source)
+                load = f'INSERT DATA {{ GRAPH <{identifier}> {{ {data} }} }}'
+            else:
+                load = f'LOAD <{source}> INTO GRAPH <{identifier}>'
+            query = f'DROP SILENT GRAPH <{identifier}> ;\n{load}'
+            logger.info(query)
+            self.sparql_update(query)
+            return
+
+        if not isinstance(source, Graph):
+            source = Graph().parse(source)
+        if self.transaction is not None:
+            self.delete((None, None, None), graph=identifier)
+            for triple in source:
+                self.write(triple, graph=identifier)
+            return
+
+        logger.info('Replacing graph %s with %d triples', identifier, len(source))
+        self._bump(scoped=False)
+        self._invalidate_cache()
+        graph = self.graph(identifier)
+        started = time.perf_counter() if self._instrumented else None
+        graph.remove((None, None, None))
+        if started is not None:
+            self._record('delete', started)
+        started = time.perf_counter() if self._instrumented else None
+        graph.addN((s, p, o, graph) for s, p, o in source)
+        if started is not None:
+            self._record('write', started, triples=len(source))
+
+    @contextmanager
+    def atomic(self) -> Iterator[Transaction]:
+        """Group writes into a single unit of work.
+
+        Writes, deletes and SPARQL updates made inside the block are buffered and flushed on exit
+        as one SPARQL UPDATE request (or one batch of `Graph` operations for local stores).
+        Nothing is written if the block raises. Nested blocks act as savepoints of the outer one.
+        `read()` sees the buffered writes, `sparql()` doesn't until the block exits.
+        The unit of work is per thread: writes of other threads go to the store, or to transactions of their own.
+
+            with Database.get_db().atomic():
+                concept_a.save()
+                concept_b.save()
+        """
+        if self.transaction is not None:
+            savepoint = self.transaction.savepoint()
+            try:
+                yield self.transaction
+            except Exception:
+                self.transaction.rollback(savepoint)
+                self._bump(scoped=False)
+                raise
+            return
+
+        transaction = Transaction(self)
+        self.transaction = transaction
+        try:
+            yield transaction
+        except Exception:
+            logger.info('Discarding transaction')
+            self._bump(scoped=False)
+            raise
+        else:
+            # Unset the transaction first so the flush goes to the store.
+            self.transaction = None
+            try:
+                transaction.commit()
+            except Exception:
+                # The store may be partly written, so anything cached from it is stale.
+                self._bump(scoped=False)
+                raise
+        finally:
+            self.transaction = None
+
+    def enable_instrumentation(self, slow_query_threshold: float = None) -> QueryStats:
+        """Start collecting stats for every store call into `Database.stats`.
+
+        Queries and updates slower than `slow_query_threshold` seconds are logged as warnings.
+        """
+        if self.stats is None:
+            self.stats = QueryStats()
+            with self._stats_lock:
+                self._collectors.append(self.stats)
+        self.slow_query_threshold = slow_query_threshold
+        self._update_instrumented()
+        return self.stats
+
+    def disable_instrumentation(self):
+        if self.stats is not None:
+            with self._stats_lock:
+                self._collectors.remove(self.stats)
+            self.stats = None
+        self.slow_query_threshold = None
+        self._update_instrumented()
+
+    @contextmanager
+    def capture(self) -> Iterator[QueryStats]:
+        """Collect stats for the store calls made inside the block only.
+
+            with db.capture() as stats:
+                Concept.objects.get(uri)
+            assert stats.round_trips <= 2
+        """
+        stats = QueryStats()
+        with self._stats_lock:
+            self._collectors.append(stats)
+        self._update_instrumented()
+        try:
+            yield stats
+        finally:
+            with self._stats_lock:
+                self._collectors.remove(stats)
+            self._update_instrumented()
+
+    def _update_instrumented(self):
+        self._instrumented = bool(self._collectors) or self.slow_query_threshold is not None
+
+    def _record(self, operation: str, started: float, query: str = None, triples: int = 0):
+        duration = time.perf_counter() - started
+        nbytes = len(query.encode('utf-8')) if query is not None else 0
+        is_slow = self.slow_query_threshold is not None and duration > self.slow_query_threshold
+        with self._stats_lock:
+            for stats in self._collectors:
+                stats.record(operation, duration, triples=triples, nbytes=nbytes)
+                if is_slow:
+                    stats.slow_queries += 1
+        if is_slow:
+            logger.warning('Slow %s took %.3fs:\n%s', operation, duration, query if query is not None else '')
+
+    def write(self, triple: Tuple[Union[Node, None], Union[Node, None], Union[Node, None]], graph: URIRef = None):
+        logger.debug('Adding triple %s', triple)
+        self._bump((triple[1],))
+        if self.transaction is not None:
+            self.transaction.add(triple, graph)
+            return
+        started = time.perf_counter() if self._instrumented else None
+        self._invalidate_cache()
+        target = self.graph(graph)
+        if self.is_sparql_store:
+            self._set_headers(target.store, update=True)
+        target.add(triple)
+        if started is not None:
+            self._record('write', started, triples=1)
 
         # if isinstance(cls.g.store, SPARQLUpdateStore) or isinstance(cls.g.store, SPARQLStore):
         #     set_store_header_update(cls.g.store)
         # cls.g.add(triple)
 
-    def delete(self, triple: Tuple[Union[Node, None], Union[Node, None], Union[Node, None]]):
-        logger.info(f'Deleting triple {triple}')
+    def write_many(self, triples: List[Tuple[Node, Node, Node]], graph: URIRef = None):
+        """Add many triples at once, as a single SPARQL update or one `Graph.addN()` call for local stores."""
+        if not triples:
+            return
+        if self.transaction is not None:
+            # Buffered like single writes, so reads in the transaction see them.
+            self._bump({p for _, p, _ in triples})
+            for triple in triples:
+                self.transaction.add(triple, graph)
+            return
+        if self.is_sparql_store:
+            data = ' '.join(f'{s.n3()} {p.n3()} {o.n3()} .' for s, p, o in triples)
+            identifier = self.g.identifier if graph is None else graph
+            self._bump({p for _, p, _ in triples})
+            self._update(f'INSERT DATA {{ GRAPH <{identifier}> {{ {data} }} }}')
+            return
+        self._bump({p for _, p, _ in triples})
+        started = time.perf_counter() if self._instrumented else None
+        self._invalidate_cache()
+        target = self.graph(graph)
+        target.addN((s, p, o, target) for s, p, o in triples)
+        if started is not None:
+            self._record('write', started, triples=len(triples))
+
+    def delete(self, triple: Tuple[Union[Node, None], Union[Node, None], Union[Node, None]], graph: URIRef = None):
+        logger.debug('Deleting triple %s', triple)
+        self._bump((triple[1],))
+        if self.transaction is not None:
+            self.transaction.remove(triple, graph)
+            return
+        started = time.perf_counter() if self._instrumented else None
+        self._invalidate_cache()
+        target = self.graph(graph)
         if self.is_sparql_store:
-            set_store_header_update(self.g.store)
-        self.g.remove(triple)
+            self._set_headers(target.store, update=True)
+        target.remove(triple)
+        if started is not None:
+            # The number of triples matched by a pattern delete is not known.
+            self._record('delete', started, triples=0 if None in triple else 1)
         # if isinstance(cls.g.store, SPARQLUpdateStore) or isinstance(cls.g.store, SPARQLStore):
         #     set_store_header_update(cls.g.store)
         # cls.g.remove(triple)
 
-    def read(self, triple: Tuple[Union[Node, None], Union[Node, None], Union[Node, None]]):
+    def read(self, triple: Tuple[Union[Node, None], Union[Node, None], Union[Node, None]], graph: URIRef = None):
+        if self.transaction is not None:
+            # Read your own buffered writes.
+            yield from self.transaction.triples(triple, graph)
+        else:
+            yield from self._triples(triple, graph)
+
+    def _triples(self, triple: Tuple[Union[Node, None], Union[Node, None], Union[Node, None]], graph: URIRef = None):
+        replica, reader = self._reader(graph)
+        started = time.perf_counter() if self._instrumented or replica is not None else None
+        debug = logger.isEnabledFor(logging.DEBUG)
+        count = 0
         if self.is_sparql_store:
-            set_store_header_read(self.g.store)
-        for s, p, o in self.g.triples(triple):
-            logger.info(f'reading triple {(s, p, o)}')
-            yield s, p, o
+            self._set_headers(reader.store, update=False)
+        try:
+            for s, p, o in reader.triples(triple):
+                if debug:
+                    logger.debug('Reading triple %s', (s, p, o))
+                count += 1
+                yield s, p, o
+        finally:
+            self._observe(replica, started)
+            if self._instrumented and started is not None:
+                self._record('read', started, triples=count)
         # if isinstance(cls.g.store, SPARQLUpdateStore) or isinstance(cls.g.store, SPARQLStore):
         #     set_store_header_read(cls.g.store)
         # for s, p, o in cls.g.triples(triple):
@@ -87,23 +493,52 @@ class Database:
         #     yield s, p, o
 
     def sparql_update(self, query: str):
+        self._bump()
+        if self.transaction is not None:
+            self.transaction.update(query)
+            return
+        self._update(query)
+
+    def _update(self, query: str):
+        started = time.perf_counter() if self._instrumented else None
+        self._invalidate_cache()
+        store = self._thread_store(self.g.store)
         if self.is_sparql_store:
-            set_store_header_update(self.g.store)
+            self._set_headers(store, update=True)
         try:
-            self.g.store.update(query)
+            store.update(query)
         except Exception as e:
             raise Exception(f'{e}\nFailed with SPARQL query:\n{query}')
+        if started is not None:
+            self._record('update', started, query=query)
         # if isinstance(cls.g.store, SPARQLUpdateStore):
         #     set_store_header_update(cls.g.store)
         # cls.g.store.update(query)
 
+    def _invalidate_cache(self):
+        if self.cache is not None:
+            self.cache.invalidate(self.db_key)
+
     def sparql(self, query: str) -> Result:
+        if self.cache is not None:
+            cached = self.cache.get(self.db_key, query)
+            if cached is not None:
+                return Result.parse(io.BytesIO(cached), format='json')
+
+        replica, reader = self._reader()
+        started = time.perf_counter() if self._instrumented or replica is not None else None
         if self.is_sparql_store:
-            set_store_header_read(self.g.store)
+            self._set_headers(reader.store, update=False)
         try:
-            result = self.g.store.query(query)
+            result = reader.store.query(query)
         except Exception as e:
             raise Exception(f'{e}\nFailed with SPARQL query:\n{query}')
+        self._observe(replica, started)
+        if self._instrumented and started is not None:
+            self._record('query', started, query=query)
+
+        if self.cache is not None and result.type in ('SELECT', 'ASK'):
+            self.cache.set(self.db_key, query, result.serialize(format='json'))
         return result
         # if isinstance(cls.g.store, SPARQLStore):
         #     set_store_header_read(cls.g.store)
@@ -0,0 +1,98 @@
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """Persistent SPARQL query result cache backed by SQLite.
+
+    Results are keyed by the `db_key` of the `Database` and the normalised query text, and stored as
+    SPARQL JSON results. Entries expire after `ttl` seconds, and the least recently used entries are
+    evicted once the cached results exceed `max_size` bytes. Any write through a `Database` invalidates
+    that database's entries. The cache file can be shared by several processes, so warm restarts serve
+    results from disk.
+
+        Database.set_db(g, base_uri, cache=ResultCache('results.sqlite', ttl=3600))
+    """
+    def __init__(self, path: str, ttl: float = None, max_size: int = None):
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                db_key TEXT NOT NULL,
+                query TEXT NOT NULL,
+                result BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                PRIMARY KEY (db_key, query)
+            )
+        """)
+        self.connection.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Strip indentation, blank lines and comment lines so formatting changes do not miss the cache."""
+        lines = (line.strip() for line in query.splitlines())
+        return '\n'.join(line for line in lines if line and not line.startswith('#'))
+
+    def get(self, db_key: str, query: str) -> Optional[bytes]:
+        query = self.normalize(query)
+        now = time.time()
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT result, created FROM results WHERE db_key = ? AND query = ?', (db_key, query)
+            ).fetchone()
+            if row is None:
+                return None
+            result, created = row
+            if self.ttl is not None and now - created > self.ttl:
+                self.connection.execute('DELETE FROM results WHERE db_key = ? AND query = ?', (db_key, query))
+                return None
+            self.connection.execute(
+                'UPDATE results SET accessed = ? WHERE db_key = ? AND query = ?', (now, db_key, query)
+            )
+        return result
+
+    def set(self, db_key: str, query: str, result: bytes):
+        query = self.normalize(query)
+        now = time.time()
+        with self._lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO results (db_key, query, result, size, created, accessed) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (db_key, query, result, len(result), now, now)
+            )
+            if self.max_size is not None:
+                self._evict()
+
+    def _evict(self):
+        total, = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()
+        if total <= self.max_size:
+            return
+        rows = self.connection.execute('SELECT db_key, query, size FROM results ORDER BY accessed').fetchall()
+        for db_key, query, size in rows:
+            if total <= self.max_size:
+                break
+            self.connection.execute('DELETE FROM results WHERE db_key = ? AND query = ?', (db_key, query))
+            total -= size
+
+    def invalidate(self, db_key: str):
+        """Drop every cached result of a database."""
+        with self._lock:
+            self.connection.execute('DELETE FROM results WHERE db_key = ?', (db_key,))
+
+    def clear(self):
+        with self._lock:
+            self.connection.execute('DELETE FROM results')
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,68 @@
+import bisect
+from typing import Dict, List
+
+
+class QueryStats:
+    """Round-trip counters, byte counts and latency histograms for the store calls made through a `Database`.
+
+    On SPARQL stores every call is a network round trip. On local stores the same counters
+    measure calls into the rdflib store.
+    """
+    # Upper bounds in seconds of the latency histogram buckets.
+    buckets = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float('inf'))
+    operations = ('query', 'update', 'read', 'write', 'delete')
+
+    def __init__(self):
+        self.calls: Dict[str, int] = {operation: 0 for operation in self.operations}
+        self.time: Dict[str, float] = {operation: 0.0 for operation in self.operations}
+        self.histograms: Dict[str, List[int]] = {operation: [0] * len(self.buckets) for operation in self.operations}
+        self.triples_read = 0
+        self.triples_written = 0
+        self.triples_deleted = 0
+        self.bytes_sent = 0
+        self.slow_queries = 0
+
+    def __repr__(self):
+        calls = ', '.join(f'{operation}={count}' for operation, count in self.calls.items())
+        return f'<{self.__class__.__name__} round_trips={self.round_trips} [{calls}]>'
+
+    @property
+    def queries(self) -> int:
+        return self.calls['query']
+
+    @property
+    def updates(self) -> int:
+        return self.calls['update']
+
+    @property
+    def round_trips(self) -> int:
+        return sum(self.calls.values())
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.time.values())
+
+    def record(self, operation: str, duration: float, triples: int = 0, nbytes: int = 0):
+        self.calls[operation] += 1
+        self.time[operation] += duration
+        self.histograms[operation][bisect.bisect_left(self.buckets, duration)] += 1
+        self.bytes_sent += nbytes
+        if operation == 'read':
+            self.triples_read += triples
+        elif operation == 'write':
+            self.triples_written += triples
+        elif operation == 'delete':
+            self.triples_deleted += triples
+
+    def as_dict(self) -> dict:
+        return {
+            'round_trips': self.round_trips,
+            'calls': dict(self.calls),
+            'time': dict(self.time),
+            'histograms': {operation: dict(zip(self.buckets, counts)) for operation, counts in self.histograms.items()},
+            'triples_read': self.triples_read,
+            'triples_written': self.triples_written,
+            'triples_deleted': self.triples_deleted,
+            'bytes_sent': self.bytes_sent,
+            'slow_queries': self.slow_queries,
+        }
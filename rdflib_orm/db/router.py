@@ -0,0 +1,60 @@
+import itertools
+import threading
+from typing import List
+
+from rdflib import Graph
+
+
+class ReplicaRouter:
+    """Picks the read replica each read of a `Database` is sent to.
+
+    `round_robin` cycles through the replicas in order. `least_latency` sends each read to the replica with the
+    lowest moving average of observed read latencies, trying every replica at least once. Every `probe_interval`th
+    read goes to the replica chosen longest ago instead, so the averages of replicas that were slow keep being
+    updated and they win reads back once they recover.
+    """
+    strategies = ('round_robin', 'least_latency')
+
+    def __init__(self, replicas: List[Graph], strategy: str = 'round_robin', smoothing: float = 0.2,
+                 probe_interval: int = 20):
+        if not replicas:
+            raise ValueError('A ReplicaRouter needs at least one replica.')
+        if strategy not in self.strategies:
+            raise ValueError(f'Unknown read strategy {strategy}, expected one of {self.strategies}.')
+        self.replicas = replicas
+        self.strategy = strategy
+        # Weight of the latest observation in the latency moving averages.
+        self.smoothing = smoothing
+        # Moving average of the read latency of each replica in seconds, None until first observed.
+        self.latencies: List[float] = [None] * len(replicas)
+        self.probe_interval = probe_interval
+        # Number of least_latency reads, and the read each replica was last chosen for.
+        self._reads = 0
+        self._chosen_at: List[int] = [0] * len(replicas)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def choose(self) -> int:
+        """Index of the replica to send the next read to."""
+        if self.strategy == 'round_robin':
+            return next(self._counter) % len(self.replicas)
+        with self._lock:
+            self._reads += 1
+            replicas = range(len(self.replicas))
+            if None in self.latencies:
+                replica = self.latencies.index(None)
+            elif self.probe_interval and self._reads % self.probe_interval == 0:
+                replica = min(replicas, key=self._chosen_at.__getitem__)
+            else:
+                replica = min(replicas, key=self.latencies.__getitem__)
+            self._chosen_at[replica] = self._reads
+            return replica
+
+    def observe(self, replica: int, duration: float):
+        """Record the latency of a read sent to a replica."""
+        with self._lock:
+            latency = self.latencies[replica]
+            if latency is None:
+                self.latencies[replica] = duration
+            else:
+                self.latencies[replica] = latency + self.smoothing * (duration - latency)
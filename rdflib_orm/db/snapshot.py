@@ -0,0 +1,321 @@
+"""Memory-mapped binary snapshots of a store, for near instant warm starts of in-memory databases.
+
+A snapshot holds a dictionary of every distinct term, sorted by its encoding, and the triples of every graph in the
+store as rows of term ids sorted in GSPO and GPOS order. As rows are sorted by graph first, each graph spans one
+range of both indexes. `SnapshotStore` memory-maps the file and answers triple patterns with binary searches over
+those indexes, decoding only the terms it returns. Nothing is parsed at startup, and worker processes opening the
+same snapshot share its pages through the OS page cache.
+
+Layout, little-endian::
+
+    magic           8 bytes
+    header          term count, quad count, graph count, default graph term id (4 x uint64)
+    graphs          graph count x (graph term id, first row, end row) (3 x uint64)
+    term offsets    term count + 1 x uint64
+    term data       encoded terms
+    gspo            quad count x 4 x uint32
+    gpos            quad count x 4 x uint32
+
+Sections are padded to 8 bytes.
+"""
+import bisect
+import functools
+import mmap
+import struct
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from rdflib import Graph, URIRef, BNode, Literal
+from rdflib.plugins.stores.memory import Memory
+from rdflib.store import Store
+from rdflib.term import Node
+
+MAGIC = b'RDFORM\x00\x02'
+HEADER = struct.Struct('<QQQQ')
+GRAPH = struct.Struct('<QQQ')
+SEPARATOR = b'\x00'
+# Term ids per row of the indexes.
+WIDTH = 4
+
+Triple = Tuple[Node, Node, Node]
+
+
+def _encode(term: Node) -> bytes:
+    """Bytes of a term, unique to it. Literals end with their lexical form, which is the only part that may hold
+    the separator."""
+    if isinstance(term, URIRef):
+        return b'U' + str(term).encode('utf-8')
+    if isinstance(term, BNode):
+        return b'B' + str(term).encode('utf-8')
+    if isinstance(term, Literal):
+        lang = (term.language or '').encode('utf-8')
+        datatype = str(term.datatype or '').encode('utf-8')
+        return b'L' + lang + SEPARATOR + datatype + SEPARATOR + str(term).encode('utf-8')
+    raise TypeError(f'Cannot snapshot term {term!r} of type {type(term)}.')
+
+
+def _decode(data: bytes) -> Node:
+    kind, rest = data[:1], data[1:]
+    if kind == b'U':
+        return URIRef(rest.decode('utf-8'))
+    if kind == b'B':
+        return BNode(rest.decode('utf-8'))
+    lang, datatype, lexical = rest.split(SEPARATOR, 2)
+    return Literal(lexical.decode('utf-8'), lang=lang.decode('utf-8') or None,
+                   datatype=URIRef(datatype.decode('utf-8')) if datatype else None)
+
+
+def _pad(size: int) -> bytes:
+    return b'\x00' * (-size % 8)
+
+
+def _identifier(context) -> Node:
+    return context.identifier if isinstance(context, Graph) else context
+
+
+def write_snapshot(graph: Graph, path: str):
+    """Write the triples of every graph in the store of a graph to a snapshot file, with the graph as its default
+    graph."""
+    store = graph.store
+    identifiers = {graph.identifier}
+    if store.context_aware:
+        identifiers.update(_identifier(context) for context in store.contexts())
+    quads = [
+        (identifier, s, p, o)
+        for identifier in identifiers for s, p, o in Graph(store=store, identifier=identifier)
+    ]
+
+    encoded = {term: _encode(term) for quad in quads for term in quad}
+    encoded.update((identifier, _encode(identifier)) for identifier in identifiers)
+    ordered = sorted(set(encoded.values()))
+    ids = {data: i for i, data in enumerate(ordered)}
+    rows = sorted(tuple(ids[encoded[term]] for term in quad) for quad in quads)
+
+    graphs = array('Q')
+    for identifier in sorted(ids[encoded[identifier]] for identifier in identifiers):
+        start, end = bisect.bisect_left(rows, (identifier,)), bisect.bisect_left(rows, (identifier + 1,))
+        graphs.extend((identifier, start, end))
+    offsets = array('Q', [0])
+    for data in ordered:
+        offsets.append(offsets[-1] + len(data))
+    gspo = array('I', (i for row in rows for i in row))
+    gpos = array('I', (i for g, p, o, s in sorted((g, p, o, s) for g, s, p, o in rows) for i in (g, p, o, s)))
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(HEADER.pack(len(ordered), len(rows), len(identifiers), ids[encoded[graph.identifier]]))
+        f.write(graphs.tobytes())
+        f.write(offsets.tobytes())
+        term_data = b''.join(ordered)
+        f.write(term_data + _pad(len(term_data)))
+        f.write(gspo.tobytes())
+        f.write(gpos.tobytes())
+
+
+def _bounds(index: memoryview, start: int, end: int, prefix: tuple) -> Tuple[int, int]:
+    """Rows in [start, end) of a sorted index whose term ids after the graph id start with the prefix, as a
+    [start, end) range."""
+    k = len(prefix)
+    lo, hi = start, end
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if tuple(index[WIDTH * mid + 1:WIDTH * mid + 1 + k]) < prefix:
+            lo = mid + 1
+        else:
+            hi = mid
+    first, hi = lo, end
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if tuple(index[WIDTH * mid + 1:WIDTH * mid + 1 + k]) <= prefix:
+            lo = mid + 1
+        else:
+            hi = mid
+    return first, lo
+
+
+class SnapshotStore(Store):
+    """A read-mostly, context-aware rdflib store over a memory-mapped snapshot file, see `write_snapshot()`.
+
+    Writes go to an in-memory overlay on top of the snapshot, which is never modified: added triples are kept in an
+    rdflib `Memory` store, indexed like the snapshot, and removed ones in a set per graph. Take a new snapshot to
+    fold them in.
+    """
+    context_aware = True
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+
+    def __init__(self, path: str, decoded_cache_size: int = 65536):
+        super(SnapshotStore, self).__init__()
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f'{path} is not an rdflib-orm snapshot.')
+        position = len(MAGIC)
+        self._terms, self._count, graph_count, default = HEADER.unpack_from(self._mmap, position)
+        position += HEADER.size
+        graphs = [GRAPH.unpack_from(self._mmap, position + i * GRAPH.size) for i in range(graph_count)]
+        position += graph_count * GRAPH.size
+
+        self._offsets = view[position:position + 8 * (self._terms + 1)].cast('Q')
+        position += 8 * (self._terms + 1)
+        size = self._offsets[self._terms]
+        self._data = view[position:position + size]
+        position += size + len(_pad(size))
+        self._gspo = view[position:position + 4 * WIDTH * self._count].cast('I')
+        position += 4 * WIDTH * self._count
+        self._gpos = view[position:position + 4 * WIDTH * self._count].cast('I')
+
+        self._term = functools.lru_cache(maxsize=decoded_cache_size)(self._decode_term)
+        self.identifier = self._term(default)
+        # Row range of each graph in both indexes, by graph identifier.
+        self._ranges: Dict[Node, Tuple[int, int]] = {self._term(i): (start, end) for i, start, end in graphs}
+
+        self._added = Memory()
+        self._overlays: Dict[Node, Graph] = dict()
+        self._removed: Dict[Node, set] = dict()
+
+    def close(self, commit_pending_transaction: bool = False):
+        for view in (self._offsets, self._data, self._gspo, self._gpos):
+            view.release()
+        self._mmap.close()
+
+    def _term_bytes(self, i: int) -> bytes:
+        return bytes(self._data[self._offsets[i]:self._offsets[i + 1]])
+
+    def _decode_term(self, i: int) -> Node:
+        return _decode(self._term_bytes(i))
+
+    def _id(self, term: Node) -> Optional[int]:
+        """Id of a term in the snapshot, or None if it isn't in it."""
+        try:
+            key = _encode(term)
+        except TypeError:
+            return None
+        lo, hi = 0, self._terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self._terms and self._term_bytes(lo) == key else None
+
+    def _overlay(self, identifier: Node) -> Graph:
+        """The graph of the added triples of a graph."""
+        overlay = self._overlays.get(identifier)
+        if overlay is None:
+            overlay = self._overlays[identifier] = Graph(store=self._added, identifier=identifier)
+        return overlay
+
+    def _identifiers(self, context) -> List[Node]:
+        """Identifiers of the graphs a pattern with the context is matched against, every graph without one."""
+        if context is not None:
+            return [_identifier(context)]
+        return list(dict.fromkeys([*self._ranges, *self._overlays]))
+
+    def _snapshot_triples(self, pattern: Tuple[Optional[Node], Optional[Node], Optional[Node]],
+                          identifier: Node) -> Iterator[Triple]:
+        if identifier not in self._ranges:
+            return
+        start, end = self._ranges[identifier]
+        ids = list()
+        for term in pattern:
+            if term is None:
+                ids.append(None)
+                continue
+            term_id = self._id(term)
+            if term_id is None:
+                return
+            ids.append(term_id)
+        s, p, o = ids
+
+        if s is not None:
+            prefix = (s,) if p is None else (s, p) if o is None else (s, p, o)
+            index, order = self._gspo, (1, 2, 3)
+        elif p is not None:
+            prefix = (p,) if o is None else (p, o)
+            index, order = self._gpos, (3, 1, 2)
+        else:
+            prefix = ()
+            index, order = self._gspo, (1, 2, 3)
+        if prefix:
+            start, end = _bounds(index, start, end, prefix)
+
+        term = self._term
+        for row in range(start, end):
+            ids_of_row = index[WIDTH * row:WIDTH * row + WIDTH]
+            triple = tuple(ids_of_row[i] for i in order)
+            # Patterns the indexes can't answer by prefix, (s, None, o) and (None, None, o), are filtered here.
+            if o is not None and triple[2] != o:
+                continue
+            yield term(triple[0]), term(triple[1]), term(triple[2])
+
+    def _graph_triples(self, pattern, identifier: Node) -> Iterator[Triple]:
+        removed = self._removed.get(identifier, ())
+        for triple in self._snapshot_triples(pattern, identifier):
+            if triple not in removed:
+                yield triple
+        if identifier in self._overlays:
+            for triple, _ in self._added.triples(pattern, self._overlays[identifier]):
+                yield triple
+
+    def triples(self, triple_pattern, context=None):
+        identifiers = self._identifiers(context)
+        # A triple in several graphs is returned once when matching every graph.
+        seen = set() if len(identifiers) > 1 else None
+        for identifier in identifiers:
+            graph = None
+            for triple in self._graph_triples(triple_pattern, identifier):
+                if seen is not None:
+                    if triple in seen:
+                        continue
+                    seen.add(triple)
+                if graph is None:
+                    graph = Graph(store=self, identifier=identifier)
+                yield triple, iter((graph,))
+
+    def _in_snapshot(self, triple: Triple, identifier: Node) -> bool:
+        return next(self._snapshot_triples(triple, identifier), None) is not None
+
+    def add(self, triple, context, quoted=False):
+        super(SnapshotStore, self).add(triple, context, quoted)
+        identifier = _identifier(context) if context is not None else self.identifier
+        removed = self._removed.get(identifier, ())
+        if triple in removed:
+            removed.discard(triple)
+        elif not self._in_snapshot(triple, identifier):
+            self._added.add(triple, self._overlay(identifier))
+
+    def remove(self, triple_pattern, context=None):
+        super(SnapshotStore, self).remove(triple_pattern, context)
+        for identifier in self._identifiers(context):
+            overlay = self._overlays.get(identifier)
+            for triple in list(self._graph_triples(triple_pattern, identifier)):
+                if overlay is not None and next(self._added.triples(triple, overlay), None) is not None:
+                    self._added.remove(triple, overlay)
+                else:
+                    self._removed.setdefault(identifier, set()).add(triple)
+
+    def __len__(self, context=None) -> int:
+        if context is None:
+            return sum(self.__len__(identifier) for identifier in self._identifiers(None))
+        identifier = _identifier(context)
+        start, end = self._ranges.get(identifier, (0, 0))
+        overlay = self._overlays.get(identifier)
+        added = self._added.__len__(overlay) if overlay is not None else 0
+        return end - start - len(self._removed.get(identifier, ())) + added
+
+    def contexts(self, triple=None):
+        for identifier in self._identifiers(None):
+            if triple is None or next(self._graph_triples(triple, identifier), None) is not None:
+                yield Graph(store=self, identifier=identifier)
+
+
+def load_snapshot(path: str) -> Graph:
+    """A `Graph` over a memory-mapped snapshot, with the identifier of the graph it was taken from. The other graphs
+    of the snapshot are in its store."""
+    store = SnapshotStore(path)
+    return Graph(store=store, identifier=store.identifier)
@@ -0,0 +1,213 @@
+import logging
+import time
+from typing import Tuple, Dict, Union, List, Iterator
+
+from rdflib import URIRef, BNode
+from rdflib.term import Node
+
+logger = logging.getLogger(__name__)
+
+Triple = Tuple[Union[Node, None], Union[Node, None], Union[Node, None]]
+# A triple and the identifier of the named graph it is in.
+Quad = Tuple[Node, Node, Node, URIRef]
+
+
+def _matches(pattern: Triple, triple: Triple) -> bool:
+    return all(p is None or p == t for p, t in zip(pattern, triple))
+
+
+class Transaction:
+    """Unit of work buffering the writes of a `Database.atomic()` block.
+
+    Triple writes and deletes are kept in memory, in order, with the last operation on a triple winning.
+    Raw SPARQL updates are kept in sequence with them. On commit, everything is flushed as a single
+    SPARQL UPDATE request, or as one batched set of `Graph` operations for local stores.
+
+    Only `Database.read()`, and so the ORM reads going through it, see the buffered writes. SPARQL queries and
+    updates sent with `Database.sparql()` and `Database.sparql_update()` run against the store as it was before the
+    block.
+    """
+    def __init__(self, db: 'Database'):
+        self.db = db
+        # Each operation is either a raw SPARQL update string or a block of quads mapped to
+        # True (add) or False (remove).
+        self.operations: List[Union[str, Dict[Quad, bool]]] = []
+        # Final buffered state of every quad touched so far, used to overlay reads.
+        self.state: Dict[Quad, bool] = dict()
+        # Previous state values, replayed backwards when rolling back to a savepoint.
+        self.journal: List[Tuple[Quad, Union[bool, None]]] = []
+
+    def _block(self) -> Dict[Quad, bool]:
+        if not self.operations or isinstance(self.operations[-1], str):
+            self.operations.append(dict())
+        return self.operations[-1]
+
+    def _graph(self, graph: Union[URIRef, None]) -> URIRef:
+        return self.db.g.identifier if graph is None else graph
+
+    def _set_state(self, quad: Quad, added: bool):
+        self.journal.append((quad, self.state.get(quad)))
+        self.state[quad] = added
+
+    def add(self, triple: Triple, graph: URIRef = None):
+        quad = (*triple, self._graph(graph))
+        self._block()[quad] = True
+        self._set_state(quad, True)
+
+    def remove(self, triple: Triple, graph: URIRef = None):
+        if None in triple:
+            # Expand the pattern against the store and the buffer so the flush only deals in concrete triples.
+            triples = list(self.triples(triple, graph))
+        else:
+            triples = [triple]
+        graph = self._graph(graph)
+        block = self._block()
+        for item in triples:
+            quad = (*item, graph)
+            block[quad] = False
+            self._set_state(quad, False)
+
+    def update(self, query: str):
+        self.operations.append(query)
+
+    def triples(self, pattern: Triple, graph: URIRef = None) -> Iterator[Triple]:
+        """Read from the store with the buffered writes applied on top.
+
+        Effects of buffered raw SPARQL updates are not visible until commit.
+        """
+        identifier = self._graph(graph)
+        seen = set()
+        for triple in self.db._triples(pattern, graph):
+            seen.add(triple)
+            if self.state.get((*triple, identifier), True):
+                yield triple
+        for (s, p, o, g), added in list(self.state.items()):
+            if added and g == identifier and (s, p, o) not in seen and _matches(pattern, (s, p, o)):
+                yield s, p, o
+
+    def savepoint(self) -> Tuple[int, int]:
+        savepoint = len(self.operations), len(self.journal)
+        # Start a new block so a rollback never has to unpick a partially shared one.
+        self.operations.append(dict())
+        return savepoint
+
+    def rollback(self, savepoint: Tuple[int, int]):
+        operations_length, journal_length = savepoint
+        del self.operations[operations_length:]
+        while len(self.journal) > journal_length:
+            triple, previous = self.journal.pop()
+            if previous is None:
+                self.state.pop(triple, None)
+            else:
+                self.state[triple] = previous
+
+    def _coalesce(self) -> List[Union[str, Dict[Quad, bool]]]:
+        operations = list()
+        for operation in self.operations:
+            if isinstance(operation, dict):
+                if not operation:
+                    continue
+                if operations and isinstance(operations[-1], dict):
+                    operations[-1].update(operation)
+                    continue
+                operation = dict(operation)
+            operations.append(operation)
+        return operations
+
+    @staticmethod
+    def _by_graph(operation: Dict[Quad, bool], added: bool) -> Dict[URIRef, List[Triple]]:
+        """The added or removed triples of a block, grouped by named graph."""
+        triples = dict()
+        for (s, p, o, graph), value in operation.items():
+            if value == added:
+                triples.setdefault(graph, []).append((s, p, o))
+        return triples
+
+    @staticmethod
+    def _graph_data(triples: Dict[URIRef, List[Triple]]) -> str:
+        return ' '.join(
+            f'GRAPH <{graph}> {{ ' + ' '.join(f'{s.n3()} {p.n3()} {o.n3()} .' for s, p, o in items) + ' }'
+            for graph, items in triples.items()
+        )
+
+    @staticmethod
+    def _bnode_groups(triples: List[Triple]) -> List[List[Triple]]:
+        """Triples holding blank nodes, grouped so that triples sharing a blank node are in the same group."""
+        groups: List[Tuple[set, List[Triple]]] = []
+        for triple in triples:
+            bnodes = {term for term in triple if isinstance(term, BNode)}
+            merged = [group for group in groups if group[0] & bnodes]
+            for group in merged:
+                groups.remove(group)
+                bnodes |= group[0]
+            groups.append((bnodes, [item for group in merged for item in group[1]] + [triple]))
+        return [items for _, items in groups]
+
+    @classmethod
+    def _delete_statements(cls, removed: Dict[URIRef, List[Triple]]) -> List[str]:
+        """SPARQL statements deleting triples by graph.
+
+        SPARQL 1.1 doesn't allow blank nodes in `DELETE DATA`, so triples holding them are deleted with a
+        `DELETE WHERE` per group of triples sharing blank nodes, the blank nodes standing for variables.
+        """
+        ground = dict()
+        statements = list()
+        for graph, triples in removed.items():
+            with_bnodes = [triple for triple in triples if any(isinstance(term, BNode) for term in triple)]
+            if len(with_bnodes) < len(triples):
+                ground[graph] = [triple for triple in triples if not any(isinstance(term, BNode) for term in triple)]
+            for group in cls._bnode_groups(with_bnodes):
+                variables = dict()
+
+                def n3(term: Node) -> str:
+                    if isinstance(term, BNode):
+                        return variables.setdefault(term, f'?b{len(variables)}')
+                    return term.n3()
+
+                pattern = ' '.join(f'{n3(s)} {n3(p)} {n3(o)} .' for s, p, o in group)
+                statements.append(f'DELETE WHERE {{ GRAPH <{graph}> {{ {pattern} }} }}')
+        if ground:
+            statements.insert(0, f'DELETE DATA {{ {cls._graph_data(ground)} }}')
+        return statements
+
+    def commit(self):
+        operations = self._coalesce()
+        if not operations:
+            return
+
+        db = self.db
+        if db.is_sparql_store:
+            statements = list()
+            for operation in operations:
+                if isinstance(operation, str):
+                    statements.append(operation.strip().rstrip(';'))
+                    continue
+                removed = self._by_graph(operation, False)
+                inserted = self._by_graph(operation, True)
+                statements.extend(self._delete_statements(removed))
+                if inserted:
+                    statements.append(f'INSERT DATA {{ {self._graph_data(inserted)} }}')
+            logger.info('Committing transaction with %d operations in a single request', len(statements))
+            db._update(' ;\n'.join(statements))
+        else:
+            logger.info('Committing transaction with %d operations', len(operations))
+            db._invalidate_cache()
+            for operation in operations:
+                if isinstance(operation, str):
+                    db._update(operation)
+                    continue
+                removed = self._by_graph(operation, False)
+                inserted = self._by_graph(operation, True)
+                started = time.perf_counter() if db._instrumented else None
+                for graph, triples in removed.items():
+                    graph = db.graph(graph)
+                    for triple in triples:
+                        graph.remove(triple)
+                if started is not None and removed:
+                    db._record('delete', started, triples=sum(len(triples) for triples in removed.values()))
+                started = time.perf_counter() if db._instrumented else None
+                for graph, triples in inserted.items():
+                    graph = db.graph(graph)
+                    graph.addN((s, p, o, graph) for s, p, o in triples)
+                if started is not None and inserted:
+                    db._record('write', started, triples=sum(len(triples) for triples in inserted.values()))
@@ -5,6 +5,8 @@ from typing import Union, List, Type
 from rdflib import URIRef, Literal
 from rdflib.namespace import XSD
 
+from rdflib_orm import terms
+
 
 class FieldError(Exception):
     pass
@@ -19,6 +21,11 @@ class Field(abc.ABC):
         if self.required and value is None:
             raise FieldError(f'{cls} required field "{field}" is not set.')
 
+    def validate_many(self, values: list, cls, field):
+        """Validate the values of this field for many instances at once, as in bulk loads."""
+        if self.required and any(value is None for value in values):
+            raise FieldError(f'{cls} required field "{field}" is not set.')
+
     @abc.abstractmethod
     def convert(self, value, **kwargs):
         pass
@@ -45,18 +52,25 @@ class CharField(Field):
             if length >= self.max_length:
                 raise FieldError(f'{cls} exceeds max_length ({self.max_length}) on field {field} ({length}).')
 
+    def validate_many(self, values: list, cls: str, field: str):
+        super(CharField, self).validate_many(values, cls, field)
+        if self.max_length is not None:
+            length = max((len(value) for value in values if value is not None), default=0)
+            if length >= self.max_length:
+                raise FieldError(f'{cls} exceeds max_length ({self.max_length}) on field {field} ({length}).')
+
     def convert(self, value, **kwargs):
         if value is None:
             return None
         if isinstance(value, str):
             if self.many is True:
                 raise FieldError(f'Expected a list but got {type(value)} "{value}" instead.')
-            return Literal(value, lang=self.lang)
+            return terms.literal(value, self.lang)
         else:
             # TODO: Improve error message.
             if not isinstance(value, list):
                 raise FieldError(f'Expected a list.')
-            return [Literal(item, lang=self.lang) for item in value]
+            return [terms.literal(item, self.lang) for item in value]
 
     def convert_to_python(self, value):
         if self.many:
@@ -82,7 +96,7 @@ class IRIField(Field):
             if isinstance(value, Model):
                 return value.__uri__
             else:
-                return URIRef(value)
+                return terms.uri(value)
         else:
             # TODO: Improve error message.
             if not isinstance(value, list):
@@ -92,7 +106,7 @@ class IRIField(Field):
                 if isinstance(item, Model):
                     result.append(item.__uri__)
                 else:
-                    result.append(URIRef(item))
+                    result.append(terms.uri(item))
             return result
 
     # def convert_to_python(self, value):
@@ -128,8 +142,9 @@ class DateTimeField(Field):
         # Therefore, in Query functions for creation, set create_mode to True while retrieval functions
         # such as filter or get, set create_mode to False.
         if create_mode and self.auto_now:
-            value = datetime.datetime.now()
-        return Literal(value, datatype=XSD.dateTime) if value is not None else None
+            # A new timestamp on every call isn't worth interning.
+            return Literal(datetime.datetime.now(), datatype=XSD.dateTime)
+        return terms.literal(value, None, XSD.dateTime) if value is not None else None
 
     def convert_to_python(self, value):
         return datetime.datetime.fromisoformat(value)
@@ -142,7 +157,7 @@ class BooleanField(Field):
         self.required = required
 
     def convert(self, value, **kwargs):
-        return Literal(value) if value is not None else None
+        return terms.literal(value) if value is not None else None
 
     def convert_to_python(self, value):
         if str(value) == 'false':
@@ -160,7 +175,7 @@ class IntegerField(Field):
         self.required = required
 
     def convert(self, value, **kwargs):
-        return Literal(value) if value is not None else None
+        return terms.literal(value) if value is not None else None
 
     def convert_to_python(self, value):
         return int(value)
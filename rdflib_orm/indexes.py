@@ -0,0 +1,289 @@
+import bisect
+import json
+import logging
+import re
+from collections import defaultdict
+from typing import Dict, Set, FrozenSet, Type, Optional, List, Tuple
+
+from rdflib import URIRef, Literal
+from rdflib.namespace import RDF
+from rdflib.term import Node
+
+from rdflib_orm.db import Database
+
+logger = logging.getLogger(__name__)
+
+
+class Index:
+    """Base class of the in-process indexes a model declares through its `Meta` options.
+
+    Indexes are built on first use and kept up to date by `Model.save()` and `Model.delete()`. Other writes through
+    the `Database` make the index rebuild itself on the next lookup when they touch its `scope`: the class types of
+    its model, `rdf:type` or the predicates of its fields. Saves and deletes of models with other class types don't.
+    Writes made to the store outside this process are not detected.
+    """
+    # Name of the Meta option listing the indexed field names.
+    meta_option: str
+
+    def __init__(self, model_class: Type['Model'], db: Database):
+        self.model_class = model_class
+        self.db = db
+        self.fields = {name: getattr(model_class, name) for name in getattr(model_class.Meta, self.meta_option)}
+        # The writes that can make the index stale, see Database.version_of().
+        self.scope = model_class.objects._write_scope() | {RDF.type} | {
+            field.predicate for field in self.fields.values()}
+        # The Database.version_of() the scope this index is in sync with.
+        self.version: Optional[int] = None
+
+    @classmethod
+    def get(cls, model_class: Type['Model'], db: Database) -> Optional['Index']:
+        """The index of a model class in a database, or None if the model does not declare one."""
+        if not getattr(model_class.Meta, cls.meta_option, None):
+            return None
+        key = (cls, model_class)
+        index = db.indexes.get(key)
+        if index is None:
+            index = db.indexes[key] = cls(model_class, db)
+        return index
+
+    def is_current(self) -> bool:
+        return self.version == self.db.version_of(self.scope)
+
+    def _mark_current(self):
+        self.version = self.db.version_of(self.scope)
+
+    def ensure_current(self):
+        if not self.is_current():
+            logger.info('Building %s for %s', self.__class__.__name__, self.model_class.__name__)
+            self.build()
+            self._mark_current()
+
+    def build(self):
+        raise NotImplementedError()
+
+    def update(self, instance: 'Model'):
+        """Re-index a saved instance. Only call while the index is current."""
+        raise NotImplementedError()
+
+    def remove(self, uri: URIRef):
+        """Remove a deleted instance. Only call while the index is current."""
+        raise NotImplementedError()
+
+
+def get_indexes(model_class: Type['Model'], db: Database) -> List[Index]:
+    """Every index the model class declares."""
+    indexes = (FieldIndex.get(model_class, db), SearchIndex.get(model_class, db))
+    return [index for index in indexes if index is not None]
+
+
+class FieldIndex(Index):
+    """In-process hash index from converted field values to instance URIs.
+
+    Declared on a model with `Meta.indexes`:
+
+        class Concept(models.Model):
+            ...
+            class Meta:
+                indexes = ['other_ids', 'pref_label']
+
+    Exact-match filters on indexed fields are answered from the index. As with the SPARQL filter query, a filter
+    value matches an instance when the instance has every value it converts to, among any others.
+    """
+    meta_option = 'indexes'
+
+    def __init__(self, model_class: Type['Model'], db: Database):
+        super().__init__(model_class, db)
+        self.values: Dict[str, Dict[Node, Set[URIRef]]] = dict()
+        self.subjects: Dict[URIRef, Dict[str, FrozenSet[Node]]] = dict()
+
+    def covers(self, filters: dict) -> bool:
+        return bool(filters) and all(name in self.fields and value is not None for name, value in filters.items())
+
+    def _terms(self, name: str, value) -> FrozenSet[Node]:
+        converted = self.fields[name].convert(value, create_mode=False)
+        if converted is None:
+            return frozenset()
+        if isinstance(converted, list):
+            return frozenset(converted)
+        return frozenset([converted])
+
+    def _add(self, uri: URIRef, name: str, terms: FrozenSet[Node]):
+        if not terms:
+            return
+        self.subjects.setdefault(uri, dict())[name] = terms
+        for term in terms:
+            self.values[name][term].add(uri)
+
+    def build(self):
+        self.values = {name: defaultdict(set) for name in self.fields}
+        self.subjects = dict()
+        field_names = {field.predicate: name for name, field in self.fields.items()}
+        values = defaultdict(lambda: defaultdict(set))
+        for uri, p, o in self.model_class.objects._read_predicates(list(field_names), self.db):
+            values[uri][field_names[p]].add(o)
+        for uri, fields in values.items():
+            for name, terms in fields.items():
+                self._add(uri, name, frozenset(terms))
+
+    def filter(self, **filters) -> Set[URIRef]:
+        """URIs of the instances having every value of the filters in their indexed fields."""
+        self.ensure_current()
+        result = None
+        for name, value in filters.items():
+            terms = self._terms(name, value)
+            candidates = set.intersection(*(self.values[name].get(term, set()) for term in terms)) if terms else set()
+            result = candidates if result is None else result & candidates
+            if not result:
+                break
+        return result if result is not None else set()
+
+    def update(self, instance: 'Model'):
+        uri = instance.__uri__
+        self.remove(uri)
+        for name in self.fields:
+            self._add(uri, name, self._terms(name, getattr(instance, name)))
+        self._mark_current()
+
+    def remove(self, uri: URIRef):
+        for name, terms in self.subjects.pop(uri, dict()).items():
+            for term in terms:
+                uris = self.values[name][term]
+                uris.discard(uri)
+                if not uris:
+                    del self.values[name][term]
+        self._mark_current()
+
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r'\w+', text.casefold())
+
+
+class SearchIndex(Index):
+    """Full-text prefix search over the `CharField` values of a model.
+
+    Declared on a model with `Meta.search_fields`:
+
+        class Concept(models.Model):
+            ...
+            class Meta:
+                search_fields = ['pref_label', 'alt_labels']
+
+    Values are tokenized and kept in an inverted index per field and language tag. Each field and language has a
+    sorted token list, so a prefix is looked up with a binary search rather than a scan. The index can be written
+    to disk with `dump()` and loaded back with `load()` to skip the initial build.
+    """
+    meta_option = 'search_fields'
+
+    def __init__(self, model_class: Type['Model'], db: Database):
+        from rdflib_orm.fields import CharField
+
+        super().__init__(model_class, db)
+        for name, field in self.fields.items():
+            if not isinstance(field, CharField):
+                raise TypeError(f'{model_class} search field "{name}" must be a CharField.')
+        # field name -> language tag -> token -> uri -> occurrences
+        self.postings: Dict[str, Dict[str, Dict[str, Dict[URIRef, int]]]] = dict()
+        # field name -> language tag -> sorted tokens
+        self.tokens: Dict[str, Dict[str, List[str]]] = dict()
+        self.subjects: Dict[URIRef, List[Tuple[str, str, str]]] = dict()
+
+    def _clear(self):
+        self.postings = {name: defaultdict(dict) for name in self.fields}
+        self.tokens = {name: defaultdict(list) for name in self.fields}
+        self.subjects = dict()
+
+    def _add(self, uri: URIRef, name: str, lang: str, text: str):
+        postings = self.postings[name][lang]
+        entries = self.subjects.setdefault(uri, [])
+        for token in tokenize(text):
+            uris = postings.get(token)
+            if uris is None:
+                uris = postings[token] = dict()
+                bisect.insort(self.tokens[name][lang], token)
+            uris[uri] = uris.get(uri, 0) + 1
+            entries.append((name, lang, token))
+
+    def build(self):
+        self._clear()
+        field_names = {field.predicate: name for name, field in self.fields.items()}
+        for uri, p, o in self.model_class.objects._read_predicates(list(field_names), self.db):
+            self._add(uri, field_names[p], (o.language if isinstance(o, Literal) else None) or '', str(o))
+
+    def update(self, instance: 'Model'):
+        uri = instance.__uri__
+        self.remove(uri)
+        for name, field in self.fields.items():
+            value = getattr(instance, name)
+            for text in (value if isinstance(value, list) else [value]):
+                if text is not None:
+                    self._add(uri, name, field.lang or '', text)
+        self._mark_current()
+
+    def remove(self, uri: URIRef):
+        for name, lang, token in self.subjects.pop(uri, []):
+            postings = self.postings[name][lang]
+            uris = postings.get(token)
+            if uris is not None and uris.pop(uri, None) is not None and not uris:
+                del postings[token]
+                tokens = self.tokens[name][lang]
+                del tokens[bisect.bisect_left(tokens, token)]
+        self._mark_current()
+
+    def _matches(self, name: str, lang: Optional[str], prefix: str) -> Dict[URIRef, float]:
+        """Best score of each URI with a token starting with the prefix. Exact token matches score 1."""
+        scores = dict()
+        langs = [lang] if lang is not None else list(self.tokens[name])
+        for tag in langs:
+            tokens = self.tokens[name].get(tag, [])
+            postings = self.postings[name][tag]
+            for i in range(bisect.bisect_left(tokens, prefix), len(tokens)):
+                token = tokens[i]
+                if not token.startswith(prefix):
+                    break
+                score = len(prefix) / len(token)
+                for uri in postings[token]:
+                    if score > scores.get(uri, 0):
+                        scores[uri] = score
+        return scores
+
+    def search(self, field: str, text: str, lang: str = None, limit: int = None) -> List[Tuple[URIRef, float]]:
+        """Ranked (uri, score) pairs of the instances matching every word of the text as a prefix."""
+        if field not in self.fields:
+            raise KeyError(f'{self.model_class} field "{field}" is not in Meta.search_fields.')
+        self.ensure_current()
+        result = None
+        for prefix in tokenize(text):
+            scores = self._matches(field, lang, prefix)
+            if result is None:
+                result = scores
+            else:
+                result = {uri: score + scores[uri] for uri, score in result.items() if uri in scores}
+            if not result:
+                break
+        ranked = sorted((result or dict()).items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit] if limit is not None else ranked
+
+    def dump(self, path: str):
+        """Write the index to a JSON file."""
+        self.ensure_current()
+        postings = {
+            name: {lang: {token: {str(uri): count for uri, count in uris.items()} for token, uris in tokens.items()}
+                   for lang, tokens in langs.items()}
+            for name, langs in self.postings.items()
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'model': self.model_class.__name__, 'postings': postings}, f)
+
+    def load(self, path: str):
+        """Load an index written by `dump()`, trusting it to match the current store content."""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        self._clear()
+        for name, langs in data['postings'].items():
+            for lang, tokens in langs.items():
+                for token, uris in tokens.items():
+                    self.postings[name][lang][token] = {URIRef(uri): count for uri, count in uris.items()}
+                    for uri, count in uris.items():
+                        self.subjects.setdefault(URIRef(uri), []).extend([(name, lang, token)] * count)
+                self.tokens[name][lang] = sorted(tokens)
+        self._mark_current()
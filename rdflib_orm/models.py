@@ -1,11 +1,26 @@
+import base64
+import bisect
+import binascii
+import datetime
+import functools
 import inspect
+import itertools
 import logging
 import traceback
-from typing import List, Type
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Type, Union, Iterator, Iterable, Dict, Optional
 
-from rdflib import Graph, URIRef, BNode
+from weakref import WeakSet, WeakKeyDictionary
 
+from rdflib import Graph, URIRef, BNode, Literal
+from rdflib.namespace import RDF, XSD
+
+from rdflib_orm import terms, columnar
+from rdflib_orm.aggregates import Aggregate, Count, Min, Max, Sum, Avg, to_python
+from rdflib_orm.changes import ChangeFeed, Watermark
 from rdflib_orm.db import Database
+from rdflib_orm.indexes import FieldIndex, SearchIndex, get_indexes
+from rdflib_orm.parallel import chunked, imap, record_triples, deferred_predicates, instance_values
 
 logger = logging.getLogger(__name__)
 
@@ -31,21 +46,299 @@ class QuerySet(set):
         queryset.sort(key=lambda x: getattr(x, value))
         return queryset
 
+    def search(self, field: str, text: str, lang: str = None, limit: int = None, db_key: str = 'default') -> List[URIRef]:
+        """Model.objects.all().search('pref_label', 'geol')
+
+        URIs of the instances in the queryset matching the text, ranked as in `Query.search()`.
+        """
+        uris = {instance.__uri__ for instance in self}
+        db = Database.get_db(db_key)
+        ranked = list()
+        for model_class in {instance.__class__ for instance in self}:
+            index = SearchIndex.get(model_class, db)
+            if index is None:
+                raise KeyError(f'{model_class} does not declare Meta.search_fields.')
+            ranked += [(uri, score) for uri, score in index.search(field, text, lang=lang) if uri in uris]
+        ranked.sort(key=lambda item: (-item[1], item[0]))
+        ranked = ranked[:limit] if limit is not None else ranked
+        return [uri for uri, _ in ranked]
+
+    def changed_since(self, ts: datetime.datetime, field: str = None) -> 'QuerySet':
+        """Model.objects.all().changed_since(ts)
+
+        Instances in the queryset modified after `ts`, as in `Query.changed_since()`. The instances are already
+        hydrated, so this filters them in memory.
+        """
+        queryset = QuerySet()
+        for instance in self:
+            name, _ = instance.__class__.objects._modified_field(field)
+            modified = getattr(instance, name)
+            if modified is not None and modified > ts:
+                queryset.add(instance)
+        return queryset
+
+    def delete(self, db_key: str = 'default'):
+        """Model.objects.filter(pref_label='stale').delete()
+
+        Deletes every instance in the queryset, along with the inverse triples declared
+        through `IRIField.inverse`, in a single request.
+        """
+        uris_by_class = dict()
+        for instance in self:
+            uris_by_class.setdefault(instance.__class__, []).append(instance.__uri__)
+
+        db = Database.get_db(db_key)
+        with db.atomic():
+            for model_class, uris in uris_by_class.items():
+                model_class.objects._delete(uris, db)
+
+
+class LazyQuerySet:
+    """Model.objects.lazy(scheme=a) | Model.objects.lazy(scheme=b)
+
+    An unevaluated query for the instances of a model matching filters, which can be combined with `|`, `&` and `-`
+    without reading anything. The combined query runs in the store, as a SPARQL `UNION`, join or `MINUS` on SPARQL
+    stores and as subject set operations on local stores, and only the instances of its result are hydrated.
+    """
+
+    def __init__(self, model_class: Type['Model'], filters: dict = None, operator: str = None,
+                 operands: tuple = ()):
+        self.model_class = model_class
+        self.filters = filters or dict()
+        # One of '|', '&' and '-' with its two operands, or None for the instances matching the filters.
+        self.operator = operator
+        self.operands = operands
+
+    def __repr__(self):
+        if self.operator is None:
+            return f'<{self.__class__.__name__} {self.model_class.__name__} {self.filters}>'
+        left, right = self.operands
+        return f'({left!r} {self.operator} {right!r})'
+
+    def _combine(self, other: 'LazyQuerySet', operator: str) -> 'LazyQuerySet':
+        if not isinstance(other, LazyQuerySet):
+            return NotImplemented
+        if other.model_class is not self.model_class:
+            raise TypeError(f'Cannot combine queries on {self.model_class} and {other.model_class}.')
+        return LazyQuerySet(self.model_class, operator=operator, operands=(self, other))
+
+    def __or__(self, other: 'LazyQuerySet') -> 'LazyQuerySet':
+        return self._combine(other, '|')
+
+    def __and__(self, other: 'LazyQuerySet') -> 'LazyQuerySet':
+        return self._combine(other, '&')
+
+    def __sub__(self, other: 'LazyQuerySet') -> 'LazyQuerySet':
+        return self._combine(other, '-')
+
+    def _pattern(self, db: Database) -> str:
+        """SPARQL group graph pattern binding ?uri to the instances of the query."""
+        if self.operator is None:
+            query = self.model_class.objects
+            class_type_str = query._get_sparql_query_uri_lists(self.model_class.class_type.value)
+            where_clause = query._get_sparql_where_clause(self.filters)
+            return f'{{ GRAPH <{db.graph_identifier(self.model_class)}> {{ ?uri a {class_type_str} ;{where_clause} . }} }}'
+        left, right = (operand._pattern(db) for operand in self.operands)
+        if self.operator == '|':
+            return f'{{ {left} UNION {right} }}'
+        if self.operator == '&':
+            return f'{{ {left} {right} }}'
+        return f'{{ {left} MINUS {right} }}'
+
+    def _read_uris(self, db: Database) -> set:
+        if self.operator is None:
+            return self.model_class.objects._read_matching_uris(db, **self.filters)
+        left, right = (operand._read_uris(db) for operand in self.operands)
+        if self.operator == '|':
+            return left | right
+        if self.operator == '&':
+            return left & right
+        return left - right
+
+    def _key(self) -> tuple:
+        """Hashable key of the query, from the converted terms of its filters, so equal queries have equal keys."""
+        if self.operator is None:
+            terms = list()
+            for name, value in self.filters.items():
+                converted = getattr(self.model_class, name).convert(value, create_mode=False)
+                terms.append((name, frozenset(converted if isinstance(converted, list) else [converted])))
+            return None, tuple(sorted(terms, key=lambda term: term[0]))
+        left, right = self.operands
+        return self.operator, left._key(), right._key()
+
+    def _sorted_uris(self, db: Database) -> List[URIRef]:
+        """URIs of the instances of the query in a local store, sorted.
+
+        With `Meta.cache_sorted_uris`, the list is kept on the model's `Query` until a write made through the
+        `Database` touches the model class or its fields, so paging through it costs a binary search per page
+        rather than a read and sort of every instance. Otherwise the store is read on every call.
+        """
+        if not getattr(self.model_class.Meta, 'cache_sorted_uris', False):
+            return sorted(self._read_uris(db))
+        query = self.model_class.objects
+        scope = query._write_scope() | {RDF.type} | {
+            field.predicate for _, field in self.model_class.get_model_attributes(self.model_class)}
+        version = db.version_of(scope)
+        cache = query._sorted_uris.setdefault(db, dict())
+        key = self._key()
+        cached = cache.get(key)
+        if cached is None or cached[0] != version:
+            cached = cache[key] = (version, sorted(self._read_uris(db)))
+            # Only the most recently sorted queries are kept.
+            while len(cache) > query.sorted_uris_size:
+                del cache[next(iter(cache))]
+        return cached[1]
+
+    def uris(self, db_key: str = 'default') -> List[URIRef]:
+        """URIs of the instances of the query, sorted, without hydrating them."""
+        db = Database.get_db(db_key)
+        if not db.is_sparql_store:
+            return list(self._sorted_uris(db))
+        query = f"""
+# SPARQL lazy queryset query
+SELECT DISTINCT ?uri
+WHERE {self._pattern(db)}
+ORDER BY ?uri
+"""
+        logger.info(query)
+        return [row['uri'] for row in db.sparql(query)]
+
+    def evaluate(self, db_key: str = 'default', trusted: bool = False, chunk_size: int = 1000) -> QuerySet:
+        """Run the query and hydrate its instances, in `VALUES` batches of `chunk_size` on SPARQL stores."""
+        db = Database.get_db(db_key)
+        queryset = QuerySet()
+        for chunk in chunked(self.uris(db_key), chunk_size):
+            queryset.update(self.model_class.objects._hydrate(chunk, db, trusted))
+        return queryset
+
+    def __iter__(self) -> Iterator['Model']:
+        return iter(self.evaluate())
+
+    def to_columns(self, db_key: str = 'default', chunk_size: int = 1000) -> Dict[str, object]:
+        """The field values of the instances of the query as typed columns, see `Query.to_columns()`."""
+        db = Database.get_db(db_key)
+        return self.model_class.objects._to_columns(self.uris(db_key), db, chunk_size)
+
+    def to_arrow(self, db_key: str = 'default', chunk_size: int = 1000):
+        """The field values of the instances of the query as a `pyarrow.Table`, see `Query.to_columns()`."""
+        return columnar.to_arrow(self.to_columns(db_key, chunk_size))
+
+    def paginate(self, after: str = None, size: int = 100, db_key: str = 'default', trusted: bool = False) -> 'Page':
+        """Model.objects.lazy().paginate(after=page.cursor, size=50)
+
+        The page of at most `size` instances that comes after the cursor of the previous page, or the first page.
+        Pages are ordered by URI and seek past the last URI of the previous page with `FILTER` rather than `OFFSET`,
+        so every page costs the same however deep it is, and writes made between pages don't shift them.
+        """
+        db = Database.get_db(db_key)
+        last = Page.decode(after) if after is not None else None
+        if db.is_sparql_store:
+            filter_clause = f'\n    FILTER (STR(?uri) > {Literal(str(last)).n3()})' if last is not None else ''
+            query = f"""
+# SPARQL paginate query
+SELECT DISTINCT ?uri
+WHERE {{
+    {self._pattern(db)}{filter_clause}
+}}
+ORDER BY ?uri
+LIMIT {size + 1}
+"""
+            logger.info(query)
+            uris = [row['uri'] for row in db.sparql(query)]
+        else:
+            uris = self._sorted_uris(db)
+            start = bisect.bisect_right(uris, last) if last is not None else 0
+            uris = uris[start:start + size + 1]
+
+        # The extra URI only tells whether there is a next page.
+        has_next = len(uris) > size
+        uris = uris[:size]
+        instances = self.model_class.objects._hydrate(uris, db, trusted)
+        return Page(instances, Page.encode(uris[-1]) if has_next else None)
+
+
+class Page:
+    """A page of instances from `paginate()`, with the opaque `cursor` of the next page, or None on the last page."""
+
+    def __init__(self, instances: List['Model'], cursor: Optional[str]):
+        self.instances = instances
+        self.cursor = cursor
+
+    def __iter__(self) -> Iterator['Model']:
+        return iter(self.instances)
+
+    def __len__(self):
+        return len(self.instances)
+
+    @staticmethod
+    def encode(uri: URIRef) -> str:
+        return base64.urlsafe_b64encode(str(uri).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode(cursor: str) -> URIRef:
+        try:
+            return URIRef(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        except (binascii.Error, UnicodeError, ValueError):
+            raise ValueError(f'Invalid cursor "{cursor}".')
+
 
 class Query:
+    # Number of sorted URI lists of lazy querysets kept per database, see LazyQuerySet._sorted_uris().
+    sorted_uris_size = 16
+
     def __init__(self, model_class: Type['Model']):
         self.model_class = model_class
+        # Sorted URIs of lazy querysets in local stores, by database and query, with the version they were read at.
+        self._sorted_uris: WeakKeyDictionary = WeakKeyDictionary()
+        # Registered subclasses of the model class, as of ModelBase.registry_version.
+        self._subclasses = []
+        self._subclasses_version = None
         super(Query, self).__init__()
 
+    def _get_subclasses(self) -> List[Type['Model']]:
+        """Registered subclasses of the model class, most specific first."""
+        if self._subclasses_version != ModelBase.registry_version:
+            classes = {model_class for classes in ModelBase.registry.values() for model_class in classes}
+            # Mixins aren't registered and have no class types.
+            class_types = getattr(self.model_class, '__class_types__', frozenset())
+            self._subclasses = sorted(
+                (model_class for model_class in classes
+                 if model_class is not self.model_class and issubclass(model_class, self.model_class)
+                 # A subclass without a type of its own can't be told apart from the model class.
+                 and not model_class.__class_types__ <= class_types),
+                key=lambda model_class: (-len(model_class.__mro__), -len(model_class.__class_types__),
+                                         model_class.__qualname__)
+            )
+            self._subclasses_version = ModelBase.registry_version
+        return self._subclasses
+
+    def _resolve_class(self, pos) -> Type['Model']:
+        """The most specific registered subclass with all its class types among the subject's (predicate, object)
+        pairs, or the model class itself."""
+        subclasses = self._get_subclasses()
+        if not subclasses:
+            return self.model_class
+        predicate = self.model_class.class_type.predicate
+        types = {o for p, o in pos if p == predicate}
+        for model_class in subclasses:
+            if model_class.__class_types__ <= types:
+                return model_class
+        return self.model_class
+
+    def _write_scope(self) -> frozenset:
+        """The class types of the model class, which its saves and deletes are scoped to, see `Database.scope()`."""
+        types = self.model_class.class_type.value
+        return frozenset(URIRef(type_) for type_ in (types if isinstance(types, list) else [types]) if type_ is not None)
+
     @staticmethod
-    def _get_instance_uri_by_predicate_and_value(predicate, value, db: Database) -> List[URIRef]:
+    def _get_instance_uri_by_predicate_and_value(predicate, value, db: Database, graph: URIRef = None) -> List[URIRef]:
         instance_uris = list()
         if isinstance(value, list):
             for val in value:
-                for s, p, o in db.read((None, predicate, val)):
+                for s, p, o in db.read((None, predicate, val), graph):
                     instance_uris.append(s)
         else:
-            for s, p, o in db.read((None, predicate, value)):
+            for s, p, o in db.read((None, predicate, value), graph):
                 instance_uris.append(s)
         return instance_uris
 
@@ -62,6 +355,177 @@ class Query:
         else:
             return f'<{uri_list}>'
 
+    @staticmethod
+    def _get_sparql_query_terms(value):
+        """Object list of converted field values, in SPARQL syntax."""
+        if isinstance(value, list):
+            return ', '.join(item.n3() for item in value)
+        return value.n3()
+
+    def _get_sparql_where_clause(self, kwargs: dict) -> str:
+        """Predicate-object list of the filter kwargs, used as part of the SPARQL query construction."""
+        where_clause = ''
+        for key, val in kwargs.items():
+            field = getattr(self.model_class, key)
+            predicate = f'<{field.predicate}>'
+            o = field.convert(val, create_mode=False)
+            where_clause += f'\n\t\t\t{predicate} {self._get_sparql_query_terms(o)};'
+        return where_clause
+
+    def _instance_values(self, pos, model_class: Type['Model'] = None) -> dict:
+        """Attribute values to create an instance with, from the (predicate, object) pairs of its subject."""
+        model_class = self.model_class if model_class is None else model_class
+        fields_by_predicate = dict()
+        for name, field in model_class.get_model_attributes(model_class):
+            fields_by_predicate.setdefault(field.predicate, []).append((name, field))
+
+        values = dict()
+        for p, o in pos:
+            for name, field in fields_by_predicate.get(p, ()):
+                python_value = field.convert_to_python(o)
+                if name not in values:
+                    values[name] = python_value
+                # There's more than one value for this predicate.
+                # Convert the current value into a list and append the new value or
+                # simply append to the existing list.
+                elif isinstance(values[name], list) and isinstance(python_value, list):
+                    values[name] += python_value
+                elif isinstance(values[name], list):
+                    values[name].append(python_value)
+                else:
+                    values[name] = [values[name], python_value]
+        return values
+
+    def _read_pos(self, uris: List[URIRef], db: Database) -> Dict[URIRef, list]:
+        """The (predicate, object) pairs of each of the given URIs, fetched in a single query on SPARQL stores."""
+        pos_by_uri = {uri: [] for uri in uris}
+        if not pos_by_uri:
+            return pos_by_uri
+        graph = db.graph_identifier(self.model_class)
+        if db.is_sparql_store:
+            values = ' '.join(f'<{uri}>' for uri in pos_by_uri)
+            query = f"""
+# SPARQL hydrate query
+SELECT ?uri ?p ?o
+WHERE {{
+    GRAPH <{graph}> {{
+        VALUES ?uri {{ {values} }}
+        ?uri ?p ?o .
+    }}
+}}
+"""
+            logger.info(query)
+            for row in db.sparql(query):
+                pos_by_uri[row['uri']].append((row['p'], row['o']))
+        else:
+            for uri, pos in pos_by_uri.items():
+                pos.extend((p, o) for _, p, o in db.read((uri, None, None), graph))
+        return pos_by_uri
+
+    def _hydrate(self, uris: List[URIRef], db: Database, trusted: bool = False) -> List['Model']:
+        """Create instances of the given URIs, fetching them in a single query on SPARQL stores."""
+        pos_by_uri = self._read_pos(uris, db)
+        instances = list()
+        for uri, pos in pos_by_uri.items():
+            model_class = self._resolve_class(pos)
+            instance_values = self._instance_values(pos, model_class)
+            if instance_values:
+                instances.append(model_class(uri, trusted=trusted, **instance_values))
+        return instances
+
+    def _read_instance_uris(self, db: Database) -> set:
+        """URIs of every instance of the model class in a local store."""
+        class_type = self.model_class.class_type
+        types = class_type.value if isinstance(class_type.value, list) else [class_type.value]
+        graph = db.graph_identifier(self.model_class)
+        uris = None
+        for type_ in types:
+            subjects = {s for s, _, _ in db.read((None, class_type.predicate, URIRef(type_)), graph)}
+            uris = subjects if uris is None else uris & subjects
+        return uris
+
+    def _read_predicates(self, predicates: List[URIRef], db: Database):
+        """Yield the triples of every instance of the model class with one of the given predicates."""
+        graph = db.graph_identifier(self.model_class)
+        if db.is_sparql_store:
+            class_type_str = self._get_sparql_query_uri_lists(self.model_class.class_type.value)
+            values = ' '.join(f'<{predicate}>' for predicate in predicates)
+            query = f"""
+# SPARQL predicate values query
+SELECT ?uri ?p ?o
+WHERE {{
+    GRAPH <{graph}> {{
+        VALUES ?p {{ {values} }}
+        ?uri a {class_type_str} ;
+            ?p ?o .
+    }}
+}}
+"""
+            logger.info(query)
+            for row in db.sparql(query):
+                yield row['uri'], row['p'], row['o']
+        else:
+            uris = self._read_instance_uris(db)
+            for predicate in predicates:
+                for s, p, o in db.read((None, predicate, None), graph):
+                    if s in uris:
+                        yield s, p, o
+
+    def _delete(self, uris: List[URIRef], db: Database):
+        """Delete the outgoing triples of each URI and the inverse triples pointing back at it."""
+        indexes = [index for index in get_indexes(self.model_class, db) if index.is_current()]
+        inverse_predicates = [
+            field.inverse for _, field in self.model_class.get_model_attributes(self.model_class)
+            if getattr(field, 'inverse', None) is not None
+        ]
+        graph = db.graph_identifier(self.model_class)
+        # Inverse triples are written on subjects of other types, so they count as writes of their predicate.
+        with db.scope(self._write_scope() | set(inverse_predicates)):
+            self._delete_triples(uris, inverse_predicates, graph, db)
+
+        for index in indexes:
+            for uri in uris:
+                index.remove(uri)
+
+    @staticmethod
+    def _delete_triples(uris: List[URIRef], inverse_predicates: List[URIRef], graph: URIRef, db: Database):
+        if db.is_sparql_store:
+            values = ' '.join(f'<{uri}>' for uri in uris)
+            inverse_clause = ''
+            if inverse_predicates:
+                inverse_values = ' '.join(f'<{inverse}>' for inverse in inverse_predicates)
+                inverse_clause = f"""
+        UNION
+        {{
+            VALUES ?inverse {{ {inverse_values} }}
+            ?s ?inverse ?uri .
+        }}"""
+            query = f"""
+# SPARQL delete query
+DELETE {{
+    GRAPH <{graph}> {{
+        ?uri ?p ?o .
+        ?s ?inverse ?uri .
+    }}
+}}
+WHERE {{
+    GRAPH <{graph}> {{
+        VALUES ?uri {{ {values} }}
+        {{
+            ?uri ?p ?o .
+        }}{inverse_clause}
+    }}
+}}
+"""
+            logger.info(query)
+            db.sparql_update(query)
+        else:
+            # Remove by pattern, one call per pattern rather than one per triple.
+            for uri in uris:
+                db.delete((uri, None, None), graph)
+                for inverse in inverse_predicates:
+                    db.delete((None, inverse, uri), graph)
+
     def create(self, uri: str, db_key: str = 'default', **kwargs):
         """Create and save an object in a single step.
 
@@ -73,13 +537,42 @@ class Query:
         instance.save(db_key=db_key)
         return instance
 
-    def get(self, uri: str, db_key: str = 'default', **kwargs) -> 'Model':
+    def bulk_create(self, records: Iterable[dict], db_key: str = 'default', processes: int = None,
+                    chunk_size: int = 1000):
+        """Model.objects.bulk_create([{'uri': 'a', 'pref_label': 'A'}, ...], processes=4)
+
+        Create instances from records of field values, each with its `uri`, without building `Model` objects.
+        Records are validated and converted in chunks of `chunk_size`, on a pool of `processes` worker processes
+        when given, and each chunk is written with a single `Database.write_many()` call. Like `create()`, the
+        existing triples of the instances are not removed first.
+        """
+        db = Database.get_db(db_key)
+        graph = db.graph_identifier(self.model_class)
+        convert = functools.partial(record_triples, self.model_class, db.base_uri)
+        chunks = chunked(records, chunk_size)
+        if not processes:
+            for chunk in chunks:
+                db.write_many(convert(chunk), graph)
+            return
+        # Imported here as it pulls in multiprocessing, which most uses never need.
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            for triples in imap(executor, convert, chunks, processes * 2):
+                db.write_many(triples, graph)
+
+    def get(self, uri: str, db_key: str = 'default', trusted: bool = False, **kwargs) -> 'Model':
+        """Get a single instance by URI.
+
+        With `trusted`, the values read from the store are not validated, see `Model`.
+        """
         # TODO: Basically this was a copy paste from the filter function. See if there's a better way to structure
         #  the duplicate code to keep it simple, readable and DRY.
 
         # TODO: Look at raising the same exceptions as Django.
         #  See https://docs.djangoproject.com/en/3.1/topics/db/queries/#retrieving-a-single-object-with-get
         db = Database.get_db(db_key)
+        graph = db.graph_identifier(self.model_class)
         if not isinstance(uri, BNode):
             uri = URIRef(uri)
         if db.is_sparql_store:
@@ -91,25 +584,14 @@ class Query:
 
             class_type = self.model_class.class_type.value
             class_type_str = self._get_sparql_query_uri_lists(class_type)
-            where_clause = ''
-            for key, val in kwargs.items():
-                field = getattr(self.model_class, key)
-                predicate = f'<{field.predicate}>'
-                o = field.convert(val, create_mode=False)
-                literal_o = f'"{o}"'
-                datatype = f'<{o.datatype}>' if type(o) == Literal else None
-                uri_o = f'<{o}>'
-                if datatype:
-                    literal_o = f'{literal_o}^^{datatype}'
-
-                where_clause += f'\n\t\t\t{predicate} {literal_o if not isinstance(o, URIRef) else uri_o};'
+            where_clause = self._get_sparql_where_clause(kwargs)
             po = '\n\t\t\t?p ?o .'
             where_clause += po
             query = f"""
 # SPARQL filter query
 SELECT *
 WHERE {{ 
-    GRAPH <{db.g.identifier}> {{
+    GRAPH <{graph}> {{
         {uri_sparql_str} a {class_type_str} ;
 {where_clause}
     }}
@@ -126,11 +608,12 @@ WHERE {{
                     # TODO: This won't happen anymore now that uri is a mandatory arg in this get function. Remove.
                     g.add((row['uri'], row['p'], row['o']))
 
-            model_attributes = self.model_class.get_model_attributes(self.model_class)
+            model_class = self._resolve_class(g.predicate_objects(uri))
+            model_attributes = model_class.get_model_attributes(model_class)
             # Attribute and values to use to create an instance of self.model.
             to_be_instance_values = dict()
 
-            for s, p, o in db.read((None, None, None)):
+            for s, p, o in g.triples((None, None, None)):
                 for model_attr in model_attributes:
                     if model_attr[1].predicate == p:
                         if model_attr[0] not in to_be_instance_values:
@@ -156,7 +639,7 @@ WHERE {{
                                                                         model_attr[1].convert_to_python(o)]
                         continue
             if to_be_instance_values:
-                return self.model_class(uri, **to_be_instance_values)
+                return model_class(uri, trusted=trusted, **to_be_instance_values)
             else:
                 raise InstanceNotFoundError(f'No instance found with URI {uri}')
         else:
@@ -165,11 +648,13 @@ WHERE {{
             #     converted_value = filtered_attr.convert(val)
             #     instance_uris = self._get_instance_uri_by_predicate_and_value(filtered_attr.predicate, converted_value, db)
 
-            model_attributes = self.model_class.get_model_attributes(self.model_class)
+            triples = list(db.read((uri, None, None), graph))
+            model_class = self._resolve_class([(p, o) for _, p, o in triples])
+            model_attributes = model_class.get_model_attributes(model_class)
             # Attribute and values to use to create an instance of self.model.
             to_be_instance_values = dict()
 
-            for s, p, o in db.read((uri, None, None)):
+            for s, p, o in triples:
                 for model_attr in model_attributes:
                     if model_attr[1].predicate == p:
                         if model_attr[0] not in to_be_instance_values:
@@ -215,44 +700,39 @@ WHERE {{
             #             break
 
             if to_be_instance_values:
-                return self.model_class(uri, **to_be_instance_values)
+                return model_class(uri, trusted=trusted, **to_be_instance_values)
             else:
                 raise InstanceNotFoundError(f'No instance found with URI {uri}')
 
-    def filter(self, db_key: str = 'default', **kwargs) -> QuerySet:
-        """Get a queryset of objects based on the filter parameters."""
+    def filter(self, db_key: str = 'default', trusted: bool = False, **kwargs) -> QuerySet:
+        """Get a queryset of objects based on the filter parameters.
+
+        With `trusted`, the values read from the store are not validated, see `Model`.
+        """
         assert 'uri' not in kwargs, 'Found key uri in kwargs. If you want to retrieve a single instance by URI, use Model.objects.get() instead.'
 
         queryset = QuerySet()
         db = Database.get_db(db_key)
+        graph = db.graph_identifier(self.model_class)
+
+        index = FieldIndex.get(self.model_class, db)
+        if index is not None and index.covers(kwargs):
+            # Exact-match lookup on indexed fields, answered without querying the store.
+            queryset.update(self._hydrate(list(index.filter(**kwargs)), db, trusted))
+            return queryset
 
         if db.is_sparql_store:
         # if isinstance(Database.g.store, SPARQLUpdateStore) or isinstance(Database.g.store, SPARQLStore):
             class_type = self.model_class.class_type.value
             class_type_str = self._get_sparql_query_uri_lists(class_type)
-            where_clause = ''
-            for key, val in kwargs.items():
-                field = getattr(self.model_class, key)
-                predicate = f'<{field.predicate}>'
-                o = field.convert(val, create_mode=False)
-                if isinstance(o, URIRef) or isinstance(o, list) and isinstance(o[0], URIRef):
-                    is_uri = True
-                else:
-                    is_uri = False
-                literal_o = f'"{o}"'
-                datatype = f'<{o.datatype}>' if type(o) == Literal else None
-                uri_o = self._get_sparql_query_uri_lists(o)
-                if datatype:
-                    literal_o = f'{literal_o}^^{datatype}'
-
-                where_clause += f'\n\t\t\t{predicate} {literal_o if not is_uri else uri_o};'
+            where_clause = self._get_sparql_where_clause(kwargs)
             po = '\n\t\t\t?p ?o .'
             where_clause += po
             query = f"""
 # SPARQL filter query
 SELECT *
 WHERE {{ 
-    GRAPH <{db.g.identifier}> {{
+    GRAPH <{graph}> {{
         ?uri a {class_type_str} ;
 {where_clause}
     }}
@@ -261,70 +741,30 @@ WHERE {{
             logger.info(query)
             query_result = db.sparql(query)
 
-            g = Graph()
+            # The ?p ?o pattern already returns every triple of the matched instances, so they are
+            # hydrated from this single query instead of one read per instance.
+            pos_by_uri = dict()
             for row in query_result:
-                g.add((row['uri'], row['p'], row['o']))
+                pos_by_uri.setdefault(row['uri'], []).append((row['p'], row['o']))
 
-            query_instance_uris = f"""
-# SPARQL filter query
-SELECT DISTINCT ?uri
-WHERE {{ 
-    GRAPH <{db.g.identifier}> {{
-        ?uri a {class_type_str} ;
-{where_clause}
-    }}
-}}
-"""
-            logger.info(query_instance_uris)
-            instances = db.sparql(query_instance_uris)
-
-            for instance_row in instances:
-                instance_uri = instance_row['uri']
-
-                model_attributes = self.model_class.get_model_attributes(self.model_class)
-                # Attribute and values to use to create an instance of self.model.
-                to_be_instance_values = dict()
-
-                for s, p, o in db.read((instance_uri, None, None)):
-                    for model_attr in model_attributes:
-                        if model_attr[1].predicate == p:
-                            if model_attr[0] not in to_be_instance_values:
-                                # to_be_instance_values[model_attr[0]] = model_attr[1].convert_to_python(o)
-                                python_value = model_attr[1].convert_to_python(o)
-                                # if isinstance(python_value, list) and to_be_instance_values.get(model_attr[0]) and isinstance(to_be_instance_values[model_attr[0]], list):
-                                #     to_be_instance_values[model_attr[0]] += python_value
-                                # else:
-                                to_be_instance_values[model_attr[0]] = python_value
-
-                            else:
-                                # There's more than one value for this predicate.
-                                # Convert the current value into a list and append the new value or
-                                # simply append to the existing list.
-                                python_value = model_attr[1].convert_to_python(o)
-                                if isinstance(to_be_instance_values[model_attr[0]], list) and isinstance(python_value,
-                                                                                                         list):
-                                    to_be_instance_values[model_attr[0]] += python_value
-                                elif isinstance(to_be_instance_values[model_attr[0]], list) and not isinstance(
-                                        python_value, list):
-                                    to_be_instance_values[model_attr[0]].append(model_attr[1].convert_to_python(o))
-                                else:
-                                    to_be_instance_values[model_attr[0]] = [to_be_instance_values[model_attr[0]],
-                                                                            model_attr[1].convert_to_python(o)]
-                            continue
-                queryset.add(self.model_class(instance_uri, **to_be_instance_values))
+            for instance_uri, pos in pos_by_uri.items():
+                model_class = self._resolve_class(pos)
+                queryset.add(model_class(instance_uri, trusted=trusted, **self._instance_values(pos, model_class)))
         else:
             for key, val in kwargs.items():
                 filtered_attr: 'Field' = getattr(self.model_class, key)
                 converted_value = filtered_attr.convert(val)
-                instance_uris = self._get_instance_uri_by_predicate_and_value(filtered_attr.predicate, converted_value, db)
+                instance_uris = self._get_instance_uri_by_predicate_and_value(filtered_attr.predicate, converted_value, db, graph)
 
                 if instance_uris:
                     for instance_uri in instance_uris:
-                        model_attributes = self.model_class.get_model_attributes(self.model_class)
+                        triples = list(db.read((instance_uri, None, None), graph))
+                        model_class = self._resolve_class([(p, o) for _, p, o in triples])
+                        model_attributes = model_class.get_model_attributes(model_class)
                         # Attribute and values to use to create an instance of self.model.
                         to_be_instance_values = dict()
 
-                        for s, p, o in db.read((instance_uri, None, None)):
+                        for s, p, o in triples:
                             for model_attr in model_attributes:
                                 if model_attr[1].predicate == p:
                                     if model_attr[0] not in to_be_instance_values:
@@ -357,13 +797,16 @@ WHERE {{
                                 kwargs[k] = str(kwargs[k])
 
                             if k in to_be_instance_values:
-                                if isinstance(kwargs[k], list) and isinstance(kwargs[k][0], URIRef):
-                                    # Process the list to compare that they are the same by casting to string,
-                                    # since the to_be_instance_values always contains Python types.
-                                    # kwargs[k] = [str(uri) for uri in kwargs[k]]
-                                    if k == 'class_type' and all(str(x) in to_be_instance_values[k] for x in kwargs[k]):
-                                        is_match = True
-                                        continue
+                                if k == 'class_type':
+                                    # Compare by casting to string, since the to_be_instance_values always contains
+                                    # Python types. Subjects may have more types than the model declares.
+                                    expected = kwargs[k] if isinstance(kwargs[k], list) else [kwargs[k]]
+                                    actual = to_be_instance_values[k]
+                                    actual = actual if isinstance(actual, list) else [actual]
+                                    is_match = all(str(x) in actual for x in expected)
+                                    if not is_match:
+                                        break
+                                    continue
                                 if sorted(kwargs[k]) == sorted(to_be_instance_values[k]):
                                     is_match = True
                                 else:
@@ -373,29 +816,520 @@ WHERE {{
 
                         if is_match:
                             # Create the instance and add it to the queryset.
-                            queryset.add(self.model_class(instance_uri, **to_be_instance_values))
+                            queryset.add(model_class(instance_uri, trusted=trusted, **to_be_instance_values))
+
+        return queryset
 
+    def _select_uris(self, db: Database, **kwargs) -> List[URIRef]:
+        """URIs of the instances matching the filters on a SPARQL store, without their triples."""
+        index = FieldIndex.get(self.model_class, db)
+        if index is not None and index.covers(kwargs):
+            return sorted(index.filter(**kwargs))
+
+        class_type_str = self._get_sparql_query_uri_lists(self.model_class.class_type.value)
+        where_clause = self._get_sparql_where_clause(kwargs)
+        query = f"""
+# SPARQL instance uris query
+SELECT DISTINCT ?uri
+WHERE {{
+    GRAPH <{db.graph_identifier(self.model_class)}> {{
+        ?uri a {class_type_str} ;{where_clause}
+        .
+    }}
+}}
+"""
+        logger.info(query)
+        return [row['uri'] for row in db.sparql(query)]
+
+    def _read_matching_uris(self, db: Database, **kwargs) -> set:
+        """URIs of the instances matching the filters in a local store, without their triples."""
+        graph = db.graph_identifier(self.model_class)
+        uris = self._read_instance_uris(db)
+        for key, val in kwargs.items():
+            field = getattr(self.model_class, key)
+            converted = field.convert(val, create_mode=False)
+            for term in (converted if isinstance(converted, list) else [converted]):
+                uris &= {s for s, _, _ in db.read((None, field.predicate, term), graph)}
+        return uris
+
+    def _iterate_processes(self, db: Database, processes: int, chunk_size: int, **kwargs) -> Iterator['Model']:
+        """Hydrate the instances matching the filters in a local store on a pool of worker processes."""
+        graph = db.graph_identifier(self.model_class)
+        uris = self._read_matching_uris(db, **kwargs)
+        # Subjects are resolved to their model class here, as workers started with `spawn` only know the model
+        # classes of the modules they import.
+        groups = (
+            (uri, self._resolve_class(pos), pos)
+            for uri, pos in ((uri, [(p, o) for _, p, o in db.read((uri, None, None), graph)]) for uri in sorted(uris))
+        )
+        # The workers validate every field but the deferred ones.
+        trusted = dict()
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            for results in imap(executor, instance_values, chunked(groups, chunk_size), processes * 2):
+                for uri, model_class, values, deferred in results:
+                    if model_class not in trusted:
+                        trusted[model_class] = not deferred_predicates(model_class)
+                    if deferred:
+                        values.update(self._instance_values(deferred, model_class))
+                    if values:
+                        yield model_class(uri, trusted=trusted[model_class], **values)
+
+    def iterator(self, db_key: str = 'default', parallel: int = 1, chunk_size: int = 1000, processes: int = None,
+                 trusted: bool = False, **kwargs) -> Iterator['Model']:
+        """Model.objects.iterator(parallel=8, pref_label='Geology')
+
+        Stream the instances matching the filters, or every instance without filters, instead of collecting them
+        into a queryset. On SPARQL stores the matching URIs are fetched first and then hydrated in `VALUES` batches
+        of `chunk_size`, with up to `parallel` batches in flight at once on a thread pool. Instances are yielded as
+        their batch completes, so their order is not defined. With `trusted`, hydrated values are not validated.
+
+        On local stores hydration is CPU bound. With `processes`, subjects are converted and validated in chunks
+        on a pool of worker processes, otherwise this iterates over `filter()`.
+        """
+        db = Database.get_db(db_key)
+        if not db.is_sparql_store:
+            if processes:
+                yield from self._iterate_processes(db, processes, chunk_size, **kwargs)
+            else:
+                yield from self.filter(db_key=db_key, trusted=trusted,
+                                       **(kwargs or {'class_type': self.model_class.class_type.value}))
+            return
+
+        uris = self._select_uris(db, **kwargs)
+        chunks = (uris[i:i + chunk_size] for i in range(0, len(uris), chunk_size))
+        if parallel <= 1:
+            for chunk in chunks:
+                yield from self._hydrate(chunk, db, trusted)
+            return
+
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            # Keep a bounded number of batches in flight so memory stays flat on large exports.
+            pending = {
+                executor.submit(self._hydrate, chunk, db, trusted) for chunk in itertools.islice(chunks, parallel * 2)
+            }
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for chunk in itertools.islice(chunks, 1):
+                            pending.add(executor.submit(self._hydrate, chunk, db, trusted))
+                        yield from future.result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def search(self, field: str, text: str, lang: str = None, limit: int = None, db_key: str = 'default') -> List[URIRef]:
+        """Model.objects.search('pref_label', 'geol')
+
+        URIs of the instances with a word starting with each word of the text in the field, best matches first.
+        The field must be listed in the model's `Meta.search_fields`.
+        """
+        index = SearchIndex.get(self.model_class, Database.get_db(db_key))
+        if index is None:
+            raise KeyError(f'{self.model_class} does not declare Meta.search_fields.')
+        return [uri for uri, _ in index.search(field, text, lang=lang, limit=limit)]
+
+    def replace_graph(self, source: Union[Graph, str], db_key: str = 'default'):
+        """Model.objects.replace_graph(Graph().parse('concepts.ttl'))
+
+        Replace every instance of the model with the triples of a `Graph`, or the RDF document at a URL, by
+        swapping the content of the named graph set in `Meta.graph`. See `Database.replace_graph()`.
+        """
+        if getattr(self.model_class.Meta, 'graph', None) is None:
+            raise ValueError(f'{self.model_class} does not declare Meta.graph.')
+        db = Database.get_db(db_key)
+        db.replace_graph(db.graph_identifier(self.model_class), source)
+
+    def _traverse(self, start: URIRef, predicate: URIRef, db: Database, depth: int = None, reverse: bool = False,
+                  chunk_size: int = 1000) -> List[URIRef]:
+        """URIs reachable from `start` by following `predicate`, or against it with `reverse`, up to `depth` hops.
+
+        Unbounded traversals on SPARQL stores are a single property path query. Bounded ones are breadth first,
+        with one query per level and `chunk_size` nodes of the level per `VALUES` batch.
+        """
+        graph = db.graph_identifier(self.model_class)
+        if db.is_sparql_store and depth is None:
+            path = f'^<{predicate}>+' if reverse else f'<{predicate}>+'
+            query = f"""
+# SPARQL traverse query
+SELECT DISTINCT ?uri
+WHERE {{
+    GRAPH <{graph}> {{
+        <{start}> {path} ?uri .
+    }}
+}}
+"""
+            logger.info(query)
+            return [row['uri'] for row in db.sparql(query) if row['uri'] != start]
+
+        seen = {start}
+        result = list()
+        level = [start]
+        while level and (depth is None or depth > 0):
+            found = list()
+            if db.is_sparql_store:
+                for chunk in chunked(level, chunk_size):
+                    values = ' '.join(f'<{uri}>' for uri in chunk)
+                    pattern = f'?uri <{predicate}> ?node .' if reverse else f'?node <{predicate}> ?uri .'
+                    query = f"""
+# SPARQL traverse level query
+SELECT DISTINCT ?uri
+WHERE {{
+    GRAPH <{graph}> {{
+        VALUES ?node {{ {values} }}
+        {pattern}
+    }}
+}}
+"""
+                    logger.info(query)
+                    found.extend(row['uri'] for row in db.sparql(query))
+            else:
+                for node in level:
+                    if reverse:
+                        found.extend(s for s, _, _ in db.read((None, predicate, node), graph))
+                    else:
+                        found.extend(o for _, _, o in db.read((node, predicate, None), graph))
+
+            level = list()
+            for uri in found:
+                if isinstance(uri, URIRef) and uri not in seen:
+                    seen.add(uri)
+                    level.append(uri)
+            result.extend(level)
+            depth = None if depth is None else depth - 1
+        return result
+
+    def _related(self, node: Union[str, 'Model'], field: str, depth: int, reverse: bool, db_key: str,
+                 chunk_size: int, trusted: bool) -> List['Model']:
+        model_field = getattr(self.model_class, field, None)
+        if not isinstance(model_field, IRIField):
+            raise ValueError(f'{self.model_class} has no IRIField named "{field}".')
+        db = Database.get_db(db_key)
+        start = node.__uri__ if isinstance(node, Model) else URIRef(node)
+        uris = self._traverse(start, model_field.predicate, db, depth, reverse, chunk_size)
+        instances = list()
+        for chunk in chunked(uris, chunk_size):
+            instances.extend(self._hydrate(chunk, db, trusted))
+        return instances
+
+    def descendants(self, root: Union[str, 'Model'], field: str, depth: int = None, db_key: str = 'default',
+                    chunk_size: int = 1000, trusted: bool = False) -> List['Model']:
+        """Concept.objects.descendants(root, field='children', depth=2)
+
+        Every instance reachable from `root` through the IRIField `field`, e.g. the whole subtree of a
+        skos:narrower hierarchy, up to `depth` levels down. The hierarchy is fetched in a single query, or one
+        query per level when `depth` is set, and hydrated in `VALUES` batches of `chunk_size`.
+        """
+        return self._related(root, field, depth, False, db_key, chunk_size, trusted)
+
+    def ancestors(self, node: Union[str, 'Model'], field: str, depth: int = None, db_key: str = 'default',
+                  chunk_size: int = 1000, trusted: bool = False) -> List['Model']:
+        """Concept.objects.ancestors(node, field='children')
+
+        Every instance `node` is reachable from through the IRIField `field`, up to `depth` levels up.
+        See `descendants()`.
+        """
+        return self._related(node, field, depth, True, db_key, chunk_size, trusted)
+
+    def _modified_field(self, field: str = None) -> tuple:
+        """Name and field of the given DateTimeField, or else of the model's only `auto_now` DateTimeField."""
+        if field is not None:
+            model_field = getattr(self.model_class, field, None)
+            if not isinstance(model_field, DateTimeField):
+                raise ValueError(f'{self.model_class} has no DateTimeField named "{field}".')
+            return field, model_field
+        fields = [
+            (name, model_field) for name, model_field in self.model_class.get_model_attributes(self.model_class)
+            if isinstance(model_field, DateTimeField) and model_field.auto_now
+        ]
+        if len(fields) != 1:
+            raise ValueError(f'{self.model_class} must have exactly one DateTimeField with auto_now, or pass field.')
+        return fields[0]
+
+    def _select_changed(self, db: Database, field: str, after: Union[datetime.datetime, Watermark, None],
+                        limit: int = None, **kwargs) -> List[tuple]:
+        """(URI, modified) of the instances matching the filters modified after a timestamp or watermark, oldest
+        change first."""
+        _, model_field = self._modified_field(field)
+        if after is None or isinstance(after, datetime.datetime):
+            after_ts, after_uri = after, None
+        else:
+            after_ts, after_uri = after
+
+        if db.is_sparql_store:
+            class_type_str = self._get_sparql_query_uri_lists(self.model_class.class_type.value)
+            where_clause = self._get_sparql_where_clause(kwargs)
+            filter_clause = ''
+            if after_ts is not None:
+                ts = Literal(after_ts, datatype=XSD.dateTime).n3()
+                condition = f'?modified > {ts}'
+                if after_uri is not None:
+                    condition += f' || (?modified = {ts} && STR(?uri) > {Literal(str(after_uri)).n3()})'
+                filter_clause = f'\n        FILTER ({condition})'
+            limit_clause = f'\nLIMIT {limit}' if limit is not None else ''
+            query = f"""
+# SPARQL changed query
+SELECT ?uri ?modified
+WHERE {{
+    GRAPH <{db.graph_identifier(self.model_class)}> {{
+        ?uri a {class_type_str} ;{where_clause}
+            <{model_field.predicate}> ?modified .{filter_clause}
+    }}
+}}
+ORDER BY ?modified ?uri{limit_clause}
+"""
+            logger.info(query)
+            return [(row['uri'], row['modified'].toPython()) for row in db.sparql(query)]
+
+        uris = self._read_matching_uris(db, **kwargs)
+        rows = list()
+        for uri, _, o in db.read((None, model_field.predicate, None), db.graph_identifier(self.model_class)):
+            modified = o.toPython()
+            if uri not in uris or not isinstance(modified, datetime.datetime):
+                continue
+            if after_ts is not None:
+                if modified < after_ts or modified == after_ts and (after_uri is None or str(uri) <= str(after_uri)):
+                    continue
+            rows.append((uri, modified))
+        rows.sort(key=lambda row: (row[1], str(row[0])))
+        return rows[:limit] if limit is not None else rows
+
+    def changed_since(self, ts: datetime.datetime, field: str = None, db_key: str = 'default', trusted: bool = False,
+                      **kwargs) -> QuerySet:
+        """Concept.objects.changed_since(ts)
+
+        Instances matching the filters modified after `ts`, according to the model's `DateTimeField(auto_now=True)`
+        or the DateTimeField named `field`. The timestamp filter runs in the store.
+        """
+        db = Database.get_db(db_key)
+        uris = [uri for uri, _ in self._select_changed(db, field, ts, **kwargs)]
+        queryset = QuerySet()
+        for chunk in chunked(uris, 1000):
+            queryset.update(self._hydrate(chunk, db, trusted))
         return queryset
 
+    def changes(self, since: Union[datetime.datetime, Watermark] = None, field: str = None, db_key: str = 'default',
+                chunk_size: int = 1000, trusted: bool = False, **kwargs) -> ChangeFeed:
+        """feed = Concept.objects.changes(since=checkpoint); for concept in feed: ...; checkpoint = feed.watermark
+
+        A resumable feed of the instances matching the filters modified after a timestamp or the `watermark` of a
+        previous feed, oldest change first. See `ChangeFeed` and `changed_since()`.
+        """
+        self._modified_field(field)
+        return ChangeFeed(self, since, field, db_key, chunk_size, trusted, kwargs)
+
+    def _predicate(self, name: str) -> URIRef:
+        field = getattr(self.model_class, name, None)
+        if not isinstance(field, Field):
+            raise ValueError(f'{self.model_class} has no field named "{name}".')
+        return field.predicate
+
+    def _aggregate_sparql(self, db: Database, group_by: List[str], aggregates: Dict[str, Aggregate],
+                          filters: dict) -> Dict[tuple, dict]:
+        """Aggregate values by group key, with one GROUP BY query per aggregated field.
+
+        Aggregates over different fields are kept in separate queries so many valued fields don't multiply each
+        other's rows.
+        """
+        class_type_str = self._get_sparql_query_uri_lists(self.model_class.class_type.value)
+        where_clause = self._get_sparql_where_clause(filters)
+        group_variables = [f'?group_{i}' for i in range(len(group_by))]
+        group_patterns = ''.join(
+            f'\n        OPTIONAL {{ ?uri <{self._predicate(name)}> {variable} . }}'
+            for name, variable in zip(group_by, group_variables)
+        )
+        group_clause = f'\nGROUP BY {" ".join(group_variables)}' if group_by else ''
+
+        by_field = dict()
+        for name, aggregate in aggregates.items():
+            by_field.setdefault(aggregate.field, dict())[name] = aggregate
+
+        result = dict()
+        for field, field_aggregates in by_field.items():
+            variable = '?uri' if field is None else '?value'
+            value_pattern = '' if field is None else f'\n        ?uri <{self._predicate(field)}> ?value .'
+            projection = ' '.join(
+                group_variables + [f'({aggregate.sparql(variable)} AS ?agg_{name})'
+                                   for name, aggregate in field_aggregates.items()]
+            )
+            query = f"""
+# SPARQL aggregate query
+SELECT {projection}
+WHERE {{
+    GRAPH <{db.graph_identifier(self.model_class)}> {{
+        ?uri a {class_type_str} ;{where_clause}
+        .{group_patterns}{value_pattern}
+    }}
+}}{group_clause}
+"""
+            logger.info(query)
+            for row in db.sparql(query):
+                key = tuple(to_python(row.get(variable[1:])) for variable in group_variables)
+                values = result.setdefault(key, dict())
+                for name, aggregate in field_aggregates.items():
+                    values[name] = aggregate.value(row.get(f'agg_{name}'))
+        return result
+
+    def _aggregate_local(self, db: Database, group_by: List[str], aggregates: Dict[str, Aggregate],
+                         filters: dict) -> Dict[tuple, dict]:
+        """Aggregate values by group key in a single pass over the matching subjects of a local store."""
+        graph = db.graph_identifier(self.model_class)
+        group_predicates = [self._predicate(name) for name in group_by]
+        field_predicates = {
+            aggregate.field: self._predicate(aggregate.field)
+            for aggregate in aggregates.values() if aggregate.field is not None
+        }
+        items = list(aggregates.items())
+
+        states = dict()
+        seen = dict()
+        for uri in self._read_matching_uris(db, **filters):
+            group_values = [
+                [to_python(o) for _, _, o in db.read((uri, predicate, None), graph)] or [None]
+                for predicate in group_predicates
+            ]
+            field_values = {
+                field: [to_python(o) for _, _, o in db.read((uri, predicate, None), graph)]
+                for field, predicate in field_predicates.items()
+            }
+            for key in itertools.product(*group_values):
+                if key not in states:
+                    states[key] = [aggregate.initial() for _, aggregate in items]
+                    seen[key] = [set() for _ in items]
+                state = states[key]
+                for i, (_, aggregate) in enumerate(items):
+                    for value in ([uri] if aggregate.field is None else field_values[aggregate.field]):
+                        if aggregate.distinct:
+                            if value in seen[key][i]:
+                                continue
+                            seen[key][i].add(value)
+                        state[i] = aggregate.step(state[i], value)
+
+        return {
+            key: {name: aggregate.result(state[i]) for i, (name, aggregate) in enumerate(items)}
+            for key, state in states.items()
+        }
+
+    def _aggregate(self, group_by: List[str], db_key: str, kwargs: dict) -> Dict[tuple, dict]:
+        aggregates = {name: val for name, val in kwargs.items() if isinstance(val, Aggregate)}
+        filters = {name: val for name, val in kwargs.items() if not isinstance(val, Aggregate)}
+        if not aggregates:
+            raise ValueError('At least one Aggregate is required.')
+        db = Database.get_db(db_key)
+        if db.is_sparql_store:
+            result = self._aggregate_sparql(db, group_by, aggregates, filters)
+        else:
+            result = self._aggregate_local(db, group_by, aggregates, filters)
+        if not group_by and not result:
+            # Without groups there is always a single result, even when nothing matches.
+            result[()] = dict()
+        empty = {name: aggregate.result(aggregate.initial()) for name, aggregate in aggregates.items()}
+        return {key: {**empty, **values} for key, values in result.items()}
+
+    def aggregate(self, db_key: str = 'default', **kwargs) -> dict:
+        """Concept.objects.aggregate(count=Count(), latest=Max('modified'), home_vocab_uri=scheme)
+
+        Aggregate values over every instance matching the filters. Keyword arguments given an `Aggregate` name
+        the results, the others filter the instances like `filter()`. No instances are built.
+        """
+        return self._aggregate([], db_key, kwargs)[()]
+
+    def annotate(self, *group_by: str, db_key: str = 'default', **kwargs) -> List[dict]:
+        """Concept.objects.annotate('home_vocab_uri', count=Count())
+
+        Aggregate values per distinct combination of values of the `group_by` fields, as a dict of the group
+        values and aggregates for each group. Instances without a value for a group field are grouped under None,
+        and instances with many values count towards each of their groups. See `aggregate()`.
+        """
+        return [
+            {**dict(zip(group_by, key)), **values}
+            for key, values in self._aggregate(list(group_by), db_key, kwargs).items()
+        ]
+
     def exclude(self, db_key: str = 'default', **kwargs) -> QuerySet:
         raise NotImplementedError()
 
-    def all(self, db_key: str = 'default',):
+    def _to_columns(self, uris: List[URIRef], db: Database, chunk_size: int) -> Dict[str, object]:
+        groups = (
+            group for chunk in chunked(uris, chunk_size) for group in self._read_pos(chunk, db).items()
+        )
+        return columnar.to_columns(self.model_class, groups)
+
+    def to_columns(self, db_key: str = 'default', chunk_size: int = 1000, **kwargs) -> Dict[str, object]:
+        """pandas.DataFrame(Concept.objects.to_arrow().to_pandas())
+
+        The field values of the instances matching the filters, sorted by URI, as typed columns keyed by field name
+        and `uri`. Values stream from the store, fetched in `VALUES` batches of `chunk_size` on SPARQL stores, into
+        columnar buffers without building instances, see `rdflib_orm.columnar`. Requires NumPy.
+        """
+        db = Database.get_db(db_key)
+        uris = sorted(self._select_uris(db, **kwargs) if db.is_sparql_store else self._read_matching_uris(db, **kwargs))
+        return self._to_columns(uris, db, chunk_size)
+
+    def to_arrow(self, db_key: str = 'default', chunk_size: int = 1000, **kwargs):
+        """The field values of the instances matching the filters as a `pyarrow.Table`, see `to_columns()`.
+        Requires pyarrow."""
+        return columnar.to_arrow(self.to_columns(db_key, chunk_size, **kwargs))
+
+    def lazy(self, **kwargs) -> LazyQuerySet:
+        """Model.objects.lazy(pref_label='Geology') - Model.objects.lazy(deprecated=True)
+
+        The instances matching the filters, as a `LazyQuerySet` to combine with others before it runs.
+        """
+        return LazyQuerySet(self.model_class, kwargs)
+
+    def paginate(self, after: str = None, size: int = 100, db_key: str = 'default', trusted: bool = False,
+                 **kwargs) -> Page:
+        """page = Concept.objects.paginate(after=request.args.get('cursor'), size=50)
+
+        A page of the instances matching the filters, see `LazyQuerySet.paginate()`.
+        """
+        return self.lazy(**kwargs).paginate(after, size, db_key, trusted)
+
+    def all(self, db_key: str = 'default', trusted: bool = False):
         """Get all instances of the class."""
-        return self.filter(class_type=self.model_class.class_type.value, db_key=db_key)
+        return self.filter(class_type=self.model_class.class_type.value, db_key=db_key, trusted=trusted)
+
+
+def _snapshot(value):
+    """Copy of a field value, kept to tell whether it changed since it was validated."""
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _unchanged(snapshot, value) -> bool:
+    if isinstance(value, list):
+        return isinstance(snapshot, tuple) and len(snapshot) == len(value) and all(
+            a is b for a, b in zip(snapshot, value))
+    return snapshot is value
 
 
 class ModelBase(type):
+    # Model classes by each of their class_type IRIs, used to hydrate subjects as their most specific class.
+    registry: Dict[URIRef, WeakSet] = dict()
+    # Incremented whenever a model class is registered.
+    registry_version = 0
+
     def __new__(cls, name, bases, attrs, **kwargs):
         new_class: Union[Model, type] = super().__new__(cls, name, bases, attrs)
 
         # TODO: Improve error message here.
-        # Ensure class models define the attribute class_type unless they are a mixin class.
-        if new_class.Meta.mixin == False and new_class.__name__ not in ('ModelBase', 'Model'):
+        # Ensure class models define the attribute class_type unless they are a mixin class. A class is a mixin when
+        # its own Meta says so, as the concrete models inheriting from a mixin also inherit its Meta.
+        meta = attrs.get('Meta')
+        is_mixin = meta is not None and vars(meta).get('mixin', False)
+        if not is_mixin and new_class.__name__ not in ('ModelBase', 'Model'):
             assert hasattr(new_class, 'class_type'), f'{cls} must have the attribute class_type.'
             class_type = getattr(new_class, 'class_type')
             assert isinstance(class_type, IRIField), f'{cls} must be an instance of IRIField.'
 
+            types = class_type.value if isinstance(class_type.value, list) else [class_type.value]
+            new_class.__class_types__ = frozenset(URIRef(type_) for type_ in types if type_ is not None)
+            for type_ in new_class.__class_types__:
+                ModelBase.registry.setdefault(type_, WeakSet()).add(new_class)
+            ModelBase.registry_version += 1
+
         query = Query(new_class)
         new_class.objects = query
         return new_class
@@ -406,6 +1340,14 @@ class Model(metaclass=ModelBase):
 
     class Meta:
         mixin = False
+        # Field names to keep an in-process value index for, see rdflib_orm.indexes.FieldIndex.
+        indexes = []
+        # CharField names to keep a prefix search index for, see rdflib_orm.indexes.SearchIndex.
+        search_fields = []
+        # Named graph holding the instances of the model, see Database.graph_identifier().
+        graph = None
+        # Keep the sorted URIs of lazy querysets in local stores between pages, see LazyQuerySet._sorted_uris().
+        cache_sorted_uris = False
 
     def __str__(self, instance_name: str = None):
         if instance_name is not None:
@@ -433,12 +1375,19 @@ class Model(metaclass=ModelBase):
                     # Filter out methods.
                     and not inspect.ismethod(tuple_item[1])
                     # Filter out ORM reserved attributes.
-                    and tuple_item[0] not in ('objects', 'get_model_attributes', 'save', 'Meta', 'serialize'),
+                    and tuple_item[0] not in ('objects', 'get_model_attributes', 'save', 'delete', 'Meta', 'serialize',
+                                              '_validate'),
                 inspect.getmembers(cls)
             )
         )
 
-    def __init__(self, uri: str, db_key: str = 'default', **kwargs):
+    def __init__(self, uri: str, db_key: str = 'default', trusted: bool = False, **kwargs):
+        """Create an instance, validating its field values.
+
+        Instances track the values their fields were validated with, and `save()` and `serialize()` only
+        validate again the fields changed since. Pass `trusted` to skip validation of values known to be
+        valid, such as those read back from the store.
+        """
         cls = self.__class__
         db = Database.get_db(db_key)
         # self.__objects__ = Query(cls)  # I don't think this is used anywhere?
@@ -447,44 +1396,58 @@ class Model(metaclass=ModelBase):
             raise Exception(f'{cls} instance uri is an empty string.')
         else:
             if not uri.startswith('http'):
-                self.__uri__ = URIRef(db.base_uri + uri)
+                self.__uri__ = terms.uri(db.base_uri + uri)
             else:
-                self.__uri__ = URIRef(uri)
+                self.__uri__ = terms.uri(uri)
 
         self.__attributes__ = self.get_model_attributes(self)
+        # Field values as they were validated, by field name.
+        self.__validated__ = dict()
 
         # try:
         for attribute_name, attribute_field in self.__attributes__:
             if kwargs.get(attribute_name) is not None:
                 value = kwargs[attribute_name]
-                attribute_field.validate(value, cls, attribute_name)
+                if not trusted:
+                    attribute_field.validate(value, cls, attribute_name)
                 # converted_value = attribute_field.convert(value)
                 setattr(self, attribute_name, value)
             else:
                 # Value was not passed in through the constructor, check if there's a default value
                 # on the class field and set it.
                 value = attribute_field.value
-                attribute_field.validate(value, cls, attribute_name)
+                if not trusted:
+                    attribute_field.validate(value, cls, attribute_name)
                 # converted_value = attribute_field.convert(value)
                 setattr(self, attribute_name, value)
+            self.__validated__[attribute_name] = _snapshot(value)
         # except Exception as e:
         #     # TODO: Check why we need this in a try except block?
         #     logger.error(traceback.print_exc())
         #     logger.error(str(e))
         #     raise Exception(f'Failed creating {cls} instance with identifier {self.__uri__}')
 
+    def _validate(self):
+        """Validate the fields whose value changed since they were last validated."""
+        cls = self.__class__
+        validated = self.__validated__
+        for attribute_name, attribute_field in self.__attributes__:
+            value = getattr(self, attribute_name)
+            if attribute_name in validated and _unchanged(validated[attribute_name], value):
+                continue
+            attribute_field.validate(value, cls, attribute_name)
+            validated[attribute_name] = _snapshot(value)
+
     def serialize(self, format='turtle'):
         uri = self.__uri__
-        cls = self.__class__
 
+        self._validate()
         g = Graph()
 
         for attribute_name, attribute_field in self.__attributes__:
             predicate = attribute_field.predicate
             inverse = getattr(attribute_field, 'inverse', None)
             value = getattr(self, attribute_name)
-
-            attribute_field.validate(value, cls, attribute_name)
             converted_value = attribute_field.convert(value, create_mode=False)
 
             if converted_value is not None:
@@ -497,88 +1460,91 @@ class Model(metaclass=ModelBase):
                     g.add((uri, predicate, converted_value))
                     if inverse is not None:
                         g.add((converted_value, inverse, uri))
-        return g.serialize(format=format).decode('utf-8')
+        return g.serialize(format=format)
 
     def save(self, db_key: str = 'default'):
         # g = Database.g
         uri = self.__uri__
         cls = self.__class__
         db = Database.get_db(db_key)
-
-        # Store current state in a temp graph for naive   transactional rollback functionality.
-        previous_state = Graph()
-        for _, p, o in db.read((uri, None, None)):
-            previous_state.add((uri, p, o))
-
-        # for s, p, _ in Database.read((None, None, uri)):
-        #     previous_state.add((s, p, uri))
-
-        def delete_current_triples(uri: URIRef):
-            g = Database.get_db(db_key)
-            if g.is_sparql_store:
-                # TODO: Use SPARQL query only if it's a SPARQL store, otherwise use Database.read.
-                query = f"""
-                    DELETE {{
-                        GRAPH <{db.g.identifier}> {{
-                            <{uri}> ?p ?o .
-                        }}
-                    }}
-                    WHERE {{
-                        GRAPH <{db.g.identifier}> {{
-                            <{uri}> ?p ?o .
-                        }}
-                    }}
-                """
-                db.sparql_update(query)
+        graph = db.graph_identifier(cls)
+        indexes = [index for index in get_indexes(cls, db) if index.is_current()]
+        # Validate before anything is written.
+        self._validate()
+
+        # The triples of each field, and the related URIs of the fields declaring an inverse.
+        triples = list()
+        inverse_fields = list()
+        for attribute_name, attribute_field in self.__attributes__:
+            converted_value = attribute_field.convert(getattr(self, attribute_name))
+            if converted_value is None:
+                items = []
             else:
-                # Inefficient - the RDFLib SPARQLUpdateStore sends each triple as a HTTP request.
-                for _, p, o in g.read((uri, None, None)):
-                    g.delete((uri, p, o))
-                for s, p, _ in g.read((None, None, uri)):
-                    g.delete((s, p, uri))
-
-        delete_current_triples(uri)
-
-        try:
-            for attribute_name, attribute_field in self.__attributes__:
-                predicate = attribute_field.predicate
-                inverse = getattr(attribute_field, 'inverse', None)
-                value = getattr(self, attribute_name)
-
-                attribute_field.validate(value, cls, attribute_name)
-                converted_value = attribute_field.convert(value)
-
-                if converted_value is not None:
-                    if isinstance(converted_value, list):
-                        for item in converted_value:
-                            db.write((uri, predicate, item))
-                            if inverse is not None:
-                                db.write((item, inverse, uri))
-                    else:
-                        db.write((uri, predicate, converted_value))
-                        if inverse is not None:
-                            db.write((converted_value, inverse, uri))
-        except Exception as e:
-            # Something bad happened, rollback.
-            # logger.error(traceback.print_exc())
-            # logger.error(str(e))
-
-            # Delete the current transaction.
-            logger.info('Rolling back transaction')
-            logger.info('Deleting current transaction')
-            delete_current_triples(uri)
-
-            # Rollback.
-            logger.info('Restoring previous state')
-            # SPARQLUpdateStore does not understand the overloaded += operator.
-            # Database.g += previous_state
-            # Manually restore by calling the Database.write() function.
-            for s, p, o in previous_state.triples((None, None, None)):
-                db.write((s, p, o))
-
-            logger.info('Transaction rollback complete')
-
-            raise e
+                items = converted_value if isinstance(converted_value, list) else [converted_value]
+            triples += [(uri, attribute_field.predicate, item) for item in items]
+            inverse = getattr(attribute_field, 'inverse', None)
+            if inverse is not None:
+                inverse_fields.append((attribute_field.predicate, inverse, set(items)))
+        inverse_triples = [(item, inverse, uri) for _, inverse, items in inverse_fields for item in items]
+        # Inverse triples on this instance are maintained by the instances relating to it, so its save keeps them.
+        kept = {inverse for _, inverse, _ in inverse_fields} - {field.predicate for _, field in self.__attributes__}
+
+        # The writes are buffered in a transaction and flushed together, as a single update request on
+        # SPARQL stores. Nothing is written if anything below raises, so nothing needs restoring on failure.
+        # Inverse triples are written on subjects of other types, so they count as writes of their predicate.
+        scope = cls.objects._write_scope() | {inverse for _, inverse, _ in inverse_fields}
+        with db.atomic(), db.scope(scope):
+            if db.is_sparql_store:
+                # Inverse triples of the related URIs no longer in a field are removed in the store, without
+                # reading the previous ones first.
+                updates = list()
+                for predicate, inverse, items in inverse_fields:
+                    not_in = f'\n        FILTER (?o NOT IN ({", ".join(item.n3() for item in items)}))' if items else ''
+                    updates.append(f"""
+DELETE {{
+    GRAPH <{graph}> {{
+        ?o <{inverse}> <{uri}> .
+    }}
+}}
+WHERE {{
+    GRAPH <{graph}> {{
+        <{uri}> <{predicate}> ?o .{not_in}
+    }}
+}}""")
+                not_kept = f'\n        FILTER (?p NOT IN ({", ".join(f"<{p}>" for p in kept)}))' if kept else ''
+                updates.append(f"""
+DELETE {{
+    GRAPH <{graph}> {{
+        <{uri}> ?p ?o .
+    }}
+}}
+WHERE {{
+    GRAPH <{graph}> {{
+        <{uri}> ?p ?o .{not_kept}
+    }}
+}}""")
+                db.sparql_update(' ;'.join(updates))
+                db.write_many(triples + inverse_triples, graph)
+            else:
+                current = list(db.read((uri, None, None), graph))
+                for predicate, inverse, items in inverse_fields:
+                    for _, p, o in current:
+                        if p == predicate and o not in items:
+                            db.delete((o, inverse, uri), graph)
+                new = set(triples)
+                for triple in current:
+                    if triple[1] not in kept and triple not in new:
+                        db.delete(triple, graph)
+                current = set(current)
+                db.write_many([triple for triple in triples if triple not in current] + inverse_triples, graph)
+
+            for index in indexes:
+                index.update(self)
+
+    def delete(self, db_key: str = 'default'):
+        """Delete this instance and the inverse triples declared on its fields in a single request."""
+        db = Database.get_db(db_key)
+        self.objects._delete([self.__uri__], db)
 
 
 # Avoid circular imports by importing fields after the model-related classes have been initialised.
@@ -0,0 +1,104 @@
+"""Process pool helpers for CPU-bound bulk loads.
+
+Converting and validating field values is pure Python and keeps a single core busy when the store is local.
+These helpers partition the work into chunks and run them on a `ProcessPoolExecutor`. Workers receive the model
+classes by reference and plain values, and send back compact tuples of rdflib terms or Python values rather than
+pickled `Model` instances. Workers don't rely on state of the parent process, such as the registry of model
+subclasses, so they work with any multiprocessing start method, `spawn` included.
+"""
+import itertools
+from collections import deque
+from concurrent.futures import Executor
+from typing import Callable, Iterable, Iterator, List, Tuple, Type
+
+from rdflib import URIRef
+from rdflib.term import Node
+
+Triple = Tuple[Node, Node, Node]
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def imap(executor: Executor, func: Callable, chunks: Iterable, in_flight: int) -> Iterator:
+    """Like `Executor.map()`, but with at most `in_flight` chunks submitted at once so memory stays flat."""
+    chunks = iter(chunks)
+    pending = deque(executor.submit(func, chunk) for chunk in itertools.islice(chunks, in_flight))
+    try:
+        while pending:
+            result = pending.popleft().result()
+            for chunk in itertools.islice(chunks, 1):
+                pending.append(executor.submit(func, chunk))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def record_triples(model_class: Type['Model'], base_uri: URIRef, records: List[dict]) -> List[Triple]:
+    """Validate and convert records of field values into the triples `Model.save()` would write.
+
+    Each record is a dict of field values with the instance `uri`, resolved against `base_uri` like `Model`.
+    """
+    attributes = model_class.get_model_attributes(model_class)
+    columns = {name: [record.get(name) for record in records] for name, _ in attributes}
+    for name, field in attributes:
+        values = columns[name]
+        if field.value is not None:
+            values = columns[name] = [field.value if value is None else value for value in values]
+        field.validate_many(values, model_class, name)
+
+    triples = list()
+    for i, record in enumerate(records):
+        uri = record['uri']
+        uri = URIRef(uri) if uri.startswith('http') else URIRef(base_uri + uri)
+        for name, field in attributes:
+            converted = field.convert(columns[name][i])
+            if converted is None:
+                continue
+            inverse = getattr(field, 'inverse', None)
+            for item in (converted if isinstance(converted, list) else [converted]):
+                triples.append((uri, field.predicate, item))
+                if inverse is not None:
+                    triples.append((item, inverse, uri))
+    return triples
+
+
+def deferred_predicates(model_class: Type['Model']) -> set:
+    """Predicates of the fields that query the database to convert their values, and so can't run in a worker."""
+    from rdflib_orm.fields import RelationshipField
+
+    return {
+        field.predicate for _, field in model_class.get_model_attributes(model_class)
+        if isinstance(field, RelationshipField)
+    }
+
+
+def instance_values(groups: List[Tuple[URIRef, Type['Model'], list]]) -> List[Tuple[URIRef, Type['Model'], dict, list]]:
+    """Convert and validate the (predicate, object) pairs of each subject into the values to create it with.
+
+    Each subject comes with the model class to create it as, resolved by the caller, which is sent back along with
+    its values. The pairs of deferred predicates are sent back as they are, for the caller to convert.
+    """
+    deferred_by_class = dict()
+    result = list()
+    for uri, resolved, pos in groups:
+        if resolved not in deferred_by_class:
+            deferred_by_class[resolved] = deferred_predicates(resolved)
+        deferred = deferred_by_class[resolved]
+        values = resolved.objects._instance_values([(p, o) for p, o in pos if p not in deferred], resolved)
+        result.append((uri, resolved, values, [(p, o) for p, o in pos if p in deferred]))
+    for resolved, deferred in deferred_by_class.items():
+        rows = [values for _, row_class, values, _ in result if row_class is resolved]
+        for name, field in resolved.get_model_attributes(resolved):
+            if field.predicate in deferred:
+                continue
+            column = [values.get(name) for values in rows]
+            field.validate_many([field.value if value is None else value for value in column], resolved, name)
+    return result
@@ -0,0 +1,42 @@
+"""Interned rdflib terms.
+
+Fields convert the same few thousand IRIs and literals over and over on saves, filters and hydration.
+`uri()` and `literal()` return a shared, immutable term for repeated values from a bounded LRU cache
+instead of allocating a new one each time. The cache is keyed by value type too, so `1`, `1.0` and
+`True` stay distinct literals.
+"""
+from functools import lru_cache
+from typing import Optional
+
+from rdflib import URIRef, Literal
+
+# Maximum number of distinct terms kept by each cache.
+CACHE_SIZE = 65536
+
+
+def _uri(value: str) -> URIRef:
+    return URIRef(value)
+
+
+def _literal(value, lang: Optional[str] = None, datatype: Optional[URIRef] = None) -> Literal:
+    return Literal(value, lang=lang, datatype=datatype)
+
+
+uri = lru_cache(maxsize=CACHE_SIZE, typed=True)(_uri)
+literal = lru_cache(maxsize=CACHE_SIZE, typed=True)(_literal)
+
+
+def set_cache_size(maxsize: int):
+    """Resize the term caches, dropping their content. A size of 0 turns interning off."""
+    global uri, literal
+    uri = lru_cache(maxsize=maxsize, typed=True)(_uri)
+    literal = lru_cache(maxsize=maxsize, typed=True)(_literal)
+
+
+def cache_info() -> dict:
+    return {'uri': uri.cache_info(), 'literal': literal.cache_info()}
+
+
+def cache_clear():
+    uri.cache_clear()
+    literal.cache_clear()
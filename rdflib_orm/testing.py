@@ -0,0 +1,137 @@
+"""Testing utilities.
+
+`MockSPARQLEndpoint` is an in-process SPARQL 1.1 protocol server backed by an rdflib `Dataset`.
+It lets the SPARQL code paths be tested and benchmarked without an outside triplestore,
+with configurable injected latency and request counting.
+
+    with MockSPARQLEndpoint(latency=0.005) as endpoint:
+        Database.set_db(endpoint.graph('http://example.com/graph'), base_uri='http://example.com/')
+        Concept.objects.get('http://example.com/concept_a')
+        assert endpoint.requests == 1
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Union
+from urllib.parse import urlparse, parse_qs
+
+from rdflib import Dataset, Graph, URIRef
+from rdflib.plugins.stores.sparqlstore import SPARQLUpdateStore
+
+
+class MockSPARQLEndpoint:
+    def __init__(self, dataset: Dataset = None, latency: float = 0.0, host: str = '127.0.0.1', port: int = 0):
+        self.dataset = Dataset() if dataset is None else dataset
+        # Seconds slept before answering each request, to simulate network round trips.
+        self.latency = latency
+        self.queries = 0
+        self.updates = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    def __enter__(self) -> 'MockSPARQLEndpoint':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/sparql'
+
+    @property
+    def requests(self) -> int:
+        return self.queries + self.updates
+
+    def reset(self):
+        """Reset the request counters."""
+        with self._lock:
+            self.queries = 0
+            self.updates = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def graph(self, identifier: Union[str, URIRef]) -> Graph:
+        """A client `Graph` for a named graph of this endpoint, as passed to `Database.set_db()`."""
+        store = SPARQLUpdateStore(query_endpoint=self.url, update_endpoint=self.url)
+        return Graph(store=store, identifier=URIRef(identifier))
+
+    def _query(self, query: str, default_graph: str = None):
+        with self._lock:
+            self.queries += 1
+            if default_graph is not None:
+                result = self.dataset.graph(URIRef(default_graph)).query(query)
+            else:
+                result = self.dataset.query(query)
+        if result.type in ('SELECT', 'ASK'):
+            # Always JSON, which rdflib clients parse whatever they asked for: rdflib's XML results writer drops the
+            # value of falsy literals such as 0 and false.
+            return result.serialize(format='json'), 'application/sparql-results+json'
+        return result.serialize(format='xml'), 'application/rdf+xml'
+
+    def _update(self, update: str):
+        with self._lock:
+            self.updates += 1
+            self.dataset.update(update)
+
+    def _handler(self):
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self._dispatch(self._params().get('query'), None)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+                content_type = self.headers.get('Content-Type', '').split(';')[0].strip()
+                if content_type == 'application/sparql-query':
+                    self._dispatch(body, None)
+                elif content_type == 'application/sparql-update':
+                    self._dispatch(None, body)
+                else:
+                    params = {key: values[0] for key, values in parse_qs(body).items()}
+                    self._dispatch(params.get('query'), params.get('update'), params)
+
+            def _params(self) -> dict:
+                return {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+
+            def _dispatch(self, query, update, params: dict = None):
+                if endpoint.latency:
+                    time.sleep(endpoint.latency)
+                params = {**self._params(), **(params or {})}
+                try:
+                    if query is not None:
+                        body, content_type = endpoint._query(query, params.get('default-graph-uri'))
+                    elif update is not None:
+                        endpoint._update(update)
+                        body, content_type = b'', 'text/plain'
+                    else:
+                        self._respond(400, b'Expected a query or update parameter.', 'text/plain')
+                        return
+                except Exception as e:
+                    self._respond(400, str(e).encode('utf-8'), 'text/plain')
+                    return
+                self._respond(200, body, content_type)
+
+            def _respond(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
@@ -29,4 +29,7 @@ setuptools.setup(
         'rdflib>=6.0.0',
         'requests==2.25.1',
     ],
+    extras_require={
+        'columnar': ['numpy', 'pyarrow'],
+    },
 )
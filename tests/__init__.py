@@ -1,3 +1,4 @@
 from rdflib.namespace import Namespace
 
 BASE_URI = Namespace('http://example.com/')
+GRAPH_URI = BASE_URI.graph
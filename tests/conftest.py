@@ -0,0 +1,19 @@
+import pytest
+
+from rdflib_orm.db import Database
+from rdflib_orm.testing import MockSPARQLEndpoint
+from tests import BASE_URI, GRAPH_URI
+
+
+@pytest.fixture
+def sparql_endpoint():
+    """A local SPARQL endpoint backed by an in-memory rdflib Dataset."""
+    with MockSPARQLEndpoint() as endpoint:
+        yield endpoint
+
+
+@pytest.fixture
+def sparql_db(sparql_endpoint) -> Database:
+    """The default Database, connected to the local SPARQL endpoint."""
+    Database.set_db(sparql_endpoint.graph(GRAPH_URI), BASE_URI)
+    return Database.get_db()
@@ -0,0 +1,72 @@
+import datetime
+
+import pytest
+from rdflib import Graph
+from rdflib.namespace import RDF, RDFS, SKOS, DCTERMS, OWL
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from tests import BASE_URI
+
+
+class AggregateTestConcept(models.Model):
+    class_type = models.IRIField(RDF.type, SKOS.Concept)
+    label = models.CharField(RDFS.label, lang='en')
+    scheme = models.IRIField(SKOS.inScheme)
+    rank = models.IntegerField(OWL.versionInfo)
+    tags = models.CharField(SKOS.notation, many=True)
+    modified = models.DateTimeField(DCTERMS.modified)
+
+
+def day(i: int) -> datetime.datetime:
+    return datetime.datetime(2021, 1, i)
+
+
+def populate():
+    for i, scheme in enumerate(['a', 'a', 'a', 'b', None], start=1):
+        AggregateTestConcept(
+            uri=str(i), label=f'concept {i}', scheme=BASE_URI[scheme] if scheme else None, rank=i,
+            tags=[f'T{i}', 'shared'], modified=day(i)
+        ).save()
+
+
+def assert_aggregates():
+    assert AggregateTestConcept.objects.aggregate(
+        count=models.Count(), total=models.Sum('rank'), average=models.Avg('rank'),
+        first=models.Min('modified'), last=models.Max('modified'), tags=models.Count('tags'),
+        distinct_tags=models.Count('tags', distinct=True),
+    ) == {'count': 5, 'total': 15, 'average': 3.0, 'first': day(1), 'last': day(5), 'tags': 10,
+          'distinct_tags': 6}
+    assert AggregateTestConcept.objects.aggregate(count=models.Count(), scheme=BASE_URI.a) == {'count': 3}
+    assert AggregateTestConcept.objects.aggregate(count=models.Count(), last=models.Max('rank'),
+                                                  scheme=BASE_URI.missing) == {'count': 0, 'last': None}
+
+    groups = AggregateTestConcept.objects.annotate('scheme', count=models.Count(), last=models.Max('modified'))
+    assert sorted(groups, key=lambda group: str(group['scheme'])) == [
+        {'scheme': None, 'count': 1, 'last': day(5)},
+        {'scheme': str(BASE_URI.a), 'count': 3, 'last': day(3)},
+        {'scheme': str(BASE_URI.b), 'count': 1, 'last': day(4)},
+    ]
+
+    groups = AggregateTestConcept.objects.annotate('tags', count=models.Count())
+    assert {group['tags']: group['count'] for group in groups} == {'T1': 1, 'T2': 1, 'T3': 1, 'T4': 1, 'T5': 1,
+                                                                   'shared': 5}
+
+
+def test_aggregates():
+    Database.set_db(Graph(), BASE_URI)
+    populate()
+    assert_aggregates()
+
+
+def test_aggregates_sparql(sparql_db):
+    populate()
+    assert_aggregates()
+
+
+def test_aggregate_requires_aggregates():
+    Database.set_db(Graph(), BASE_URI)
+    with pytest.raises(ValueError):
+        AggregateTestConcept.objects.annotate('scheme')
+    with pytest.raises(ValueError):
+        AggregateTestConcept.objects.aggregate(count=models.Count('missing'))
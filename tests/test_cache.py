@@ -0,0 +1,67 @@
+import time
+
+from rdflib.namespace import RDF, RDFS, OWL
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from rdflib_orm.db.cache import ResultCache
+from tests import BASE_URI, GRAPH_URI
+
+
+class CacheTestModel(models.Model):
+    class_type = models.IRIField(RDF.type, OWL.Thing)
+    comment = models.CharField(RDFS.comment)
+
+
+def test_normalize_ignores_formatting():
+    assert ResultCache.normalize('\n# comment\n  SELECT *\n\n    WHERE { ?s ?p <urn:a#b> }  ') == \
+        'SELECT *\nWHERE { ?s ?p <urn:a#b> }'
+
+
+def test_cache_ttl_and_invalidate(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache.sqlite'), ttl=0.05)
+    cache.set('default', 'SELECT 1', b'result')
+    cache.set('other', 'SELECT 1', b'other')
+    assert cache.get('default', '  SELECT 1') == b'result'
+    cache.invalidate('default')
+    assert cache.get('default', 'SELECT 1') is None
+    assert cache.get('other', 'SELECT 1') == b'other'
+    time.sleep(0.06)
+    assert cache.get('other', 'SELECT 1') is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path / 'cache.sqlite'), max_size=10)
+    cache.set('default', 'a', b'aaaa')
+    cache.set('default', 'b', b'bbbb')
+    cache.get('default', 'a')
+    cache.set('default', 'c', b'cccc')
+    assert cache.get('default', 'a') == b'aaaa'
+    assert cache.get('default', 'b') is None
+    assert cache.get('default', 'c') == b'cccc'
+
+
+def test_database_serves_queries_from_cache(tmp_path, sparql_endpoint):
+    path = str(tmp_path / 'cache.sqlite')
+    Database.set_db(sparql_endpoint.graph(GRAPH_URI), BASE_URI, cache=ResultCache(path))
+    CacheTestModel(uri='a', comment='a').save()
+    assert CacheTestModel.objects.get(BASE_URI.a).comment == 'a'
+
+    # A warm restart, with a new cache connection to the same file.
+    Database.set_db(sparql_endpoint.graph(GRAPH_URI), BASE_URI, cache=ResultCache(path))
+    sparql_endpoint.reset()
+    assert CacheTestModel.objects.get(BASE_URI.a).comment == 'a'
+    assert {instance.__uri__ for instance in CacheTestModel.objects.filter(comment='a')} == {BASE_URI.a}
+    CacheTestModel.objects.filter(comment='a')
+    assert sparql_endpoint.queries == 1
+
+
+def test_database_write_invalidates_cache(tmp_path, sparql_endpoint):
+    Database.set_db(sparql_endpoint.graph(GRAPH_URI), BASE_URI, cache=ResultCache(str(tmp_path / 'cache.sqlite')))
+    instance = CacheTestModel(uri='a', comment='a')
+    instance.save()
+    assert CacheTestModel.objects.get(BASE_URI.a).comment == 'a'
+
+    instance.comment = 'changed'
+    instance.save()
+    assert CacheTestModel.objects.get(BASE_URI.a).comment == 'changed'
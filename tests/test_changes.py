@@ -0,0 +1,64 @@
+import datetime
+
+import pytest
+from rdflib import Graph
+from rdflib.namespace import RDF, RDFS, SKOS, DCTERMS
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from tests import BASE_URI
+
+
+class ChangesTestConcept(models.Model):
+    class_type = models.IRIField(RDF.type, SKOS.Concept)
+    label = models.CharField(RDFS.label)
+    modified = models.DateTimeField(DCTERMS.modified, auto_now=True)
+
+
+def populate() -> datetime.datetime:
+    """Save five concepts, then touch two of them. Returns a timestamp taken between the two."""
+    for i in range(5):
+        ChangesTestConcept(uri=str(i), label=f'concept {i}').save()
+    checkpoint = datetime.datetime.now()
+    for i in (3, 1):
+        ChangesTestConcept(uri=str(i), label=f'changed {i}').save()
+    return checkpoint
+
+
+def assert_changes(checkpoint: datetime.datetime):
+    changed = ChangesTestConcept.objects.changed_since(checkpoint)
+    assert {instance.__uri__ for instance in changed} == {BASE_URI['1'], BASE_URI['3']}
+    assert {instance.__uri__ for instance in ChangesTestConcept.objects.changed_since(checkpoint, label='changed 1')} \
+        == {BASE_URI['1']}
+    assert {instance.__uri__ for instance in ChangesTestConcept.objects.all().changed_since(checkpoint)} == \
+        {BASE_URI['1'], BASE_URI['3']}
+
+    # Oldest change first, in pages of two, resumed from the watermark after each instance.
+    feed = ChangesTestConcept.objects.changes(chunk_size=2)
+    seen = list()
+    for instance in feed:
+        seen.append(instance.__uri__)
+        if len(seen) == 3:
+            break
+    feed = ChangesTestConcept.objects.changes(since=feed.watermark, chunk_size=2)
+    seen += [instance.__uri__ for instance in feed]
+    assert seen == [BASE_URI[str(i)] for i in (0, 2, 4, 4, 3, 1)]
+    assert list(feed) == []
+
+    ChangesTestConcept(uri='5', label='concept 5').save()
+    assert [instance.__uri__ for instance in feed] == [BASE_URI['5']]
+
+
+def test_changes():
+    Database.set_db(Graph(), BASE_URI)
+    assert_changes(populate())
+
+
+def test_changes_sparql(sparql_db):
+    assert_changes(populate())
+
+
+def test_changes_requires_modified_field():
+    Database.set_db(Graph(), BASE_URI)
+    with pytest.raises(ValueError):
+        ChangesTestConcept.objects.changes(field='label')
@@ -0,0 +1,73 @@
+import datetime
+
+import pytest
+from rdflib import Graph
+from rdflib.namespace import RDF, RDFS, SKOS, DCTERMS, OWL
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from tests import BASE_URI
+
+numpy = pytest.importorskip('numpy')
+
+
+class ColumnarTestConcept(models.Model):
+    class_type = models.IRIField(RDF.type, SKOS.Concept)
+    label = models.CharField(RDFS.label, lang='en')
+    scheme = models.IRIField(SKOS.inScheme)
+    rank = models.IntegerField(OWL.versionInfo)
+    deprecated = models.BooleanField(OWL.deprecated)
+    modified = models.DateTimeField(DCTERMS.modified)
+    tags = models.CharField(SKOS.notation, many=True)
+
+
+def populate():
+    ColumnarTestConcept(uri='a', label='A', scheme=BASE_URI.s, rank=1, deprecated=False,
+                        modified=datetime.datetime(2021, 1, 1), tags=['x', 'y']).save()
+    ColumnarTestConcept(uri='b', label='B', scheme=BASE_URI.s, deprecated=True, tags=['y']).save()
+    ColumnarTestConcept(uri='c', label='C', rank=3).save()
+
+
+def assert_columns(columns):
+    assert columns['uri'].to_list() == [str(BASE_URI.a), str(BASE_URI.b), str(BASE_URI.c)]
+    assert columns['label'].to_list() == ['A', 'B', 'C']
+    assert columns['scheme'].dictionary.to_list() == [str(BASE_URI.s)]
+    assert columns['scheme'].codes.tolist() == [0, 0, -1]
+    assert columns['rank'].tolist() == [1, None, 3]
+    assert columns['rank'].dtype == numpy.int64
+    assert columns['deprecated'].tolist() == [False, True, None]
+    assert columns['modified'][0] == numpy.datetime64('2021-01-01T00:00:00')
+    assert numpy.isnat(columns['modified'][1:]).all()
+    assert columns['tags'].offsets.tolist() == [0, 2, 3, 3]
+    assert columns['tags'].to_list() == [['x', 'y'], ['y'], []]
+    assert columns['class_type'].dictionary.to_list() == [str(SKOS.Concept)]
+
+
+def test_to_columns():
+    Database.set_db(Graph(), BASE_URI)
+    populate()
+    assert_columns(ColumnarTestConcept.objects.to_columns(chunk_size=2))
+    columns = ColumnarTestConcept.objects.to_columns(scheme=BASE_URI.s)
+    assert columns['uri'].to_list() == [str(BASE_URI.a), str(BASE_URI.b)]
+
+
+def test_to_columns_sparql(sparql_db):
+    populate()
+    assert_columns(ColumnarTestConcept.objects.to_columns(chunk_size=2))
+    assert_columns((ColumnarTestConcept.objects.lazy(scheme=BASE_URI.s) | ColumnarTestConcept.objects.lazy(rank=3))
+                   .to_columns())
+
+
+def test_to_arrow():
+    pytest.importorskip('pyarrow')
+    Database.set_db(Graph(), BASE_URI)
+    populate()
+    table = ColumnarTestConcept.objects.to_arrow()
+    assert table.num_rows == 3
+    rows = table.to_pylist()
+    assert rows[0]['uri'] == str(BASE_URI.a)
+    assert rows[0]['tags'] == ['x', 'y']
+    assert rows[1]['rank'] is None
+    assert rows[2]['scheme'] is None
+    assert rows[2]['modified'] is None
+    assert rows[0]['modified'] == datetime.datetime(2021, 1, 1)
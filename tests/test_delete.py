@@ -0,0 +1,61 @@
+from rdflib import Graph, URIRef
+from rdflib.namespace import RDF, RDFS, OWL, SKOS
+from rdflib.plugins.stores.sparqlstore import SPARQLUpdateStore
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from tests import BASE_URI
+
+
+class DeleteTestModel(models.Model):
+    class_type = models.IRIField(RDF.type, OWL.Thing)
+    comment = models.CharField(RDFS.comment)
+    children = models.IRIField(SKOS.narrower, many=True, inverse=SKOS.broader)
+
+
+def test_model_delete_removes_outgoing_and_inverse_triples():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+
+    child = DeleteTestModel(uri='child', comment='child')
+    child.save()
+    parent = DeleteTestModel(uri='parent', comment='parent', children=[child])
+    parent.save()
+    assert (BASE_URI.child, SKOS.broader, BASE_URI.parent) in g
+    unrelated = (BASE_URI.other, RDFS.seeAlso, BASE_URI.parent)
+    g.add(unrelated)
+
+    parent.delete()
+
+    assert list(g.triples((BASE_URI.parent, None, None))) == []
+    assert (BASE_URI.child, SKOS.broader, BASE_URI.parent) not in g
+    # Only declared inverse predicates are removed.
+    assert unrelated in g
+    assert (BASE_URI.child, RDFS.comment, None) in g
+
+
+def test_queryset_delete():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    DeleteTestModel(uri='a', comment='stale').save()
+    DeleteTestModel(uri='b', comment='stale').save()
+    DeleteTestModel(uri='c', comment='fresh').save()
+
+    DeleteTestModel.objects.filter(comment='stale').delete()
+
+    assert list(g.subjects(RDF.type, OWL.Thing)) == [BASE_URI.c]
+
+
+def test_queryset_delete_sparql_store_single_request(mocker):
+    store = SPARQLUpdateStore()
+    g = Graph(store=store, identifier=URIRef('urn:graph'))
+    Database.databases['sparql'] = Database(g, BASE_URI)
+    update = mocker.patch('rdflib.plugins.stores.sparqlstore.SPARQLUpdateStore.update')
+
+    queryset = models.QuerySet(DeleteTestModel(uri=f'http://example.com/{i}') for i in range(100))
+    queryset.delete(db_key='sparql')
+
+    update.assert_called_once()
+    query = update.call_args[0][0]
+    assert '<http://example.com/99>' in query
+    assert f'<{SKOS.broader}>' in query
@@ -0,0 +1,93 @@
+import pytest
+from rdflib import Dataset, Graph, Literal
+from rdflib.namespace import RDF, RDFS, OWL, SKOS
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from tests import BASE_URI, GRAPH_URI
+
+
+class GraphTestConcept(models.Model):
+    class_type = models.IRIField(RDF.type, SKOS.Concept)
+    label = models.CharField(RDFS.label)
+
+    class Meta:
+        graph = 'concepts'
+
+
+class GraphTestThing(models.Model):
+    class_type = models.IRIField(RDF.type, OWL.Thing)
+    label = models.CharField(RDFS.label)
+
+
+def test_graph_identifier():
+    db = Database(Graph(identifier=GRAPH_URI), BASE_URI)
+    assert db.graph_identifier(GraphTestConcept) == BASE_URI.concepts
+    assert db.graph_identifier(GraphTestThing) == GRAPH_URI
+
+
+def test_models_are_routed_to_their_graph():
+    ds = Dataset()
+    Database.set_db(ds.graph(GRAPH_URI), BASE_URI)
+    GraphTestConcept(uri='a', label='concept').save()
+    GraphTestThing(uri='b', label='thing').save()
+
+    assert (BASE_URI.a, RDFS.label, Literal('concept')) in ds.graph(BASE_URI.concepts)
+    assert (BASE_URI.a, None, None) not in ds.graph(GRAPH_URI)
+    assert (BASE_URI.b, RDFS.label, Literal('thing')) in ds.graph(GRAPH_URI)
+    assert GraphTestConcept.objects.get(BASE_URI.a).label == 'concept'
+    assert {instance.__uri__ for instance in GraphTestConcept.objects.filter(label='concept')} == {BASE_URI.a}
+    assert GraphTestConcept.objects.filter(label='thing') == set()
+
+    GraphTestConcept(uri='a', label='concept').delete()
+    assert len(ds.graph(BASE_URI.concepts)) == 0
+    assert len(ds.graph(GRAPH_URI)) == 2
+
+
+def test_atomic_buffers_writes_per_graph():
+    ds = Dataset()
+    Database.set_db(ds.graph(GRAPH_URI), BASE_URI)
+    with Database.get_db().atomic():
+        GraphTestConcept(uri='a', label='concept').save()
+        GraphTestThing(uri='b', label='thing').save()
+        assert GraphTestConcept.objects.get(BASE_URI.a).label == 'concept'
+    assert len(ds.graph(BASE_URI.concepts)) == 2
+    assert len(ds.graph(GRAPH_URI)) == 2
+
+
+def test_replace_graph_local():
+    ds = Dataset()
+    Database.set_db(ds.graph(GRAPH_URI), BASE_URI)
+    GraphTestConcept(uri='a', label='stale').save()
+    GraphTestThing(uri='b', label='thing').save()
+
+    source = Graph()
+    source.add((BASE_URI.c, RDF.type, SKOS.Concept))
+    source.add((BASE_URI.c, RDFS.label, Literal('fresh')))
+    GraphTestConcept.objects.replace_graph(source)
+
+    assert {instance.__uri__ for instance in GraphTestConcept.objects.all()} == {BASE_URI.c}
+    assert len(ds.graph(GRAPH_URI)) == 2
+
+
+def test_replace_graph_sparql_store_single_request(sparql_db, sparql_endpoint):
+    GraphTestConcept(uri='a', label='stale').save()
+    GraphTestThing(uri='b', label='thing').save()
+    assert (BASE_URI.a, RDFS.label, Literal('stale')) in sparql_endpoint.dataset.graph(BASE_URI.concepts)
+
+    source = Graph()
+    source.add((BASE_URI.c, RDF.type, SKOS.Concept))
+    source.add((BASE_URI.c, RDFS.label, Literal('fresh')))
+    sparql_endpoint.reset()
+    GraphTestConcept.objects.replace_graph(source)
+
+    assert sparql_endpoint.updates == 1
+    assert set(sparql_endpoint.dataset.graph(BASE_URI.concepts)) == set(source)
+    assert GraphTestConcept.objects.get(BASE_URI.c).label == 'fresh'
+    assert GraphTestThing.objects.get(BASE_URI.b).label == 'thing'
+
+
+def test_replace_graph_requires_meta_graph():
+    Database.set_db(Graph(), BASE_URI)
+    with pytest.raises(ValueError):
+        GraphTestThing.objects.replace_graph(Graph())
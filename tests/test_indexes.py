@@ -0,0 +1,220 @@
+import pytest
+from rdflib import Graph, Literal
+from rdflib.namespace import RDF, RDFS, OWL, SKOS
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from rdflib_orm.indexes import FieldIndex, SearchIndex
+from tests import BASE_URI
+
+
+class IndexedTestModel(models.Model):
+    class_type = models.IRIField(RDF.type, OWL.Thing)
+    label = models.CharField(RDFS.label, lang='en')
+    notations = models.CharField(SKOS.notation, many=True)
+    comment = models.CharField(RDFS.comment)
+
+    class Meta:
+        indexes = ['label', 'notations']
+
+
+def uris(queryset):
+    return {instance.__uri__ for instance in queryset}
+
+
+def test_model_without_indexes():
+    class TestModel(models.Model):
+        class_type = models.IRIField(RDF.type, OWL.Thing)
+
+    assert FieldIndex.get(TestModel, Database(Graph(), BASE_URI)) is None
+
+
+def test_indexed_filter(mocker):
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    IndexedTestModel(uri='a', label='A', notations=['1', '2']).save()
+    IndexedTestModel(uri='b', label='B', notations=['2']).save()
+
+    build = mocker.spy(FieldIndex, 'build')
+    assert uris(IndexedTestModel.objects.filter(label='A')) == {BASE_URI.a}
+    # Instances match when they have the filter values, among any others.
+    assert uris(IndexedTestModel.objects.filter(notations=['2'])) == {BASE_URI.a, BASE_URI.b}
+    assert uris(IndexedTestModel.objects.filter(notations=['2', '1'])) == {BASE_URI.a}
+    assert uris(IndexedTestModel.objects.filter(label='B', notations=['1'])) == set()
+    assert build.call_count == 1
+
+    db = Database.get_db()
+    with db.capture() as stats:
+        IndexedTestModel.objects.filter(label='A')
+    # Only the matched instance is read.
+    assert stats.round_trips == 1
+
+
+def test_index_maintained_by_save_and_delete(mocker):
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    a = IndexedTestModel(uri='a', label='A')
+    a.save()
+    assert uris(IndexedTestModel.objects.filter(label='A')) == {BASE_URI.a}
+
+    build = mocker.spy(FieldIndex, 'build')
+    a.label = 'Changed'
+    a.save()
+    IndexedTestModel(uri='b', label='A').save()
+    assert uris(IndexedTestModel.objects.filter(label='A')) == {BASE_URI.b}
+    assert uris(IndexedTestModel.objects.filter(label='Changed')) == {BASE_URI.a}
+
+    a.delete()
+    assert uris(IndexedTestModel.objects.filter(label='Changed')) == set()
+    assert build.call_count == 0
+
+
+def test_index_invalidated_by_external_write():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    IndexedTestModel(uri='a', label='A').save()
+    assert uris(IndexedTestModel.objects.filter(label='A')) == {BASE_URI.a}
+
+    db = Database.get_db()
+    db.write((BASE_URI.b, RDF.type, OWL.Thing))
+    db.write((BASE_URI.b, RDFS.label, Literal('A', lang='en')))
+    assert uris(IndexedTestModel.objects.filter(label='A')) == {BASE_URI.a, BASE_URI.b}
+
+
+class UnrelatedTestModel(models.Model):
+    class_type = models.IRIField(RDF.type, SKOS.Concept)
+    label = models.CharField(RDFS.label, lang='en')
+
+
+def test_index_kept_by_writes_of_other_models(mocker):
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    IndexedTestModel(uri='a', label='A').save()
+    assert uris(IndexedTestModel.objects.filter(label='A')) == {BASE_URI.a}
+
+    build = mocker.spy(FieldIndex, 'build')
+    unrelated = UnrelatedTestModel(uri='b', label='A')
+    unrelated.save()
+    unrelated.delete()
+    Database.get_db().write((BASE_URI.c, RDFS.comment, Literal('c')))
+    assert uris(IndexedTestModel.objects.filter(label='A')) == {BASE_URI.a}
+    assert build.call_count == 0
+
+
+def test_index_rebuilt_after_rolled_back_transaction():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    IndexedTestModel(uri='a', label='A').save()
+    assert uris(IndexedTestModel.objects.filter(label='A')) == {BASE_URI.a}
+
+    db = Database.get_db()
+    try:
+        with db.atomic():
+            IndexedTestModel(uri='b', label='A').save()
+            raise ValueError()
+    except ValueError:
+        pass
+    assert uris(IndexedTestModel.objects.filter(label='A')) == {BASE_URI.a}
+
+
+def test_indexed_filter_sparql_store(sparql_db, sparql_endpoint):
+    IndexedTestModel(uri='a', label='A', notations=['1']).save()
+    IndexedTestModel(uri='b', label='B', notations=['2']).save()
+    assert uris(IndexedTestModel.objects.filter(notations=['1'])) == {BASE_URI.a}
+
+    sparql_endpoint.reset()
+    instances = IndexedTestModel.objects.filter(label='B')
+    assert uris(instances) == {BASE_URI.b}
+    assert sparql_endpoint.requests == 1
+
+
+class UnindexedTestModel(models.Model):
+    class_type = models.IRIField(RDF.type, OWL.Thing)
+    label = models.CharField(RDFS.label, lang='en')
+    notations = models.CharField(SKOS.notation, many=True)
+
+
+def test_indexed_filter_matches_unindexed_sparql_store(sparql_db):
+    IndexedTestModel(uri='a', label='A', notations=['1', '2']).save()
+    IndexedTestModel(uri='b', label='B', notations=['2']).save()
+    for filters in [dict(notations=['2']), dict(notations=['1']), dict(notations=['1', '2']),
+                    dict(label='A', notations=['2']), dict(label='B', notations=['1'])]:
+        assert uris(IndexedTestModel.objects.filter(**filters)) == uris(UnindexedTestModel.objects.filter(**filters))
+
+
+class SearchTestModel(models.Model):
+    class_type = models.IRIField(RDF.type, SKOS.Concept)
+    pref_label = models.CharField(SKOS.prefLabel, lang='en')
+    alt_labels = models.CharField(SKOS.altLabel, many=True)
+
+    class Meta:
+        search_fields = ['pref_label', 'alt_labels']
+
+
+def test_search_ranks_exact_words_first():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    SearchTestModel(uri='geology', pref_label='Geology').save()
+    SearchTestModel(uri='geological', pref_label='Geological survey').save()
+    SearchTestModel(uri='geo', pref_label='Geo').save()
+    SearchTestModel(uri='biology', pref_label='Biology', alt_labels=['Life geology']).save()
+
+    assert SearchTestModel.objects.search('pref_label', 'geo') == [BASE_URI.geo, BASE_URI.geology, BASE_URI.geological]
+    assert SearchTestModel.objects.search('pref_label', 'GEOL SUR') == [BASE_URI.geological]
+    assert SearchTestModel.objects.search('pref_label', 'geol', limit=1) == [BASE_URI.geology]
+    assert SearchTestModel.objects.search('alt_labels', 'geol') == [BASE_URI.biology]
+    assert SearchTestModel.objects.search('pref_label', 'geol', lang='de') == []
+
+
+def test_search_index_updated_incrementally(mocker):
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    a = SearchTestModel(uri='a', pref_label='Granite')
+    a.save()
+    assert SearchTestModel.objects.search('pref_label', 'gran') == [BASE_URI.a]
+
+    build = mocker.spy(SearchIndex, 'build')
+    a.pref_label = 'Basalt'
+    a.save()
+    SearchTestModel(uri='b', pref_label='Granodiorite').save()
+    assert SearchTestModel.objects.search('pref_label', 'gran') == [BASE_URI.b]
+    assert SearchTestModel.objects.search('pref_label', 'bas') == [BASE_URI.a]
+    a.delete()
+    assert SearchTestModel.objects.search('pref_label', 'bas') == []
+    assert build.call_count == 0
+
+
+def test_queryset_search():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    SearchTestModel(uri='a', pref_label='Granite').save()
+    SearchTestModel(uri='b', pref_label='Granodiorite').save()
+    queryset = models.QuerySet([SearchTestModel.objects.get(BASE_URI.b)])
+    assert queryset.search('pref_label', 'gran') == [BASE_URI.b]
+
+
+def test_search_index_dump_and_load(tmp_path, mocker):
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    SearchTestModel(uri='a', pref_label='Granite', alt_labels=['Igneous rock']).save()
+    db = Database.get_db()
+    path = str(tmp_path / 'search.json')
+    SearchIndex.get(SearchTestModel, db).dump(path)
+
+    db = Database(g, BASE_URI)
+    index = SearchIndex.get(SearchTestModel, db)
+    index.load(path)
+    build = mocker.spy(SearchIndex, 'build')
+    assert index.search('alt_labels', 'rock') == [(BASE_URI.a, 1.0)]
+    assert build.call_count == 0
+
+
+def test_search_field_must_be_charfield():
+    class TestModel(models.Model):
+        class_type = models.IRIField(RDF.type, OWL.Thing)
+
+        class Meta:
+            search_fields = ['class_type']
+
+    with pytest.raises(TypeError):
+        SearchIndex.get(TestModel, Database(Graph(), BASE_URI))
@@ -0,0 +1,71 @@
+import logging
+
+from rdflib import Graph, URIRef
+from rdflib.namespace import RDF, RDFS, OWL
+from rdflib.plugins.stores.sparqlstore import SPARQLUpdateStore
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from tests import BASE_URI
+
+
+def test_instrumentation_disabled_by_default():
+    g = Graph()
+    db = Database(g, BASE_URI)
+    db.write((URIRef('s'), URIRef('p'), URIRef('o')))
+    assert db.stats is None
+    assert db._instrumented is False
+
+
+def test_capture_counts_store_calls():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    db = Database.get_db()
+    triple = (URIRef('s'), URIRef('p'), URIRef('o'))
+    with db.capture() as stats:
+        db.write(triple)
+        list(db.read((URIRef('s'), None, None)))
+        db.delete(triple)
+    assert stats.calls == {'query': 0, 'update': 0, 'read': 1, 'write': 1, 'delete': 1}
+    assert stats.round_trips == 3
+    assert stats.triples_read == 1
+    assert stats.triples_written == 1
+    assert stats.triples_deleted == 1
+    assert sum(stats.histograms['read']) == 1
+    assert db._instrumented is False
+
+
+def test_capture_counts_transaction_as_single_write():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+
+    class TestModel(models.Model):
+        class_type = models.IRIField(RDF.type, OWL.Thing)
+        comment = models.CharField(RDFS.comment)
+
+    db = Database.get_db()
+    with db.capture() as stats:
+        with db.atomic():
+            TestModel(uri='a', comment='a').save()
+            TestModel(uri='b', comment='b').save()
+    assert stats.calls['write'] == 1
+    assert stats.triples_written == 4
+
+
+def test_enable_instrumentation_logs_slow_queries(mocker, caplog):
+    store = SPARQLUpdateStore()
+    g = Graph(store=store, identifier=URIRef('urn:graph'))
+    db = Database(g, BASE_URI)
+    mocker.patch('rdflib.plugins.stores.sparqlstore.SPARQLUpdateStore.query')
+    stats = db.enable_instrumentation(slow_query_threshold=0)
+    with caplog.at_level(logging.WARNING, logger='rdflib_orm.db'):
+        db.sparql('SELECT * WHERE { ?s ?p ?o }')
+    assert stats.queries == 1
+    assert stats.slow_queries == 1
+    assert stats.bytes_sent == len('SELECT * WHERE { ?s ?p ?o }')
+    assert 'SELECT * WHERE { ?s ?p ?o }' in caplog.text
+
+    db.disable_instrumentation()
+    db.sparql('SELECT * WHERE { ?s ?p ?o }')
+    assert stats.queries == 1
+    assert db._instrumented is False
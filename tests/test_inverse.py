@@ -0,0 +1,53 @@
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import RDF, RDFS, SKOS
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from tests import BASE_URI
+
+
+class InverseTestConcept(models.Model):
+    class_type = models.IRIField(RDF.type, SKOS.Concept)
+    label = models.CharField(RDFS.label)
+    children = models.IRIField(SKOS.narrower, many=True, inverse=SKOS.broader)
+
+
+def broader(db: Database, uri: URIRef) -> set:
+    return {o for _, _, o in db.read((uri, SKOS.broader, None))}
+
+
+def assert_inverse_maintenance(db: Database):
+    InverseTestConcept(uri='parent', label='parent', children=[BASE_URI.a, BASE_URI.b]).save()
+    InverseTestConcept(uri='a', label='a').save()
+    db.write((BASE_URI.other, RDFS.seeAlso, BASE_URI.parent))
+
+    # The child keeps the inverse triple its parent maintains on it.
+    assert broader(db, BASE_URI.a) == {BASE_URI.parent}
+    assert broader(db, BASE_URI.b) == {BASE_URI.parent}
+
+    InverseTestConcept(uri='parent', label='parent', children=[BASE_URI.b, BASE_URI.c]).save()
+    assert broader(db, BASE_URI.a) == set()
+    assert broader(db, BASE_URI.b) == {BASE_URI.parent}
+    assert broader(db, BASE_URI.c) == {BASE_URI.parent}
+    # Unrelated links to the saved instance are left alone.
+    assert list(db.read((BASE_URI.other, RDFS.seeAlso, BASE_URI.parent)))
+
+    InverseTestConcept(uri='parent', label='parent').save()
+    assert broader(db, BASE_URI.b) == broader(db, BASE_URI.c) == set()
+    assert {(p, o) for _, p, o in db.read((BASE_URI.parent, None, None))} == {
+        (RDF.type, SKOS.Concept), (RDFS.label, Literal('parent'))
+    }
+
+
+def test_inverse_maintenance():
+    Database.set_db(Graph(), BASE_URI)
+    assert_inverse_maintenance(Database.get_db())
+
+
+def test_inverse_maintenance_sparql(sparql_endpoint, sparql_db):
+    assert_inverse_maintenance(sparql_db)
+
+    sparql_endpoint.reset()
+    InverseTestConcept(uri='parent', label='parent', children=[BASE_URI.a]).save()
+    assert sparql_endpoint.updates == 1
+    assert sparql_endpoint.queries == 0
@@ -0,0 +1,71 @@
+import threading
+
+from rdflib import Graph
+from rdflib.namespace import RDF, RDFS, OWL
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from tests import BASE_URI
+
+
+class IteratorTestModel(models.Model):
+    class_type = models.IRIField(RDF.type, OWL.Thing)
+    comment = models.CharField(RDFS.comment)
+
+
+def save_instances(db: Database, count: int):
+    with db.atomic():
+        for i in range(count):
+            IteratorTestModel(uri=f'{i}', comment='even' if i % 2 == 0 else 'odd').save()
+
+
+def test_iterator_parallel_fetch(sparql_db, sparql_endpoint):
+    save_instances(sparql_db, 25)
+    sparql_endpoint.reset()
+
+    instances = list(IteratorTestModel.objects.iterator(parallel=4, chunk_size=5))
+
+    assert sorted(instance.__uri__ for instance in instances) == sorted(BASE_URI[f'{i}'] for i in range(25))
+    # One query for the matching URIs and one per chunk.
+    assert sparql_endpoint.queries == 1 + 5
+
+
+def test_iterator_parallel_stats(sparql_db, sparql_endpoint):
+    save_instances(sparql_db, 30)
+    sparql_endpoint.reset()
+    with sparql_db.capture() as stats:
+        assert len(list(IteratorTestModel.objects.iterator(parallel=8, chunk_size=2))) == 30
+    assert stats.queries == sparql_endpoint.queries == 1 + 15
+
+
+def test_threads_have_their_own_store_headers(sparql_db):
+    stores = list()
+    thread = threading.Thread(target=lambda: stores.append(sparql_db.graph().store))
+    thread.start()
+    thread.join()
+    assert stores[0] is not sparql_db.g.store
+
+    # An update on this thread doesn't change the headers the other thread's reads are sent with.
+    IteratorTestModel(uri='a', comment='even').save()
+    assert 'content-type' not in stores[0].kwargs.get('headers', dict())
+
+
+def test_iterator_filters(sparql_db):
+    save_instances(sparql_db, 10)
+    instances = list(IteratorTestModel.objects.iterator(parallel=2, chunk_size=2, comment='even'))
+    assert {instance.__uri__ for instance in instances} == {BASE_URI[f'{i}'] for i in range(0, 10, 2)}
+    assert all(instance.comment == 'even' for instance in instances)
+
+
+def test_iterator_stops_early(sparql_db):
+    save_instances(sparql_db, 20)
+    iterator = IteratorTestModel.objects.iterator(parallel=2, chunk_size=2)
+    assert next(iterator).comment in ('even', 'odd')
+    iterator.close()
+
+
+def test_iterator_local_store():
+    Database.set_db(Graph(), BASE_URI)
+    save_instances(Database.get_db(), 5)
+    assert len(list(IteratorTestModel.objects.iterator(parallel=4))) == 5
+    assert len(list(IteratorTestModel.objects.iterator(comment='odd'))) == 2
@@ -0,0 +1,60 @@
+import pytest
+from rdflib import Graph
+from rdflib.namespace import RDF, RDFS, SKOS
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from tests import BASE_URI
+
+
+class LazyTestConcept(models.Model):
+    class_type = models.IRIField(RDF.type, SKOS.Concept)
+    label = models.CharField(RDFS.label)
+    scheme = models.IRIField(SKOS.inScheme)
+    tags = models.CharField(SKOS.notation, many=True)
+
+
+class LazyTestScheme(models.Model):
+    class_type = models.IRIField(RDF.type, SKOS.ConceptScheme)
+
+
+def populate():
+    for i, (scheme, tags) in enumerate([('a', ['x']), ('a', ['y']), ('b', ['x']), ('b', ['x', 'y']), ('c', [])]):
+        LazyTestConcept(uri=str(i), label=f'concept {i}', scheme=BASE_URI[scheme], tags=tags or None).save()
+
+
+def uris(*numbers):
+    return [BASE_URI[str(i)] for i in numbers]
+
+
+def assert_lazy():
+    a = LazyTestConcept.objects.lazy(scheme=BASE_URI.a)
+    b = LazyTestConcept.objects.lazy(scheme=BASE_URI.b)
+    x = LazyTestConcept.objects.lazy(tags=['x'])
+    y = LazyTestConcept.objects.lazy(tags=['y'])
+
+    assert (a | b).uris() == uris(0, 1, 2, 3)
+    assert (b & y).uris() == uris(3)
+    assert (x - a).uris() == uris(2, 3)
+    assert ((a | b) - (x & y)).uris() == uris(0, 1, 2)
+    assert (LazyTestConcept.objects.lazy() - (a | b)).uris() == uris(4)
+
+    instances = (a | b & y).evaluate(chunk_size=1)
+    assert {instance.__uri__ for instance in instances} == set(uris(0, 1, 3))
+    assert {instance.label for instance in a & x} == {'concept 0'}
+
+
+def test_lazy():
+    Database.set_db(Graph(), BASE_URI)
+    populate()
+    assert_lazy()
+
+
+def test_lazy_sparql(sparql_db):
+    populate()
+    assert_lazy()
+
+
+def test_lazy_requires_same_model():
+    with pytest.raises(TypeError):
+        LazyTestConcept.objects.lazy() | LazyTestScheme.objects.lazy()
@@ -0,0 +1,106 @@
+import pytest
+from rdflib import Graph, Literal
+from rdflib.namespace import RDF, RDFS, SKOS
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from tests import BASE_URI
+
+
+class PaginationTestConcept(models.Model):
+    class_type = models.IRIField(RDF.type, SKOS.Concept)
+    label = models.CharField(RDFS.label)
+
+
+def populate():
+    for i in range(7):
+        PaginationTestConcept(uri=f'{i:02d}', label='even' if i % 2 == 0 else 'odd').save()
+
+
+def pages(size: int, model_class=PaginationTestConcept, **kwargs) -> list:
+    result = list()
+    cursor = None
+    while True:
+        page = model_class.objects.paginate(after=cursor, size=size, **kwargs)
+        result.append([instance.__uri__ for instance in page])
+        cursor = page.cursor
+        if cursor is None:
+            return result
+
+
+def assert_pagination():
+    assert pages(3) == [[BASE_URI[f'{i:02d}'] for i in chunk] for chunk in ([0, 1, 2], [3, 4, 5], [6])]
+    assert pages(2, label='odd') == [[BASE_URI['01'], BASE_URI['03']], [BASE_URI['05']]]
+    assert pages(7) == [[BASE_URI[f'{i:02d}'] for i in range(7)]]
+
+    # Pages don't shift when instances before the cursor are deleted.
+    page = PaginationTestConcept.objects.paginate(size=3)
+    PaginationTestConcept.objects.get(BASE_URI['00']).delete()
+    page = PaginationTestConcept.objects.paginate(after=page.cursor, size=3)
+    assert [instance.__uri__ for instance in page] == [BASE_URI[f'{i:02d}'] for i in (3, 4, 5)]
+
+
+def test_pagination():
+    Database.set_db(Graph(), BASE_URI)
+    populate()
+    assert_pagination()
+
+
+def test_pagination_sees_writes_made_to_the_graph():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    populate()
+    assert pages(4)[-1][-1] == BASE_URI['06']
+    g.add((BASE_URI['99'], RDF.type, SKOS.Concept))
+    g.add((BASE_URI['99'], RDFS.label, Literal('odd')))
+    assert pages(4)[-1][-1] == BASE_URI['99']
+
+
+class CachedPaginationTestConcept(models.Model):
+    class_type = models.IRIField(RDF.type, SKOS.Concept)
+    label = models.CharField(RDFS.label)
+    related = models.IRIField(RDFS.seeAlso, many=True)
+
+    class Meta:
+        cache_sorted_uris = True
+
+
+def test_pagination_cache_reads_local_store_once(mocker):
+    Database.set_db(Graph(), BASE_URI)
+    populate()
+    read = mocker.spy(models.LazyQuerySet, '_read_uris')
+    assert len(pages(2)) == 4
+    assert read.call_count == 4
+    read.reset_mock()
+
+    assert len(pages(2, CachedPaginationTestConcept)) == 4
+    assert read.call_count == 1
+
+    # Writes to the model are picked up on the next page.
+    CachedPaginationTestConcept(uri='99', label='odd').save()
+    assert pages(4, CachedPaginationTestConcept)[-1][-1] == BASE_URI['99']
+    assert read.call_count == 2
+
+
+def test_pagination_cache_keys_model_filters_by_uri():
+    Database.set_db(Graph(), BASE_URI)
+    populate()
+    CachedPaginationTestConcept(uri='a', label='a', related=[BASE_URI['00']]).save()
+    CachedPaginationTestConcept(uri='b', label='b', related=[BASE_URI['01']]).save()
+    query = CachedPaginationTestConcept.objects
+    for i, expected in ((0, 'a'), (1, 'b'), (0, 'a'), (1, 'b')):
+        # Filters by equal instances share a key, whatever the instances' identity.
+        related = [PaginationTestConcept(uri=f'{i:02d}', label='x')]
+        assert query.lazy(related=related)._key() == query.lazy(related=[BASE_URI[f'{i:02d}']])._key()
+        assert [instance.__uri__ for instance in query.paginate(related=related)] == [BASE_URI[expected]]
+
+
+def test_pagination_sparql(sparql_db):
+    populate()
+    assert_pagination()
+
+
+def test_invalid_cursor():
+    Database.set_db(Graph(), BASE_URI)
+    with pytest.raises(ValueError):
+        PaginationTestConcept.objects.paginate(after='not a cursor')
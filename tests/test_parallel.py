@@ -0,0 +1,79 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from rdflib import Graph, Literal
+from rdflib.namespace import RDF, RDFS, OWL, SKOS
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from rdflib_orm.parallel import instance_values
+from tests import BASE_URI
+
+
+class ParallelTestModel(models.Model):
+    class_type = models.IRIField(RDF.type, OWL.Thing)
+    comment = models.CharField(RDFS.comment, required=True)
+    notations = models.CharField(SKOS.notation, many=True)
+    children = models.IRIField(SKOS.narrower, many=True, inverse=SKOS.broader)
+
+
+def records(count: int):
+    for i in range(count):
+        yield {'uri': f'{i}', 'comment': 'even' if i % 2 == 0 else 'odd', 'notations': [f'N{i}'],
+               'children': [BASE_URI[f'{i + 1}']] if i + 1 < count else None}
+
+
+def test_bulk_create_matches_save():
+    saved = Graph()
+    Database.set_db(saved, BASE_URI)
+    for record in records(10):
+        ParallelTestModel(record.pop('uri'), **record).save()
+
+    for processes in (None, 2):
+        created = Graph()
+        Database.set_db(created, BASE_URI)
+        ParallelTestModel.objects.bulk_create(records(10), processes=processes, chunk_size=3)
+        assert set(created) == set(saved)
+
+
+def test_bulk_create_validates():
+    Database.set_db(Graph(), BASE_URI)
+    with pytest.raises(models.FieldError):
+        ParallelTestModel.objects.bulk_create([{'uri': 'a'}], processes=2)
+
+
+def test_bulk_create_sparql_store_request_per_chunk(sparql_db, sparql_endpoint):
+    ParallelTestModel.objects.bulk_create(records(10), chunk_size=5)
+    assert sparql_endpoint.updates == 2
+    assert (BASE_URI['3'], SKOS.notation, Literal('N3')) in sparql_endpoint.dataset.graph(sparql_db.g.identifier)
+
+
+def test_iterator_processes():
+    Database.set_db(Graph(), BASE_URI)
+    ParallelTestModel.objects.bulk_create(records(20))
+
+    instances = list(ParallelTestModel.objects.iterator(processes=2, chunk_size=4))
+    assert sorted(instance.__uri__ for instance in instances) == sorted(BASE_URI[f'{i}'] for i in range(20))
+    instance = next(instance for instance in instances if instance.__uri__ == BASE_URI['4'])
+    assert instance.comment == 'even'
+    assert instance.notations == ['N4']
+    assert instance.children == [str(BASE_URI['5'])]
+
+    odd = list(ParallelTestModel.objects.iterator(processes=2, comment='odd'))
+    assert {instance.__uri__ for instance in odd} == {BASE_URI[f'{i}'] for i in range(1, 20, 2)}
+
+
+class SpecificParallelTestModel(ParallelTestModel):
+    class_type = models.IRIField(RDF.type, [OWL.Thing, SKOS.Concept])
+
+
+def test_instance_values_spawned_worker():
+    pos = [(RDF.type, OWL.Thing), (RDF.type, SKOS.Concept), (RDFS.comment, Literal('a'))]
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        [(uri, model_class, values, _)] = executor.submit(
+            instance_values, [(BASE_URI.a, SpecificParallelTestModel, pos)]).result()
+    assert uri == BASE_URI.a
+    assert model_class is SpecificParallelTestModel
+    assert values['comment'] == 'a'
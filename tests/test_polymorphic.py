@@ -0,0 +1,85 @@
+from rdflib import Graph
+from rdflib.namespace import RDF, RDFS, SKOS, OWL
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from tests import BASE_URI
+
+
+class PolymorphicTestConcept(models.Model):
+    class_type = models.IRIField(RDF.type, SKOS.Concept)
+    label = models.CharField(RDFS.label)
+
+
+class PolymorphicTestTopConcept(PolymorphicTestConcept):
+    class_type = models.IRIField(RDF.type, [SKOS.Concept, OWL.NamedIndividual])
+    scheme = models.IRIField(SKOS.topConceptOf)
+
+
+class PolymorphicTestAlias(PolymorphicTestConcept):
+    # Same types as its parent, so its instances can't be told apart.
+    pass
+
+
+class PolymorphicTestMixin(models.Model):
+    label = models.CharField(RDFS.label)
+
+    class Meta:
+        mixin = True
+
+
+class PolymorphicTestScheme(PolymorphicTestMixin):
+    class_type = models.IRIField(RDF.type, SKOS.ConceptScheme)
+
+
+class PolymorphicTestVocabulary(PolymorphicTestScheme):
+    class_type = models.IRIField(RDF.type, [SKOS.ConceptScheme, OWL.Ontology])
+
+
+def populate():
+    PolymorphicTestConcept(uri='a', label='plain').save()
+    PolymorphicTestTopConcept(uri='b', label='top', scheme=BASE_URI.scheme).save()
+
+
+def assert_polymorphic(instances):
+    by_uri = {instance.__uri__: instance for instance in instances}
+    assert type(by_uri[BASE_URI.a]) is PolymorphicTestConcept
+    assert type(by_uri[BASE_URI.b]) is PolymorphicTestTopConcept
+    assert by_uri[BASE_URI.b].scheme == str(BASE_URI.scheme)
+
+
+def test_registry():
+    assert PolymorphicTestTopConcept in models.ModelBase.registry[OWL.NamedIndividual]
+    assert PolymorphicTestConcept.objects._get_subclasses() == [PolymorphicTestTopConcept]
+    assert PolymorphicTestTopConcept.objects._get_subclasses() == []
+
+
+def test_models_inheriting_from_mixin():
+    # Concrete models inherit Meta.mixin from their mixin base, but are registered.
+    assert PolymorphicTestScheme in models.ModelBase.registry[SKOS.ConceptScheme]
+    assert PolymorphicTestScheme.__class_types__ == frozenset([SKOS.ConceptScheme])
+    assert not hasattr(PolymorphicTestMixin, '__class_types__')
+
+    Database.set_db(Graph(), BASE_URI)
+    PolymorphicTestScheme(uri='a', label='scheme').save()
+    PolymorphicTestVocabulary(uri='b', label='vocabulary').save()
+    by_uri = {instance.__uri__: instance for instance in PolymorphicTestScheme.objects.all()}
+    assert type(by_uri[BASE_URI.a]) is PolymorphicTestScheme
+    assert type(by_uri[BASE_URI.b]) is PolymorphicTestVocabulary
+    assert PolymorphicTestMixin.objects._get_subclasses()[0] is PolymorphicTestVocabulary
+
+
+def test_hydrates_most_specific_class():
+    Database.set_db(Graph(), BASE_URI)
+    populate()
+    assert_polymorphic(PolymorphicTestConcept.objects.all())
+    assert_polymorphic(PolymorphicTestConcept.objects.iterator(processes=2, chunk_size=1))
+    assert type(PolymorphicTestConcept.objects.get(BASE_URI.b)) is PolymorphicTestTopConcept
+    assert {instance.__uri__ for instance in PolymorphicTestTopConcept.objects.all()} == {BASE_URI.b}
+
+
+def test_hydrates_most_specific_class_sparql(sparql_db):
+    populate()
+    assert_polymorphic(PolymorphicTestConcept.objects.all())
+    assert_polymorphic(PolymorphicTestConcept.objects.iterator(chunk_size=1))
+    assert type(PolymorphicTestConcept.objects.get(BASE_URI.b)) is PolymorphicTestTopConcept
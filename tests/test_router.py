@@ -0,0 +1,84 @@
+import pytest
+from rdflib import Dataset, Graph, Literal
+from rdflib.namespace import RDF, RDFS, OWL
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from rdflib_orm.db.router import ReplicaRouter
+from rdflib_orm.testing import MockSPARQLEndpoint
+from tests import BASE_URI, GRAPH_URI
+
+
+class RouterTestModel(models.Model):
+    class_type = models.IRIField(RDF.type, OWL.Thing)
+    comment = models.CharField(RDFS.comment)
+
+
+@pytest.fixture
+def endpoints():
+    """A primary and two replica endpoints serving the same dataset."""
+    dataset = Dataset()
+    with MockSPARQLEndpoint(dataset) as primary, MockSPARQLEndpoint(dataset) as replica_a, \
+            MockSPARQLEndpoint(dataset) as replica_b:
+        yield primary, replica_a, replica_b
+
+
+def test_reads_go_to_replicas_round_robin(endpoints):
+    primary, replica_a, replica_b = endpoints
+    Database.set_db(primary.graph(GRAPH_URI), BASE_URI,
+                    replicas=[replica_a.graph(GRAPH_URI), replica_b.graph(GRAPH_URI)])
+    RouterTestModel(uri='a', comment='a').save()
+    for endpoint in endpoints:
+        endpoint.reset()
+
+    for _ in range(4):
+        assert RouterTestModel.objects.get(BASE_URI.a).comment == 'a'
+    assert primary.requests == 0
+    assert replica_a.queries == 2
+    assert replica_b.queries == 2
+    assert replica_a.updates == replica_b.updates == 0
+
+
+def test_transaction_reads_stick_to_primary(endpoints):
+    primary, replica_a, replica_b = endpoints
+    Database.set_db(primary.graph(GRAPH_URI), BASE_URI,
+                    replicas=[replica_a.graph(GRAPH_URI), replica_b.graph(GRAPH_URI)])
+    with Database.get_db().atomic():
+        RouterTestModel(uri='a', comment='a').save()
+        assert [comment for _, _, comment in Database.get_db().read((BASE_URI.a, RDFS.comment, None))] == [Literal('a')]
+    assert primary.queries > 0
+    assert primary.updates == 1
+    assert replica_a.requests == replica_b.requests == 0
+
+
+def test_least_latency_prefers_fastest_replica():
+    router = ReplicaRouter([Graph(), Graph(), Graph()], strategy='least_latency')
+    # Every replica is tried before any is preferred.
+    for replica in range(3):
+        assert router.choose() == replica
+        router.observe(replica, 0.05)
+    router.observe(1, 0.01)
+    assert router.choose() == 1
+    for _ in range(20):
+        router.observe(1, 0.5)
+    assert router.choose() != 1
+
+
+def test_least_latency_probes_slow_replica_until_it_recovers():
+    router = ReplicaRouter([Graph(), Graph()], strategy='least_latency', probe_interval=10)
+    router.observe(0, 0.01)
+    router.observe(1, 1.0)
+    chosen = [router.choose() for _ in range(10)]
+    # The slow replica is probed rather than never read from again.
+    assert chosen.count(1) == 1
+
+    # It has recovered, and takes the reads back once probes bring its average down.
+    for _ in range(1000):
+        replica = router.choose()
+        router.observe(replica, 0.001 if replica == 1 else 0.01)
+    assert router.choose() == 1
+
+
+def test_invalid_read_strategy():
+    with pytest.raises(ValueError):
+        Database(Graph(), BASE_URI, replicas=[Graph()], read_strategy='random')
@@ -0,0 +1,91 @@
+from rdflib import Graph, Literal, BNode
+from rdflib.namespace import RDF, RDFS, SKOS, XSD
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from rdflib_orm.db.snapshot import SnapshotStore, load_snapshot
+from tests import BASE_URI, GRAPH_URI
+
+
+class SnapshotTestConcept(models.Model):
+    class_type = models.IRIField(RDF.type, SKOS.Concept)
+    label = models.CharField(RDFS.label, lang='en')
+    notations = models.CharField(SKOS.notation, many=True)
+    children = models.IRIField(SKOS.narrower, many=True, inverse=SKOS.broader)
+
+
+def test_snapshot_matches_graph(tmp_path):
+    g = Graph(identifier=GRAPH_URI)
+    g.add((BASE_URI.a, RDFS.label, Literal('a', lang='en')))
+    g.add((BASE_URI.a, RDFS.comment, Literal('with\x00separator')))
+    g.add((BASE_URI.a, SKOS.notation, Literal(1)))
+    g.add((BASE_URI.a, SKOS.notation, Literal('1', datatype=XSD.string)))
+    g.add((BASE_URI.b, RDFS.seeAlso, BASE_URI.a))
+    g.add((BNode('x'), RDFS.seeAlso, BASE_URI.b))
+    path = str(tmp_path / 'graph.snapshot')
+    Database(g, BASE_URI).snapshot(path)
+
+    snapshot = load_snapshot(path)
+    assert snapshot.identifier == GRAPH_URI
+    assert len(snapshot) == len(g)
+    patterns = [(None, None, None), (BASE_URI.a, None, None), (None, SKOS.notation, None),
+                (None, None, BASE_URI.a), (BASE_URI.a, None, Literal(1)), (None, RDFS.seeAlso, BASE_URI.b),
+                (BASE_URI.a, RDFS.label, Literal('a', lang='en')), (BASE_URI.missing, None, None)]
+    for pattern in patterns:
+        assert set(snapshot.triples(pattern)) == set(g.triples(pattern))
+
+    # Writes go to an overlay, the snapshot file is untouched.
+    snapshot.remove((BASE_URI.b, None, None))
+    snapshot.add((BASE_URI.c, RDFS.label, Literal('c')))
+    assert set(snapshot.triples((None, RDFS.seeAlso, None))) == {(BNode('x'), RDFS.seeAlso, BASE_URI.b)}
+    assert (BASE_URI.c, RDFS.label, Literal('c')) in snapshot
+    assert len(snapshot) == len(g)
+    assert len(load_snapshot(path)) == len(g)
+
+
+class SnapshotTestGraphConcept(models.Model):
+    class_type = models.IRIField(RDF.type, SKOS.Concept)
+    label = models.CharField(RDFS.label, lang='en')
+
+    class Meta:
+        graph = 'concepts'
+
+
+def test_snapshot_named_graphs(tmp_path):
+    Database.set_db(Graph(identifier=GRAPH_URI), BASE_URI)
+    SnapshotTestGraphConcept(uri='a', label='a').save()
+    SnapshotTestConcept(uri='b', label='b').save()
+    path = str(tmp_path / 'graphs.snapshot')
+    Database.get_db().snapshot(path)
+
+    db = Database.load_snapshot(path, BASE_URI)
+    assert {instance.__uri__ for instance in SnapshotTestGraphConcept.objects.all()} == {BASE_URI.a}
+    assert {instance.__uri__ for instance in SnapshotTestConcept.objects.all()} == {BASE_URI.b}
+    assert (BASE_URI.a, None, None) not in db.g
+    assert {graph.identifier for graph in db.g.store.contexts()} == {GRAPH_URI, BASE_URI.concepts}
+
+    # Writes to a graph stay in its overlay.
+    SnapshotTestGraphConcept(uri='c', label='c').save()
+    assert len(db.graph(BASE_URI.concepts)) == 4
+    assert len(db.g) == 2
+    assert (BASE_URI.c, None, None) not in db.g
+
+
+def test_models_on_snapshot(tmp_path):
+    Database.set_db(Graph(identifier=GRAPH_URI), BASE_URI)
+    SnapshotTestConcept(uri='a', label='a', notations=['1', '2'], children=[BASE_URI.b]).save()
+    SnapshotTestConcept(uri='b', label='b').save()
+    path = str(tmp_path / 'concepts.snapshot')
+    Database.get_db().snapshot(path)
+
+    db = Database.load_snapshot(path, BASE_URI)
+    assert isinstance(db.g.store, SnapshotStore)
+    concept = SnapshotTestConcept.objects.get(BASE_URI.a)
+    assert concept.label == 'a'
+    assert sorted(concept.notations) == ['1', '2']
+    assert {instance.__uri__ for instance in SnapshotTestConcept.objects.all()} == {BASE_URI.a, BASE_URI.b}
+    assert {instance.__uri__ for instance in SnapshotTestConcept.objects.filter(label='b')} == {BASE_URI.b}
+
+    SnapshotTestConcept(uri='a', label='changed').save()
+    assert SnapshotTestConcept.objects.get(BASE_URI.a).label == 'changed'
+    assert list(db.read((BASE_URI.b, SKOS.broader, None))) == []
@@ -0,0 +1,80 @@
+import pytest
+from rdflib import Literal
+from rdflib.namespace import RDF, RDFS, OWL, SKOS
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from tests import BASE_URI, GRAPH_URI
+
+
+class EndpointTestModel(models.Model):
+    class_type = models.IRIField(RDF.type, OWL.Thing)
+    comment = models.CharField(RDFS.comment)
+    label = models.CharField(RDFS.label, lang='en')
+    children = models.IRIField(SKOS.narrower, many=True, inverse=SKOS.broader)
+
+
+def test_endpoint_query_and_update(sparql_endpoint):
+    g = sparql_endpoint.graph(GRAPH_URI)
+    g.add((BASE_URI.s, RDFS.label, Literal('s')))
+    assert list(g.triples((None, None, None))) == [(BASE_URI.s, RDFS.label, Literal('s'))]
+    assert (BASE_URI.s, RDFS.label, Literal('s'), GRAPH_URI) in sparql_endpoint.dataset
+    assert sparql_endpoint.updates == 1
+    assert sparql_endpoint.queries == 1
+
+
+def test_endpoint_latency(sparql_endpoint):
+    sparql_endpoint.latency = 0.05
+    g = sparql_endpoint.graph(GRAPH_URI)
+    db = Database(g, BASE_URI)
+    with db.capture() as stats:
+        db.sparql('SELECT * WHERE { ?s ?p ?o }')
+    assert stats.time['query'] >= 0.05
+
+
+def test_save_and_get(sparql_db, sparql_endpoint):
+    EndpointTestModel(uri='a', comment='a', label='A').save()
+    EndpointTestModel(uri='b', comment='b', label='B').save()
+
+    sparql_endpoint.reset()
+    instance = EndpointTestModel.objects.get(BASE_URI.a)
+    assert instance.comment == 'a'
+    assert instance.label == 'A'
+    assert sparql_endpoint.requests == 1
+
+
+def test_get_not_found(sparql_db):
+    with pytest.raises(models.InstanceNotFoundError):
+        EndpointTestModel.objects.get(BASE_URI.missing)
+
+
+def test_filter(sparql_db):
+    EndpointTestModel(uri='a', comment='same', label='A').save()
+    EndpointTestModel(uri='b', comment='same', label='B').save()
+    EndpointTestModel(uri='c', comment='other', label='C').save()
+
+    assert {instance.__uri__ for instance in EndpointTestModel.objects.filter(comment='same')} == {BASE_URI.a, BASE_URI.b}
+    assert {instance.__uri__ for instance in EndpointTestModel.objects.filter(label='C')} == {BASE_URI.c}
+    assert len(EndpointTestModel.objects.all()) == 3
+
+
+def test_save_inverse_and_delete(sparql_db, sparql_endpoint):
+    child = EndpointTestModel(uri='child', comment='child')
+    child.save()
+    parent = EndpointTestModel(uri='parent', comment='parent', children=[child])
+    parent.save()
+    assert (BASE_URI.child, SKOS.broader, BASE_URI.parent, GRAPH_URI) in sparql_endpoint.dataset
+
+    sparql_endpoint.reset()
+    parent.delete()
+    assert sparql_endpoint.requests == 1
+    assert (BASE_URI.child, SKOS.broader, BASE_URI.parent, GRAPH_URI) not in sparql_endpoint.dataset
+    assert (BASE_URI.parent, None, None, GRAPH_URI) not in sparql_endpoint.dataset
+
+
+def test_atomic_single_request(sparql_db, sparql_endpoint):
+    with sparql_db.atomic():
+        EndpointTestModel(uri='a', comment='a').save()
+        EndpointTestModel(uri='b', comment='b').save()
+    assert sparql_endpoint.updates == 1
+    assert (BASE_URI.b, RDFS.comment, Literal('b'), GRAPH_URI) in sparql_endpoint.dataset
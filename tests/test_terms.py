@@ -0,0 +1,41 @@
+from rdflib import URIRef, Literal
+from rdflib.namespace import RDFS, SKOS, XSD
+
+from rdflib_orm import models, terms
+
+
+def test_terms_are_interned():
+    assert terms.uri('http://example.com/a') is terms.uri('http://example.com/a')
+    assert terms.literal('a', 'en') is terms.literal('a', 'en')
+    assert terms.literal('a', 'en') is not terms.literal('a', 'de')
+
+
+def test_terms_keep_value_types_apart():
+    assert terms.literal(1).datatype == XSD.integer
+    assert terms.literal(True).datatype == XSD.boolean
+    assert terms.literal(1.0).datatype == XSD.double
+    assert terms.uri(URIRef('http://example.com/a')) == URIRef('http://example.com/a')
+
+
+def test_fields_share_terms():
+    field = models.IRIField(SKOS.inScheme, many=True)
+    first = field.convert(['http://example.com/scheme'])
+    second = field.convert([URIRef('http://example.com/scheme')])
+    assert first[0] is field.convert(['http://example.com/scheme'])[0]
+    assert second[0] == first[0]
+
+    label = models.CharField(RDFS.label, lang='en')
+    assert label.convert('a') is label.convert('a')
+    assert label.convert('a') == Literal('a', lang='en')
+
+
+def test_set_cache_size():
+    try:
+        terms.set_cache_size(0)
+        assert terms.uri('http://example.com/a') is not terms.uri('http://example.com/a')
+        assert terms.cache_info()['uri'].maxsize == 0
+    finally:
+        terms.set_cache_size(terms.CACHE_SIZE)
+    terms.uri('http://example.com/a')
+    terms.uri('http://example.com/a')
+    assert terms.cache_info()['uri'].hits == 1
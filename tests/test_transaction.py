@@ -0,0 +1,225 @@
+import sys
+import threading
+
+import pytest
+from rdflib import Graph, URIRef, Literal, BNode
+from rdflib.namespace import RDF, RDFS, OWL
+from rdflib.plugins.stores.sparqlstore import SPARQLUpdateStore
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from tests import BASE_URI
+
+
+def test_atomic_buffers_writes_until_exit():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    db = Database.get_db()
+    triple = (URIRef('s'), URIRef('p'), URIRef('o'))
+    with db.atomic():
+        db.write(triple)
+        assert triple not in g
+        # Reads inside the block see the buffered write.
+        assert list(db.read((URIRef('s'), None, None))) == [triple]
+    assert triple in g
+    assert db.transaction is None
+
+
+def test_atomic_discards_writes_on_exception():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    db = Database.get_db()
+    with pytest.raises(ValueError):
+        with db.atomic():
+            db.write((URIRef('s'), URIRef('p'), URIRef('o')))
+            raise ValueError()
+    assert len(g) == 0
+    assert db.transaction is None
+
+
+def test_atomic_deduplicates_redundant_writes():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    db = Database.get_db()
+    triple = (URIRef('s'), URIRef('p'), URIRef('o'))
+    with db.atomic() as transaction:
+        db.write(triple)
+        db.delete(triple)
+        db.write(triple)
+        db.write(triple)
+        assert transaction._coalesce() == [{(*triple, g.identifier): True}]
+    assert triple in g
+
+
+def test_atomic_delete_pattern_expands_buffered_triples():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    db = Database.get_db()
+    db.write((URIRef('s'), URIRef('p'), URIRef('o1')))
+    with db.atomic():
+        db.write((URIRef('s'), URIRef('p'), URIRef('o2')))
+        db.delete((URIRef('s'), None, None))
+        assert list(db.read((URIRef('s'), None, None))) == []
+    assert len(g) == 0
+
+
+def test_atomic_nested_block_rolls_back_to_savepoint():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    db = Database.get_db()
+    outer = (URIRef('s'), URIRef('p'), URIRef('outer'))
+    inner = (URIRef('s'), URIRef('p'), URIRef('inner'))
+    with db.atomic():
+        db.write(outer)
+        with pytest.raises(ValueError):
+            with db.atomic():
+                db.write(inner)
+                raise ValueError()
+        assert list(db.read((URIRef('s'), None, None))) == [outer]
+    assert outer in g
+    assert inner not in g
+
+
+def test_atomic_is_per_thread():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    db = Database.get_db()
+    inside = (URIRef('s'), URIRef('p'), URIRef('inside'))
+    outside = (URIRef('s'), URIRef('p'), URIRef('outside'))
+    with db.atomic() as transaction:
+        db.write(inside)
+        # A thread writing while the block is open isn't folded into it, nor ends it.
+        thread = threading.Thread(target=lambda: db.write(outside))
+        thread.start()
+        thread.join()
+        assert outside in g
+        assert inside not in g
+        assert db.transaction is transaction
+    assert inside in g
+    assert db.transaction is None
+
+
+def test_atomic_groups_model_saves():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+
+    class TestModel(models.Model):
+        class_type = models.IRIField(RDF.type, OWL.Thing)
+        comment = models.CharField(RDFS.comment)
+
+    model_a = TestModel(uri='a', comment='a')
+    model_b = TestModel(uri='b', comment='b')
+    with Database.get_db().atomic():
+        model_a.save()
+        model_b.save()
+        model_a.comment = 'changed'
+        model_a.save()
+        assert len(g) == 0
+    assert g.value(BASE_URI.a, RDFS.comment) == Literal('changed')
+    assert g.value(BASE_URI.b, RDFS.comment) == Literal('b')
+    assert len(g) == 4
+
+
+def test_atomic_sparql_store_flushes_single_request(mocker):
+    store = SPARQLUpdateStore()
+    g = Graph(store=store, identifier=URIRef('urn:graph'))
+    db = Database(g, BASE_URI)
+    update = mocker.patch('rdflib.plugins.stores.sparqlstore.SPARQLUpdateStore.update')
+    with db.atomic():
+        db.sparql_update('DELETE WHERE { GRAPH <urn:graph> { <urn:s> ?p ?o } }')
+        db.write((URIRef('urn:s'), URIRef('urn:p'), Literal('o')))
+        db.write((URIRef('urn:s'), URIRef('urn:p'), URIRef('urn:o')))
+    update.assert_called_once()
+    query = update.call_args[0][0]
+    assert query.index('DELETE WHERE') < query.index('INSERT DATA')
+    assert '<urn:s> <urn:p> "o" .' in query
+    assert '<urn:s> <urn:p> <urn:o> .' in query
+
+
+def test_atomic_sparql_store_deletes_blank_nodes_with_delete_where(mocker):
+    store = SPARQLUpdateStore()
+    g = Graph(store=store, identifier=URIRef('urn:graph'))
+    db = Database(g, BASE_URI)
+    update = mocker.patch('rdflib.plugins.stores.sparqlstore.SPARQLUpdateStore.update')
+    node = BNode()
+    with db.atomic():
+        db.delete((URIRef('urn:s'), URIRef('urn:p'), Literal('o')))
+        db.delete((URIRef('urn:s'), URIRef('urn:p'), node))
+        db.delete((node, URIRef('urn:p'), Literal('o')))
+    query = update.call_args[0][0]
+    assert 'DELETE DATA { GRAPH <urn:graph> { <urn:s> <urn:p> "o" . } }' in query
+    assert 'DELETE WHERE { GRAPH <urn:graph> { <urn:s> <urn:p> ?b0 . ?b0 <urn:p> "o" . } }' in query
+    assert '_:' not in query
+
+
+def test_atomic_deletes_blank_nodes_sparql(sparql_db):
+    graph = sparql_db.g.identifier
+    sparql_db.sparql_update(f'INSERT DATA {{ GRAPH <{graph}> {{ <urn:s> <urn:p> _:a . _:a <urn:p> "o" . }} }}')
+    triples = list(sparql_db.read((None, None, None)))
+    assert len(triples) == 2
+    with sparql_db.atomic():
+        for triple in triples:
+            sparql_db.delete(triple)
+    assert list(sparql_db.read((None, None, None))) == []
+
+
+class SaveTestModel(models.Model):
+    class_type = models.IRIField(RDF.type, OWL.Thing)
+    comment = models.CharField(RDFS.comment)
+    labels = models.CharField(RDFS.label, many=True)
+
+
+def test_save_sparql_store_single_request(sparql_db, sparql_endpoint):
+    instance = SaveTestModel(uri='a', comment='a')
+    instance.save()
+    instance.comment = 'changed'
+    sparql_endpoint.reset()
+    instance.save()
+    assert sparql_endpoint.queries == 0
+    assert sparql_endpoint.updates == 1
+    assert SaveTestModel.objects.get(BASE_URI.a).comment == 'changed'
+
+
+def test_failed_save_leaves_store_unchanged():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    instance = SaveTestModel(uri='a', comment='a', labels=['a'])
+    instance.save()
+    before = set(g)
+
+    instance.comment = 'changed'
+    # Not a list, so the conversion fails after the first writes were made.
+    instance.labels = 'b'
+    with pytest.raises(models.FieldError):
+        instance.save()
+    assert set(g) == before
+
+
+def test_concurrent_saves_are_all_written():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    barrier = threading.Barrier(8)
+    errors = []
+
+    def save(thread_number):
+        barrier.wait()
+        try:
+            for i in range(300):
+                SaveTestModel(uri=f'{thread_number}_{i}', comment=str(i)).save()
+        except Exception as e:
+            errors.append(e)
+
+    # Switch threads often, so the saves interleave inside their transactions.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=save, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
+    assert len(set(g.subjects(RDF.type, OWL.Thing))) == 2400
+    assert len(g) == 4800
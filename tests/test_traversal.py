@@ -0,0 +1,55 @@
+import pytest
+from rdflib import Graph
+from rdflib.namespace import RDF, RDFS, SKOS
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from tests import BASE_URI
+
+
+class TraversalTestConcept(models.Model):
+    class_type = models.IRIField(RDF.type, SKOS.Concept)
+    label = models.CharField(RDFS.label)
+    children = models.IRIField(SKOS.narrower, many=True, inverse=SKOS.broader)
+
+
+def populate():
+    # A binary tree of depth 3: 0 > 1, 2 > 3, 4, 5, 6 > 7..14.
+    for i in reversed(range(15)):
+        children = [BASE_URI[str(c)] for c in (2 * i + 1, 2 * i + 2) if c < 15]
+        TraversalTestConcept(uri=str(i), label=f'concept {i}', children=children or None).save()
+
+
+def uris(instances):
+    return {instance.__uri__ for instance in instances}
+
+
+def assert_traversal():
+    root = BASE_URI['0']
+    assert uris(TraversalTestConcept.objects.descendants(root, field='children')) == \
+        {BASE_URI[str(i)] for i in range(1, 15)}
+    assert uris(TraversalTestConcept.objects.descendants(root, field='children', depth=2, chunk_size=1)) == \
+        {BASE_URI[str(i)] for i in range(1, 7)}
+    assert uris(TraversalTestConcept.objects.ancestors(BASE_URI['9'], field='children')) == \
+        {BASE_URI['4'], BASE_URI['1'], BASE_URI['0']}
+    assert uris(TraversalTestConcept.objects.ancestors(BASE_URI['9'], field='children', depth=1)) == {BASE_URI['4']}
+
+    leaf = TraversalTestConcept.objects.get(BASE_URI['14'])
+    assert TraversalTestConcept.objects.descendants(leaf, field='children') == []
+
+
+def test_traversal():
+    Database.set_db(Graph(), BASE_URI)
+    populate()
+    assert_traversal()
+
+
+def test_traversal_sparql(sparql_db):
+    populate()
+    assert_traversal()
+
+
+def test_traversal_requires_iri_field():
+    Database.set_db(Graph(), BASE_URI)
+    with pytest.raises(ValueError):
+        TraversalTestConcept.objects.descendants(BASE_URI['0'], field='label')
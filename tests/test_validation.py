@@ -0,0 +1,70 @@
+import pytest
+from rdflib import Graph
+from rdflib.namespace import RDF, RDFS, OWL, SKOS
+
+from rdflib_orm import models
+from rdflib_orm.db import Database
+from tests import BASE_URI
+
+
+class ValidationTestModel(models.Model):
+    class_type = models.IRIField(RDF.type, OWL.Thing)
+    comment = models.CharField(RDFS.comment, max_length=10, required=True)
+    notations = models.CharField(SKOS.notation, many=True, max_length=3)
+
+
+def test_save_skips_unchanged_fields(mocker):
+    Database.set_db(Graph(), BASE_URI)
+    instance = ValidationTestModel(uri='a', comment='a', notations=['N1'])
+    validate = mocker.spy(models.CharField, 'validate')
+
+    instance.save()
+    instance.serialize()
+    assert validate.call_count == 0
+
+    instance.comment = 'b'
+    instance.save()
+    assert validate.call_count == 1
+
+
+def test_save_validates_changed_fields_before_writing():
+    g = Graph()
+    Database.set_db(g, BASE_URI)
+    instance = ValidationTestModel(uri='a', comment='a', notations=['N1'])
+    instance.save()
+
+    instance.comment = 'far too long'
+    with pytest.raises(models.FieldError):
+        instance.save()
+    # Lists changed in place are validated again too.
+    instance.comment = 'a'
+    instance.notations += ['N2', 'N3']
+    with pytest.raises(models.FieldError):
+        instance.save()
+    assert len(g) == 3
+
+
+def test_trusted_skips_validation():
+    Database.set_db(Graph(), BASE_URI)
+    with pytest.raises(models.FieldError):
+        ValidationTestModel(uri='a')
+    instance = ValidationTestModel(uri='a', trusted=True)
+    assert instance.comment is None
+
+
+def test_trusted_hydration(mocker):
+    Database.set_db(Graph(), BASE_URI)
+    ValidationTestModel(uri='a', comment='a').save()
+    validate = mocker.spy(models.CharField, 'validate')
+    assert ValidationTestModel.objects.get(BASE_URI.a, trusted=True).comment == 'a'
+    assert len(ValidationTestModel.objects.all(trusted=True)) == 1
+    assert validate.call_count == 0
+
+
+def test_validate_many():
+    field = ValidationTestModel.comment
+    field.validate_many(['a', 'b'], ValidationTestModel, 'comment')
+    with pytest.raises(models.FieldError):
+        field.validate_many(['a', None], ValidationTestModel, 'comment')
+    with pytest.raises(models.FieldError):
+        field.validate_many(['a', 'far too long'], ValidationTestModel, 'comment')